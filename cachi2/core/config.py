@@ -18,6 +18,11 @@ class Config(BaseModel, extra="forbid"):
     default_environment_variables: dict = {}
     gomod_download_max_tries: int = 5
     gomod_strict_vendor: bool = True
+    gomod_persistent_cache: bool = False
+    gomod_persistent_cache_max_age: int = 30
+    gomod_tags_fetch_ttl: int = 0
+    gomod_skip_tags_fetch_if_present: bool = False
+    gomod_toolchain_cache_size: int = 5
     subprocess_timeout: int = 3600
 
     # matches aiohttp default timeout:
@@ -25,6 +30,8 @@ class Config(BaseModel, extra="forbid"):
     requests_timeout: int = 300
     concurrency_limit: int = 5
 
+    pip_index_cache_ttl: int = 0
+
     allow_yarnberry_processing: bool = True
 
     @model_validator(mode="before")
@@ -1,4 +1,5 @@
 import logging
+import re
 from pathlib import Path
 from typing import TYPE_CHECKING, Annotated, Any, Callable, Dict, Literal, Optional, TypeVar, Union
 
@@ -141,6 +142,31 @@ class NpmPackageInput(_PackageInputBase):
     type: Literal["npm"]
 
 
+class PipBinaryFilters(pydantic.BaseModel, extra="forbid"):
+    """Select the wheels to download for a pip package, by the tags in their filenames.
+
+    Every filter is a list of accepted values, a missing filter accepts any value. Platform
+    independent wheels ("any" platform, "none" ABI) are always accepted.
+    """
+
+    python_versions: Optional[list[str]] = None
+    abis: Optional[list[str]] = None
+    platforms: Optional[list[str]] = None
+
+    @pydantic.field_validator("python_versions", "abis", "platforms")
+    def _not_empty(cls, values: Optional[list[str]]) -> Optional[list[str]]:
+        if values is not None and not values:
+            raise ValueError("must not be empty, leave the filter out to accept any value")
+        return values
+
+    @pydantic.field_validator("python_versions")
+    def _python_version_format(cls, versions: Optional[list[str]]) -> Optional[list[str]]:
+        for version in versions or []:
+            if not re.fullmatch(r"\d+\.\d+", version):
+                raise ValueError(f"expected a Python version like 3.11, got: {version}")
+        return versions
+
+
 class PipPackageInput(_PackageInputBase):
     """Accepted input for a pip package."""
 
@@ -148,6 +174,7 @@ class PipPackageInput(_PackageInputBase):
     requirements_files: Optional[list[Path]] = None
     requirements_build_files: Optional[list[Path]] = None
     allow_binary: bool = False
+    binary_filters: Optional[PipBinaryFilters] = None
 
     @pydantic.field_validator("requirements_files", "requirements_build_files")
     def _no_explicit_none(cls, paths: Optional[list[Path]]) -> list[Path]:
@@ -163,6 +190,12 @@ class PipPackageInput(_PackageInputBase):
             check_sane_relpath(p)
         return paths
 
+    @pydantic.model_validator(mode="after")
+    def _binary_filters_need_binaries(self) -> Self:
+        if self.binary_filters and not self.allow_binary:
+            raise ValueError("binary_filters can only be used with allow_binary: true")
+        return self
+
 
 class ExtraOptions(pydantic.BaseModel, extra="forbid"):
     """Global package manager extra options model.
@@ -1,10 +1,13 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import asyncio
+import contextlib
 import logging
 import ssl
+import threading
 import types
 from os import PathLike
-from typing import Any, Dict, Optional, Set, Union
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Set, Union
 from urllib.parse import urlparse
 
 import aiohttp
@@ -19,12 +22,93 @@ from cachi2.core.http_requests import (
     SAFE_REQUEST_METHODS,
     get_requests_session,
 )
+from cachi2.core.utils import copy_file
 
 pkg_requests_session = get_requests_session(retry_options={"allowed_methods": SAFE_REQUEST_METHODS})
 
 log = logging.getLogger(__name__)
 
 
+class SharedDownloads:
+    """Files already downloaded in this process, to be copied instead of downloaded again.
+
+    Used when resolving many requests in one process. A downloaded file is only shared once the
+    package manager that downloaded it verified its checksum, see mark_verified(). A copy still
+    goes through the same verification as a fresh download would.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry of downloaded files."""
+        self._lock = threading.Lock()
+        self._downloaded: dict[Path, str] = {}
+        self._files: dict[str, Path] = {}
+
+    def add(self, url: str, path: Union[str, PathLike[str]]) -> None:
+        """Register a successfully downloaded file, it is not shared until it is verified."""
+        with self._lock:
+            self._downloaded[Path(path)] = url
+
+    def verified(self, path: Union[str, PathLike[str]]) -> None:
+        """Share a downloaded file, its checksum matched."""
+        with self._lock:
+            url = self._downloaded.pop(Path(path), None)
+            if url is not None:
+                self._files.setdefault(url, Path(path))
+
+    def copy_to(self, url: str, download_path: Union[str, PathLike[str]]) -> bool:
+        """Copy the file previously downloaded from the URL to download_path, if there is one.
+
+        :return: True if the file was copied, False if it needs to be downloaded
+        """
+        with self._lock:
+            downloaded = self._files.get(url)
+        if downloaded is None or downloaded == Path(download_path):
+            return False
+
+        try:
+            # do not write through a hardlink, see _open_new_file()
+            Path(download_path).unlink(missing_ok=True)
+            copy_file(downloaded, Path(download_path))
+        except OSError as e:
+            # e.g. the output directory of a previous request got removed in the meantime
+            log.debug("Could not reuse %s for %s, downloading it again: %s", downloaded, url, e)
+            return False
+
+        log.debug("Reused %s for %s", downloaded, url)
+        return True
+
+
+_shared_downloads: Optional[SharedDownloads] = None
+
+
+@contextlib.contextmanager
+def shared_downloads() -> Iterator[SharedDownloads]:
+    """Share downloaded files between all the requests resolved within this context."""
+    global _shared_downloads
+
+    _shared_downloads = SharedDownloads()
+    try:
+        yield _shared_downloads
+    finally:
+        _shared_downloads = None
+
+
+def _open_new_file(path: Union[str, PathLike[str]]) -> BinaryIO:
+    """Open a new file for writing, replacing the file at the path rather than truncating it.
+
+    The path may be a hardlink to other files that were verified already (see
+    cachi2.core.utils.link_file), writing to it in place would change all of them.
+    """
+    Path(path).unlink(missing_ok=True)
+    return open(path, "wb")
+
+
+def mark_verified(path: Union[str, PathLike[str]]) -> None:
+    """Mark a downloaded file as verified, to be shared with the other requests if it can be."""
+    if _shared_downloads:
+        _shared_downloads.verified(path)
+
+
 def download_binary_file(
     url: str,
     download_path: Union[str, PathLike[str]],
@@ -42,6 +126,9 @@ def download_binary_file(
     :param int chunk_size: Chunk size param for Response.iter_content()
     :raise FetchError: If download failed
     """
+    if _shared_downloads and _shared_downloads.copy_to(url, download_path):
+        return
+
     timeout = get_config().requests_timeout
     try:
         resp = pkg_requests_session.get(
@@ -51,10 +138,13 @@ def download_binary_file(
     except requests.RequestException as e:
         raise FetchError(f"Could not download {url}: {e}")
 
-    with open(download_path, "wb") as f:
+    with _open_new_file(download_path) as f:
         for chunk in resp.iter_content(chunk_size=chunk_size):
             f.write(chunk)
 
+    if _shared_downloads:
+        _shared_downloads.add(url, download_path)
+
 
 async def _async_download_binary_file(
     session: aiohttp_retry.RetryClient,
@@ -83,7 +173,7 @@ async def _async_download_binary_file(
         async with session.get(
             url, timeout=timeout, auth=auth, raise_for_status=True, ssl=ssl_context
         ) as resp:
-            with open(download_path, "wb") as f:
+            with _open_new_file(download_path) as f:
                 while True:
                     chunk = await resp.content.read(chunk_size)
                     if not chunk:
@@ -104,12 +194,23 @@ async def async_download_files(
     files_to_download: Dict[str, Union[str, PathLike[str]]],
     concurrency_limit: int,
     ssl_context: Optional[ssl.SSLContext] = None,
+    on_downloaded: Optional[Callable[[Path], None]] = None,
 ) -> None:
     """Asynchronous function to download files.
 
     :param files_to_download: Dict of files to download with file paths
     :param concurrency_limit: Max number of concurrent tasks (downloads).
+    :param on_downloaded: called with the path of each file as soon as it is downloaded,
+        runs in the event loop so it must not block (e.g. submit work to an executor)
     """
+    if _shared_downloads:
+        files_to_download = {
+            url: download_path
+            for url, download_path in files_to_download.items()
+            if not _shared_downloads.copy_to(url, download_path)
+        }
+        if not files_to_download:
+            return
 
     async def on_request_start(
         session: aiohttp.ClientSession,
@@ -132,6 +233,11 @@ async def async_download_files(
         trust_env=True,
     )
 
+    async def download(url: str, download_path: Union[str, PathLike[str]]) -> None:
+        await _async_download_binary_file(session, url, download_path, ssl_context=ssl_context)
+        if on_downloaded:
+            on_downloaded(Path(download_path))
+
     async with retry_client as session:
         tasks: Set[asyncio.Task] = set()
 
@@ -150,16 +256,14 @@ async def async_download_files(
                         t.cancel()
                     raise
 
-            tasks.add(
-                asyncio.create_task(
-                    _async_download_binary_file(
-                        session, url, download_path, ssl_context=ssl_context
-                    )
-                )
-            )
+            tasks.add(asyncio.create_task(download(url, download_path)))
 
         await asyncio.gather(*tasks)
 
+    if _shared_downloads:
+        for url, download_path in files_to_download.items():
+            _shared_downloads.add(url, download_path)
+
 
 def extract_git_info(vcs_url: str) -> dict[str, Any]:
     """
@@ -13,7 +13,7 @@ from cachi2.core.errors import PackageRejected
 from cachi2.core.models.input import Request
 from cachi2.core.models.output import RequestOutput
 from cachi2.core.models.sbom import Component
-from cachi2.core.package_managers.general import async_download_files
+from cachi2.core.package_managers.general import async_download_files, mark_verified
 from cachi2.core.package_managers.generic.models import GenericLockfileV1
 from cachi2.core.rooted_path import RootedPath
 
@@ -74,6 +74,7 @@ def _resolve_generic_lockfile(lockfile_path: Path, output_dir: RootedPath) -> li
     # verify checksums
     for artifact in lockfile.artifacts:
         must_match_any_checksum(artifact.filename, [artifact.formatted_checksum])
+        mark_verified(artifact.filename)
     return [artifact.get_sbom_component() for artifact in lockfile.artifacts]
 
 
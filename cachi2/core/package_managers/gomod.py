@@ -1,10 +1,15 @@
+import contextlib
+import difflib
+import hashlib
 import logging
 import os
 import re
 import shutil
 import subprocess
 import tempfile
+import time
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from functools import cached_property
 from itertools import chain
@@ -13,6 +18,7 @@ from types import TracebackType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Generator,
     Iterable,
     Iterator,
     Literal,
@@ -43,7 +49,14 @@ from cachi2.core.models.property_semantics import PropertySet
 from cachi2.core.models.sbom import Component
 from cachi2.core.rooted_path import RootedPath
 from cachi2.core.scm import get_repo_id
-from cachi2.core.utils import get_cache_dir, load_json_stream, run_cmd
+from cachi2.core.utils import (
+    file_lock,
+    get_cache_dir,
+    link_file,
+    load_json_stream,
+    run_cmd,
+    run_cmd_json_stream,
+)
 
 log = logging.getLogger(__name__)
 
@@ -54,6 +67,9 @@ VENDORING_DOC = f"{GOMOD_DOC}#vendoring"
 
 ModuleDict = dict[str, Any]
 
+# https://go.dev/ref/mod#environment-variables
+DEFAULT_GOPROXY = "https://proxy.golang.org,direct"
+
 
 class _ParsedModel(pydantic.BaseModel):
     """Attributes automatically get PascalCase aliases to make parsing Golang JSON easier.
@@ -271,16 +287,43 @@ class Go:
         if params is None:
             params = {}
 
+        cmd = self._command(cmd)
+        if retry:
+            return self._retry(cmd, **params)
+
+        return self._run(cmd, **params)
+
+    def json_stream(
+        self, cmd: list[str], params: Optional[dict] = None
+    ) -> Generator[Any, None, None]:
+        """Run a Go command with JSON output, parse the objects while the command is running.
+
+        Same as load_json_stream(go(cmd, params)), without holding the whole output in memory.
+
+        :param cmd: Go CLI options
+        :param params: additional subprocess arguments, e.g. 'env'
+        :returns: a generator of the parsed objects
+        """
+        cmd = self._command(cmd)
+        try:
+            log.debug(f"Running '{cmd}'")
+            yield from run_cmd_json_stream(cmd, params or {})
+        except subprocess.CalledProcessError as e:
+            rc = e.returncode
+            raise PackageManagerError(
+                f"Go execution failed: `{' '.join(cmd)}` failed with {rc=}"
+            ) from e
+
+    def install_toolchain(self) -> None:
+        """Install the desired toolchain now if it is missing, rather than on the first command."""
         # we check both values to silence the type checker complaining self._release might be None
         if self._install_toolchain and self._release:
             self._bin = self._install(self._release)
             self._install_toolchain = False
 
-        cmd = [self._bin] + cmd
-        if retry:
-            return self._retry(cmd, **params)
-
-        return self._run(cmd, **params)
+    def _command(self, cmd: list[str]) -> list[str]:
+        self.install_toolchain()
+        return [self._bin] + cmd
 
     @property
     def version(self) -> version.Version:
@@ -311,6 +354,12 @@ class Go:
                 )
         return self._release
 
+    @property
+    def binary(self) -> str:
+        """Path to the go binary of the toolchain (or the command in PATH), installs it if missing."""
+        self.install_toolchain()
+        return self._bin
+
     @staticmethod
     def _locate_toolchain(release: str) -> Optional[str]:
         """Given a release locate an alternative Go toolchain.
@@ -321,11 +370,15 @@ class Go:
         """
         local_cache = get_cache_dir()
         go_path_stub = f"go/{release}/bin/go"
-        for p in [Path("/usr/local/", go_path_stub), Path(local_cache, go_path_stub)]:
+        system_path = Path("/usr/local/", go_path_stub)
+        cache_path = Path(local_cache, go_path_stub)
+        for p in [system_path, cache_path]:
             status = "SUCCESS" if p.exists() else "FAIL"
 
             log.debug(f"Trying to locate Go toolchain at '{p}': {status}")
             if p.exists():
+                if p is cache_path:
+                    _ToolchainCache.mark_used(p.parent.parent)
                 return str(p)
 
         return None
@@ -354,26 +407,34 @@ class Go:
         """
         base_url = "golang.org/dl/"
         url = f"{base_url}{release}@latest"
-
-        # Download the go<release> shim to a temporary directory and wipe it after we're done
-        # Go would download the shim to $HOME too, but unlike 'go download' we can at least adjust
-        # 'go install' to point elsewhere using $GOPATH
-        with tempfile.TemporaryDirectory(prefix="cachi2", suffix="go-download") as td:
-            log.debug(f"Installing Go {release} toolchain shim from '{url}'")
-            env = {
-                "PATH": os.environ.get("PATH", ""),
-                "GOPATH": td,
-                "GOCACHE": str(Path(td, "cache")),
-            }
-            self._retry([self._bin, "install", url], env=env)
-
-            log.debug(f"Downloading Go {release} SDK")
-            self._retry([f"{td}/bin/{release}", "download"], env=env)
-
-            # move the newly downloaded SDK from $HOME/sdk to $HOME/.cache/cachi2/go
-            sdk_download_dir = Path.home() / f"sdk/{release}"
-            cachi2_go_dest_dir = get_cache_dir() / "go" / release
-            shutil.move(sdk_download_dir, cachi2_go_dest_dir)
+        toolchain_cache = _ToolchainCache(get_cache_dir() / "go")
+        cachi2_go_dest_dir = toolchain_cache.path / release
+
+        # Other cachi2 processes may be installing the same release at the same time
+        with file_lock(toolchain_cache.path / f".{release}.lock"):
+            if cachi2_go_dest_dir.joinpath("bin/go").exists():
+                log.debug(f"Go {release} toolchain was installed by another process")
+                toolchain_cache.mark_used(cachi2_go_dest_dir)
+                return str(cachi2_go_dest_dir / "bin/go")
+
+            # Download the go<release> shim to a temporary directory and wipe it after we're done
+            # Go would download the shim to $HOME too, but unlike 'go download' we can at least
+            # adjust 'go install' to point elsewhere using $GOPATH
+            with tempfile.TemporaryDirectory(prefix="cachi2", suffix="go-download") as td:
+                log.debug(f"Installing Go {release} toolchain shim from '{url}'")
+                env = {
+                    "PATH": os.environ.get("PATH", ""),
+                    "GOPATH": td,
+                    "GOCACHE": str(Path(td, "cache")),
+                }
+                self._retry([self._bin, "install", url], env=env)
+
+                log.debug(f"Downloading Go {release} SDK")
+                self._retry([f"{td}/bin/{release}", "download"], env=env)
+
+                # move the newly downloaded SDK from $HOME/sdk to $HOME/.cache/cachi2/go
+                sdk_download_dir = Path.home() / f"sdk/{release}"
+                toolchain_cache.add(sdk_download_dir, release)
 
         log.debug(f"Go {release} toolchain installed at: {cachi2_go_dest_dir}")
         return str(cachi2_go_dest_dir / "bin/go")
@@ -602,20 +663,16 @@ def _create_packages_from_parsed_data(
         return Package(relative_path=str(relative_path), module=module)
 
     def _find_parent_module_by_name(package: ParsedPackage) -> Module:
-        """Return the longest module name that is contained in package's import_path."""
-        path = Path(package.import_path)
-
-        matched_name = max(
-            filter(path.is_relative_to, indexed_modules.keys()),
-            key=len,  # type: ignore
-            default=None,
-        )
-
-        if not matched_name:
-            # This should be impossible
-            raise RuntimeError("Package parent module was not found")
+        """Return the module with the longest name that is contained in package's import_path."""
+        # look up the import path and then its parent paths, longest first
+        name = package.import_path
+        while name:
+            if module := indexed_modules.get(name):
+                return module
+            name = name.rpartition("/")[0]
 
-        return indexed_modules[matched_name]
+        # This should be impossible
+        raise RuntimeError("Package parent module was not found")
 
     def _resolve_package_relative_path(package: ParsedPackage, module: Module) -> str:
         """Return the path for a package relative to its parent module original name."""
@@ -663,58 +720,64 @@ def fetch_gomod_source(request: Request) -> RequestOutput:
     repo_name = _get_repository_name(request.source_dir)
     version_resolver = ModuleVersionResolver.from_repo_path(request.source_dir)
 
-    with GoCacheTemporaryDirectory(prefix="cachi2-") as tmp_dir:
-        gomod_download_dir = request.output_dir.join_within_root(
-            "deps/gomod/pkg/mod/cache/download"
-        )
-        gomod_download_dir.path.mkdir(exist_ok=True, parents=True)
-        for subpath in subpaths:
-            log.info("Fetching the gomod dependencies at subpath %s", subpath)
-
-            main_module_dir = request.source_dir.join_within_root(subpath)
-            go_work = GoWork(main_module_dir)
-
-            try:
-                resolve_result = _resolve_gomod(
-                    main_module_dir, request, Path(tmp_dir), version_resolver, go_work
-                )
-            except PackageManagerError:
-                log.error("Failed to fetch gomod dependencies")
-                raise
-
-            main_module = _create_main_module_from_parsed_data(
-                main_module_dir, repo_name, resolve_result.parsed_main_module
+    with _toolchain_cache(), GoCacheTemporaryDirectory(prefix="cachi2-") as tmp_dir:
+        with _module_cache() as module_cache:
+            gomod_download_dir = request.output_dir.join_within_root(
+                "deps/gomod/pkg/mod/cache/download"
             )
+            gomod_download_dir.path.mkdir(exist_ok=True, parents=True)
+            for subpath in subpaths:
+                log.info("Fetching the gomod dependencies at subpath %s", subpath)
+
+                main_module_dir = request.source_dir.join_within_root(subpath)
+                go_work = GoWork(main_module_dir)
+
+                try:
+                    resolve_result = _resolve_gomod(
+                        main_module_dir,
+                        request,
+                        Path(tmp_dir),
+                        version_resolver,
+                        go_work,
+                        module_cache,
+                    )
+                except PackageManagerError:
+                    log.error("Failed to fetch gomod dependencies")
+                    raise
+
+                main_module = _create_main_module_from_parsed_data(
+                    main_module_dir, repo_name, resolve_result.parsed_main_module
+                )
 
-            modules = [main_module]
-            modules.extend(
-                _create_modules_from_parsed_data(
-                    main_module,
-                    main_module_dir,
-                    resolve_result.parsed_modules,
-                    resolve_result.modules_in_go_sum,
-                    version_resolver,
-                    go_work,
+                modules = [main_module]
+                modules.extend(
+                    _create_modules_from_parsed_data(
+                        main_module,
+                        main_module_dir,
+                        resolve_result.parsed_modules,
+                        resolve_result.modules_in_go_sum,
+                        version_resolver,
+                        go_work,
+                    )
                 )
-            )
 
-            packages = _create_packages_from_parsed_data(modules, resolve_result.parsed_packages)
+                packages = _create_packages_from_parsed_data(
+                    modules, resolve_result.parsed_packages
+                )
 
-            components.extend(module.to_component() for module in modules)
-            components.extend(package.to_component() for package in packages)
+                components.extend(module.to_component() for module in modules)
+                components.extend(package.to_component() for package in packages)
 
-        tmp_download_cache_dir = Path(tmp_dir).joinpath("pkg/mod/cache/download")
-        if tmp_download_cache_dir.exists():
-            log.debug(
-                "Adding dependencies from %s to %s",
-                tmp_download_cache_dir,
-                gomod_download_dir,
-            )
-            shutil.copytree(
-                tmp_download_cache_dir,
-                str(gomod_download_dir),
-                dirs_exist_ok=True,
-            )
+            tmp_download_cache_dir = Path(tmp_dir).joinpath("pkg/mod/cache/download")
+            if tmp_download_cache_dir.exists():
+                log.debug(
+                    "Adding dependencies from %s to %s",
+                    tmp_download_cache_dir,
+                    gomod_download_dir,
+                )
+                _link_download_cache(tmp_download_cache_dir, gomod_download_dir.path)
+                if module_cache:
+                    module_cache.add_modules(tmp_download_cache_dir)
 
     return RequestOutput.from_obj_list(
         components=components,
@@ -725,6 +788,21 @@ def fetch_gomod_source(request: Request) -> RequestOutput:
     )
 
 
+def _link_download_cache(download_dir: Path, output_dir: Path) -> None:
+    """Add all the files of the module download cache to the output, except for the lock files.
+
+    The files are hardlinked when possible (falling back to copying), the go command never
+    modifies them once downloaded.
+    """
+    for path in download_dir.rglob("*"):
+        if path.is_dir() or path.suffix == ".lock":
+            continue
+
+        dest = output_dir / path.relative_to(download_dir)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        link_file(path, dest)
+
+
 def _create_main_module_from_parsed_data(
     main_module_dir: RootedPath, repo_name: str, parsed_main_module: ParsedModule
 ) -> Module:
@@ -916,6 +994,11 @@ def _disable_telemetry(go: Go, run_params: dict[str, Any]) -> None:
         go(["telemetry", "off"], run_params)
 
 
+# Only ask for the fields of ParsedPackage, decoding the rest (e.g. the Deps lists of every
+# package, most of the output) would take far more time than anything else done with it
+_PACKAGE_FIELDS = "ImportPath,Module,Standard"
+
+
 def _go_list_deps(
     go: Go, pattern: Literal["./...", "all"], run_params: Optional[dict[str, Any]] = None
 ) -> Iterator[ParsedPackage]:
@@ -926,11 +1009,31 @@ def _go_list_deps(
     The "all" pattern includes dependencies needed only for tests. Use it to get a more
     complete module list (roughly matching the list of downloaded modules).
     """
-    cmd = ["list", "-e", "-deps", "-json=ImportPath,Module,Standard,Deps", pattern]
-    return map(
-        ParsedPackage.model_validate,
-        load_json_stream(go(cmd, run_params)),
-    )
+    cmd = ["list", "-e", "-deps", f"-json={_PACKAGE_FIELDS}", pattern]
+    return map(ParsedPackage.model_validate, go.json_stream(cmd, run_params))
+
+
+def _go_list_main_deps(
+    go: Go, run_params: dict[str, Any]
+) -> tuple[list[ParsedPackage], list[ParsedPackage]]:
+    """Run go list -deps -json all, return all the packages and the ones "./..." would return.
+
+    Run from the main module, "./..." matches the packages of the main module and "all" matches
+    the same packages plus the packages needed only for tests. Select the "./..." packages and
+    their dependencies from the "all" result instead of having go load all the packages again.
+    """
+    packages = []
+    main_deps: set[str] = set()
+
+    cmd = ["list", "-e", "-deps", f"-json={_PACKAGE_FIELDS},Deps", "all"]
+    for obj in go.json_stream(cmd, run_params):
+        package = ParsedPackage.model_validate(obj)
+        packages.append(package)
+        if package.module and package.module.main:
+            main_deps.add(package.import_path)
+            main_deps.update(obj.get("Deps", []))
+
+    return packages, [package for package in packages if package.import_path in main_deps]
 
 
 def _parse_packages(go_work: GoWork, go: Go, run_params: dict[str, Any]) -> Iterator[ParsedPackage]:
@@ -945,21 +1048,23 @@ def _parse_packages(go_work: GoWork, go: Go, run_params: dict[str, Any]) -> Iter
     :param run_params: Additional run cmd params
     :return: ParsedPackage iterator
     """
-    all_packages: Iterable[ParsedPackage] = []
-
     if not go_work:
         log.debug("Querying for list of packages")
-        all_packages = _go_list_deps(go, "./...", run_params)
-    else:
-        # If there are workspace modules we need to run 'list -e ./...' under every local module
-        # path because 'go list' command isn't fully properly workspace context aware
-        for wsp in go_work.workspace_paths(go, run_params):
-            log.debug(f"Querying workspace module '{wsp.path}' for list of packages")
+        return _go_list_deps(go, "./...", run_params)
+
+    def list_packages(wsp: RootedPath) -> list[ParsedPackage]:
+        log.debug(f"Querying workspace module '{wsp.path}' for list of packages")
+        return list(_go_list_deps(go, "./...", run_params | {"cwd": wsp.path}))
+
+    # If there are workspace modules we need to run 'list -e ./...' under every local module
+    # path because 'go list' command isn't fully properly workspace context aware. The queries
+    # are independent of each other, run them concurrently.
+    with ThreadPoolExecutor(get_config().concurrency_limit) as executor:
+        packages_by_workspace = list(
+            executor.map(list_packages, go_work.workspace_paths(go, run_params))
+        )
 
-            packages = list(_go_list_deps(go, "./...", run_params | {"cwd": wsp.path}))
-            log.debug(packages)
-            all_packages = chain(all_packages, packages)
-    return iter(all_packages)
+    return chain.from_iterable(packages_by_workspace)
 
 
 def _resolve_gomod(
@@ -968,6 +1073,7 @@ def _resolve_gomod(
     tmp_dir: Path,
     version_resolver: "ModuleVersionResolver",
     go_work: GoWork,
+    module_cache: Optional["_PersistentModuleCache"] = None,
 ) -> ResolvedGoModule:
     """
     Resolve and fetch gomod dependencies for given app source archive.
@@ -975,6 +1081,7 @@ def _resolve_gomod(
     :param app_dir: the full path to the application source code
     :param request: the Cachi2 request this is for
     :param tmp_dir: one temporary directory for all go modules
+    :param module_cache: the persistent module cache to download the modules from, if enabled
     :return: a dict containing the Go module itself ("module" key), the list of dictionaries
         representing the dependencies ("module_deps" key), the top package level dependency
         ("pkg" key), and a list of dictionaries representing the package level dependencies
@@ -1005,7 +1112,9 @@ def _resolve_gomod(
         "GOTOOLCHAIN": "auto",
     }
 
-    if config.goproxy_url:
+    if module_cache:
+        env["GOPROXY"] = module_cache.goproxy(config.goproxy_url or DEFAULT_GOPROXY)
+    elif config.goproxy_url:
         env["GOPROXY"] = config.goproxy_url
 
     if "cgo-disable" in request.flags:
@@ -1016,13 +1125,19 @@ def _resolve_gomod(
 
     run_params = {"env": env, "cwd": app_dir}
 
+    # Installing a missing toolchain takes a while, parse go.sum in the meantime (with workspaces,
+    # finding the go.sum files already needs the toolchain)
+    with ThreadPoolExecutor(1) as executor:
+        toolchain_installed = executor.submit(go.install_toolchain)
+        if not go_work:
+            modules_in_go_sum = _parse_go_sum(app_dir.join_within_root("go.sum"))
+        toolchain_installed.result()
+
     # Explicitly disable toolchain telemetry for go >= 1.23
     _disable_telemetry(go, run_params)
 
     if go_work:
         modules_in_go_sum = _parse_go_sum_from_workspaces(go_work, go, run_params)
-    else:
-        modules_in_go_sum = _parse_go_sum(app_dir.join_within_root("go.sum"))
 
     # Vendor dependencies if the gomod-vendor flag is set
     if should_vendor:
@@ -1038,14 +1153,22 @@ def _resolve_gomod(
         go_work, go, run_params, app_dir, version_resolver
     )
 
-    deps = _go_list_deps(go, "all", run_params)
+    deps: Iterable[ParsedPackage]
+    if go_work:
+        deps = _go_list_deps(go, "all", run_params)
+    else:
+        deps, main_packages = _go_list_main_deps(go, run_params)
     package_modules = [pkg.module for pkg in deps if pkg.module and not pkg.module.main]
     package_modules.extend(workspace_modules)
     all_modules = _deduplicate_resolved_modules(package_modules, downloaded_modules)
     _validate_local_replacements(all_modules, app_dir)
 
     log.info("Retrieving the list of packages")
-    all_packages = _parse_packages(go_work, go, run_params)
+    all_packages: Iterable[ParsedPackage]
+    if go_work:
+        all_packages = _parse_packages(go_work, go, run_params)
+    else:
+        all_packages = main_packages
 
     return ResolvedGoModule(main_module, all_modules, all_packages, modules_in_go_sum)
 
@@ -1062,7 +1185,7 @@ def _parse_local_modules(
 
     :return: A tuple containing the main module and a list of workspaces
     """
-    modules_json_stream = go(["list", "-e", "-m", "-json"], run_params).rstrip()
+    modules_json_stream = go.json_stream(["list", "-e", "-m", "-json"], run_params)
     main_module_dict, workspace_dict_list = _process_modules_json_stream(
         app_dir, modules_json_stream
     )
@@ -1083,7 +1206,7 @@ def _parse_local_modules(
 
 
 def _process_modules_json_stream(
-    app_dir: RootedPath, modules_json_stream: str
+    app_dir: RootedPath, modules_json_stream: Iterable[ModuleDict]
 ) -> tuple[ModuleDict, list[ModuleDict]]:
     """Process the json stream returned by "go list -m -json".
 
@@ -1091,13 +1214,13 @@ def _process_modules_json_stream(
     case a go.work file is present in the repository.
 
     :param app_dir: the path to the module directory
-    :param modules_json_stream: the json stream returned by "go list -m -json"
+    :param modules_json_stream: the objects parsed from the output of "go list -m -json"
     :return: A tuple containing the main module and a list of workspaces
     """
     module_list = []
     main_module = None
 
-    for module in load_json_stream(modules_json_stream):
+    for module in modules_json_stream:
         if module["Dir"] == str(app_dir):
             main_module = module
         else:
@@ -1238,6 +1361,204 @@ class GoCacheTemporaryDirectory(tempfile.TemporaryDirectory[str]):
             super().__exit__(exc, value, tb)
 
 
+class _PersistentModuleCache:
+    """
+    A Go module download cache that is kept between cachi2 runs, see gomod_persistent_cache.
+
+    The cache is the first entry of GOPROXY, modules that are not in the cache are downloaded
+    from the configured GOPROXY as usual. The go command verifies the modules against go.sum
+    (and the checksum database) no matter which proxy they come from. Only the files served by
+    a module proxy are kept, the modules that have not been used for max_age days are removed.
+    """
+
+    _MODULE_FILE_SUFFIXES = (".info", ".mod", ".zip")
+
+    def __init__(self, path: Path, max_age: int) -> None:
+        """Initialize a _PersistentModuleCache.
+
+        :param path: the directory of the cache
+        :param max_age: remove the modules that have not been used for this many days
+        """
+        self.download_dir = path / "download"
+        self._lock_file = path / ".lock"
+        self._max_age = max_age
+
+    def goproxy(self, fallback: str) -> str:
+        """Get the GOPROXY value to use the cache, falling back to the fallback GOPROXY."""
+        return f"file://{self.download_dir.resolve()},{fallback}"
+
+    @contextlib.contextmanager
+    def use(self) -> Iterator[None]:
+        """Use the cache, other processes can use it at the same time but cannot evict modules."""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        with file_lock(self._lock_file, shared=True):
+            yield
+
+    def add_modules(self, download_dir: Path) -> None:
+        """Add the modules from a module download cache, mark the ones already cached as used."""
+        for path in download_dir.rglob("*"):
+            if path.parent.name != "@v" or not path.name.endswith(self._MODULE_FILE_SUFFIXES):
+                continue
+
+            cached_path = self.download_dir / path.relative_to(download_dir)
+            if cached_path.exists():
+                os.utime(cached_path)
+                continue
+
+            # other processes may be reading the cache, only complete files can appear there
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cached_path.with_name(f".{cached_path.name}.{os.getpid()}")
+            link_file(path, tmp_path)
+            tmp_path.replace(cached_path)
+
+    def evict(self) -> None:
+        """Remove the modules that have not been used for max_age days, if no one uses the cache."""
+        with file_lock(self._lock_file, blocking=False) as locked:
+            if not locked:
+                log.debug("The Go module cache is in use, not removing unused modules")
+                return
+
+            max_mtime = time.time() - self._max_age * 24 * 3600
+            for path in self.download_dir.rglob("*"):
+                if path.is_file() and path.stat().st_mtime < max_mtime:
+                    log.debug("Removing %s from the Go module cache", path)
+                    path.unlink()
+
+
+@contextlib.contextmanager
+def _module_cache() -> Iterator[Optional[_PersistentModuleCache]]:
+    """Use the persistent module cache if enabled, remove the unused modules afterwards."""
+    config = get_config()
+    if not config.gomod_persistent_cache:
+        yield None
+        return
+
+    module_cache = _PersistentModuleCache(
+        get_cache_dir() / "gomod", config.gomod_persistent_cache_max_age
+    )
+    with module_cache.use():
+        yield module_cache
+    module_cache.evict()
+
+
+class _ToolchainCache:
+    """
+    The Go toolchains installed by cachi2, see Go._install and gomod_toolchain_cache_size.
+
+    The mtime of a toolchain directory is the last time cachi2 used the toolchain, the least
+    recently used toolchains are removed when there are more than the configured number of them.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize a _ToolchainCache.
+
+        :param path: the directory of the cache, every toolchain is in a <release> subdirectory
+        """
+        self.path = path
+        self._lock_file = path / ".lock"
+
+    @staticmethod
+    def mark_used(toolchain_dir: Path) -> None:
+        """Mark a toolchain as used, failing to do so is not an error."""
+        try:
+            os.utime(toolchain_dir)
+        except OSError as e:
+            log.debug("Failed to mark the Go toolchain at %s as used: %s", toolchain_dir, e)
+
+    def add(self, sdk_dir: Path, release: str) -> None:
+        """Move an SDK to the cache, to be used as the toolchain for the release.
+
+        Other processes may be looking for the toolchain, only a complete one can appear there.
+        Needs to be called with the lock of the release held, see Go._install.
+        """
+        tmp_dir = self.path / f".{release}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.move(sdk_dir, tmp_dir)
+        # remove the leftovers of an installation that was interrupted
+        shutil.rmtree(self.path / release, ignore_errors=True)
+        tmp_dir.rename(self.path / release)
+
+    @contextlib.contextmanager
+    def use(self) -> Iterator[None]:
+        """Use the cache, other processes can use it at the same time but cannot prune it."""
+        with file_lock(self._lock_file, shared=True):
+            yield
+
+    def prune(self, max_size: int) -> None:
+        """Remove the least recently used toolchains beyond max_size, if no one uses the cache."""
+        with file_lock(self._lock_file, blocking=False) as locked:
+            if not locked:
+                log.debug("The Go toolchain cache is in use, not removing unused toolchains")
+                return
+
+            toolchain_dirs = [
+                path
+                for path in self.path.iterdir()
+                if not path.name.startswith(".") and path.joinpath("bin", "go").exists()
+            ]
+            toolchain_dirs.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+            for toolchain_dir in toolchain_dirs[max_size:]:
+                log.info("Removing the unused Go toolchain %s", toolchain_dir)
+                shutil.rmtree(toolchain_dir)
+
+
+@contextlib.contextmanager
+def _toolchain_cache(prune: bool = True) -> Iterator[None]:
+    """Use the toolchain cache, remove the least recently used toolchains afterwards.
+
+    Does nothing if cachi2 never installed a toolchain, e.g. in the container image where the
+    toolchains are pre-installed.
+
+    :param prune: False to keep all the toolchains, e.g. the ones that were just prefetched
+    """
+    toolchain_cache = _ToolchainCache(get_cache_dir() / "go")
+    if not toolchain_cache.path.is_dir():
+        yield
+        return
+
+    with toolchain_cache.use():
+        yield
+    if prune:
+        toolchain_cache.prune(get_config().gomod_toolchain_cache_size)
+
+
+def prefetch_toolchains(go_mod_files: Iterable[RootedPath], releases: Iterable[str]) -> list[str]:
+    """Install the Go toolchains needed to process Go modules ahead of time.
+
+    :param go_mod_files: install the toolchains cachi2 would use for these go.mod files
+    :param releases: install these Go releases, e.g. go1.21.0
+    :return: the paths to the go binaries of the toolchains
+    :raises PackageManagerError: if installing a toolchain fails
+    """
+    cache_size = get_config().gomod_toolchain_cache_size
+
+    # the prefetched toolchains are not pruned, they are all needed
+    with _toolchain_cache(prune=False):
+        # locating a toolchain marks it as used, it must not be pruned until it is
+        gos = [_setup_go_toolchain(go_mod_file) for go_mod_file in go_mod_files]
+        gos.extend(Go(release=release) for release in releases)
+
+        # every release only once, no matter how many go.mod files need it
+        by_release = {go.release: go for go in gos}
+
+        with ThreadPoolExecutor(get_config().concurrency_limit) as executor:
+            list(executor.map(Go.install_toolchain, by_release.values()))
+
+    if len(by_release) > cache_size:
+        log.warning(
+            "Prefetched %d Go toolchains, but only the %d most recently used ones are kept"
+            " after processing Go modules. Increase gomod_toolchain_cache_size to keep all"
+            " of them.",
+            len(by_release),
+            cache_size,
+        )
+
+    for release, go in sorted(by_release.items()):
+        log.info("Go %s toolchain: %s", release, go.binary)
+
+    return [go.binary for _, go in sorted(by_release.items())]
+
+
 class ModuleVersionResolver:
     """Resolves the versions of Go modules in a git repository."""
 
@@ -1248,9 +1569,31 @@ class ModuleVersionResolver:
 
     @classmethod
     def from_repo_path(cls, repo_path: RootedPath) -> "Self":
-        """Fetch tags from a git Repo and return a ModuleVersionResolver."""
+        """Fetch tags from a git Repo and return a ModuleVersionResolver.
+
+        The fetch is skipped if the tags were fetched for the same commit less than
+        gomod_tags_fetch_ttl seconds ago, or if the repository already has tags and
+        gomod_skip_tags_fetch_if_present is enabled.
+        """
+        config = get_config()
         repo = git.Repo(repo_path)
         commit = repo.commit(repo.rev_parse("HEAD").hexsha)
+
+        if config.gomod_skip_tags_fetch_if_present and repo.tags:
+            log.debug(
+                "Not fetching the tags, the Git repository %s has tags", repo.working_tree_dir
+            )
+            return cls(repo, commit)
+
+        fetch_marker = cls._tags_fetch_marker(repo, commit)
+        try:
+            fetched_ago = time.time() - fetch_marker.stat().st_mtime
+        except FileNotFoundError:
+            fetched_ago = None
+        if fetched_ago is not None and fetched_ago < config.gomod_tags_fetch_ttl:
+            log.debug("Not fetching the tags, they were fetched recently for %s", commit.hexsha)
+            return cls(repo, commit)
+
         try:
             repo.remote().fetch(force=True, tags=True)
         except Exception as ex:
@@ -1259,8 +1602,22 @@ class ModuleVersionResolver:
                 f"for {repo.working_tree_dir}"
             )
 
+        if config.gomod_tags_fetch_ttl > 0:
+            try:
+                fetch_marker.parent.mkdir(parents=True, exist_ok=True)
+                fetch_marker.touch()
+            except OSError as e:
+                log.debug("Failed to record the fetch of the tags in %s: %s", fetch_marker, e)
+
         return cls(repo, commit)
 
+    @staticmethod
+    def _tags_fetch_marker(repo: git.Repo, commit: git.objects.commit.Commit) -> Path:
+        """Get the file whose mtime is the last time the tags were fetched for the commit."""
+        key = f"{Path(repo.git_dir).resolve()}:{commit.hexsha}"
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return get_cache_dir() / "gomod" / "tag-fetches" / name
+
     @cached_property
     def _commit_tags(self) -> list[str]:
         """Return the git tags pointing to the current commit."""
@@ -1271,6 +1628,46 @@ class ModuleVersionResolver:
         """Return all of the git tags pointing to the current and preceding commits."""
         return self._get_commit_tags(all_reachable=True)
 
+    @cached_property
+    def _commit_semver_tags(self) -> dict[tuple[Optional[str], int], str]:
+        """Return the highest semver tags on the current commit, see _index_semver_tags."""
+        return self._index_semver_tags(self._commit_tags)
+
+    @cached_property
+    def _all_semver_tags(self) -> dict[tuple[Optional[str], int], str]:
+        """Return the highest semver tags on the current and preceding commits."""
+        return self._index_semver_tags(self._all_tags)
+
+    def _index_semver_tags(self, tag_names: list[str]) -> dict[tuple[Optional[str], int], str]:
+        """
+        Find the highest semantic version tag for each module subpath and major version.
+
+        Parsing the tags once makes resolving the versions of many modules in the same
+        repository cheap.
+
+        :param tag_names: the tags to index
+        :return: a mapping of (subpath, major version) to the name of the highest tag, the
+            subpath is None for the tags of the module at the root of the repository
+        """
+        highest: dict[tuple[Optional[str], int], tuple[semver.version.Version, str]] = {}
+
+        for tag_name in tag_names:
+            subpath, _, version_part = tag_name.rpartition("/")
+            if not version_part.startswith("v"):
+                continue
+
+            try:
+                semantic_version = self._get_semantic_version_from_tag(tag_name, subpath)
+            except ValueError:
+                log.debug("%s is not a semantic version tag", tag_name)
+                continue
+
+            key = (subpath or None, semantic_version.major)
+            if key not in highest or semantic_version > highest[key][0]:
+                highest[key] = (semantic_version, tag_name)
+
+        return {key: tag_name for key, (_, tag_name) in highest.items()}
+
     def _get_commit_tags(self, all_reachable: bool = False) -> list[str]:
         """
         Return all of the tags associated with the current commit.
@@ -1427,32 +1824,11 @@ class ModuleVersionResolver:
         :param subpath: path to the module, relative to the root repository folder
         :return: the highest semantic version tag if one is found
         """
-        tag_names = self._all_tags if all_reachable else self._commit_tags
-
-        # Keep only semantic version tags related to the path being processed
-        prefix = f"{subpath}/v" if subpath else "v"
-        filtered_tags = [tag_name for tag_name in tag_names if tag_name.startswith(prefix)]
-
-        not_semver_tag_msg = "%s is not a semantic version tag"
-        highest: Optional[dict[str, Any]] = None
+        semver_tags = self._all_semver_tags if all_reachable else self._commit_semver_tags
 
-        for tag_name in filtered_tags:
-            try:
-                semantic_version = self._get_semantic_version_from_tag(tag_name, subpath)
-            except ValueError:
-                log.debug(not_semver_tag_msg, tag_name)
-                continue
-
-            # If the major version of the semantic version tag doesn't match the Go module's major
-            # version, then ignore it
-            if semantic_version.major != major_version:
-                continue
-
-            if highest is None or semantic_version > highest["semver"]:
-                highest = {"tag": tag_name, "semver": semantic_version}
-
-        if highest:
-            return self._repo.tags[highest["tag"]]
+        tag_name = semver_tags.get((subpath or None, major_version))
+        if tag_name:
+            return self._repo.tags[tag_name]
 
         return None
 
@@ -1617,8 +1993,9 @@ def _vendor_deps(
     log.info("Vendoring the gomod dependencies")
 
     cmdscope = "work" if has_workspace else "mod"
+    vendor_before = _VendorSnapshot.take(context_dir)
     go([cmdscope, "vendor"], run_params)
-    if _vendor_changed(context_dir):
+    if _vendor_changed(context_dir, vendor_before):
         raise PackageRejected(
             reason=(
                 "The content of the vendor directory is not consistent with go.mod. "
@@ -1633,32 +2010,92 @@ def _vendor_deps(
     return _parse_vendor(context_dir)
 
 
-def _vendor_changed(context_dir: RootedPath) -> bool:
+class _VendorSnapshot(NamedTuple):
+    """The content of a vendor directory, to find out if `go mod vendor` changed it."""
+
+    # path relative to the repository root => (size, sha256) of every file in the directory
+    files: dict[str, tuple[int, str]]
+    modules_txt: Optional[str]
+
+    @classmethod
+    def take(cls, context_dir: RootedPath) -> "_VendorSnapshot":
+        """Take a snapshot of the vendor directory, hashing the files in parallel.
+
+        :param context_dir: main module dir OR workspace context (directory containing go.work)
+        """
+        vendor = context_dir.join_within_root("vendor").path
+        walk_entries = list(os.walk(vendor))
+
+        # Vendor directories tend to have a lot of small files, hash each directory as one task
+        files = {}
+        with ThreadPoolExecutor(get_config().concurrency_limit) as executor:
+            all_digests = executor.map(_digest_directory_files, walk_entries)
+            for (dirpath, _, _), digests in zip(walk_entries, all_digests):
+                subpath = Path(dirpath).relative_to(context_dir.root).as_posix()
+                for filename, digest in digests.items():
+                    files[f"{subpath}/{filename}"] = digest
+
+        try:
+            modules_txt: Optional[str] = vendor.joinpath("modules.txt").read_text()
+        except FileNotFoundError:
+            modules_txt = None
+
+        return cls(files, modules_txt)
+
+
+def _digest_directory_files(
+    walk_entry: tuple[str, list[str], list[str]],
+) -> dict[str, tuple[int, str]]:
+    """Get the size and sha256 digest of the files in a directory, symlinks are not followed."""
+    dirpath, _, filenames = walk_entry
+    digests = {}
+    for filename in filenames:
+        path = os.path.join(dirpath, filename)
+        if os.path.islink(path):
+            content = os.readlink(path).encode()
+        else:
+            with open(path, "rb") as f:
+                content = f.read()
+        digests[filename] = (len(content), hashlib.sha256(content).hexdigest())
+    return digests
+
+
+def _vendor_changed(context_dir: RootedPath, vendor_before: _VendorSnapshot) -> bool:
     """Check for changes in the vendor directory.
 
+    Compares the current content of the directory with a snapshot taken before vendoring,
+    the git index of the repository is not involved.
+
     :param context_dir: main module dir OR workspace context (directory containing go.work)
+    :param vendor_before: the snapshot of the vendor directory taken before vendoring
     """
-    repo_root = context_dir.root
-    vendor = context_dir.path.relative_to(repo_root).joinpath("vendor")
-    modules_txt = vendor / "modules.txt"
-
-    repo = git.Repo(repo_root)
-    # Add untracked files but do not stage them
-    repo.git.add("--intent-to-add", "--force", "--", context_dir)
-
-    try:
-        # Diffing modules.txt should catch most issues and produce relatively useful output
-        modules_txt_diff = repo.git.diff("--", str(modules_txt))
-        if modules_txt_diff:
-            log.error("%s changed after vendoring:\n%s", modules_txt, modules_txt_diff)
-            return True
-
-        # Show only if files were added/deleted/modified, not the full diff
-        vendor_diff = repo.git.diff("--name-status", "--", str(vendor))
-        if vendor_diff:
-            log.error("%s directory changed after vendoring:\n%s", vendor, vendor_diff)
-            return True
-    finally:
-        repo.git.reset("--", context_dir)
+    vendor_after = _VendorSnapshot.take(context_dir)
+    vendor = context_dir.path.relative_to(context_dir.root).joinpath("vendor").as_posix()
+    modules_txt = f"{vendor}/modules.txt"
+
+    # Diffing modules.txt should catch most issues and produce relatively useful output
+    if vendor_before.modules_txt != vendor_after.modules_txt:
+        modules_txt_diff = difflib.unified_diff(
+            (vendor_before.modules_txt or "").splitlines(keepends=True),
+            (vendor_after.modules_txt or "").splitlines(keepends=True),
+            fromfile="/dev/null" if vendor_before.modules_txt is None else f"a/{modules_txt}",
+            tofile="/dev/null" if vendor_after.modules_txt is None else f"b/{modules_txt}",
+        )
+        log.error("%s changed after vendoring:\n%s", modules_txt, "".join(modules_txt_diff))
+        return True
+
+    # Show only if files were added/deleted/modified, not the full diff
+    vendor_diff = []
+    for path in sorted(vendor_before.files.keys() | vendor_after.files.keys()):
+        if path not in vendor_before.files:
+            vendor_diff.append(f"A\t{path}")
+        elif path not in vendor_after.files:
+            vendor_diff.append(f"D\t{path}")
+        elif vendor_before.files[path] != vendor_after.files[path]:
+            vendor_diff.append(f"M\t{path}")
+
+    if vendor_diff:
+        log.error("%s directory changed after vendoring:\n%s", vendor, "\n".join(vendor_diff))
+        return True
 
     return False
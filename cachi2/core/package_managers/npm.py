@@ -1,5 +1,4 @@
 import asyncio
-import copy
 import fnmatch
 import functools
 import json
@@ -18,9 +17,10 @@ from cachi2.core.models.input import Request
 from cachi2.core.models.output import ProjectFile, RequestOutput
 from cachi2.core.models.property_semantics import PropertySet
 from cachi2.core.models.sbom import Component
-from cachi2.core.package_managers.general import async_download_files
+from cachi2.core.package_managers.general import async_download_files, mark_verified
 from cachi2.core.rooted_path import RootedPath
 from cachi2.core.scm import RepoID, clone_as_tarball, get_repo_id
+from cachi2.core.utils import link_file
 
 DEPENDENCY_TYPES = (
     "dependencies",
@@ -37,6 +37,10 @@ log = logging.getLogger(__name__)
 NPM_REGISTRY_CNAMES = ("registry.npmjs.org", "registry.yarnpkg.com")
 
 
+NormalizedUrl = NewType("NormalizedUrl", str)
+ResolvedUrlType = Literal["registry", "git", "file", "https"]
+
+
 class NpmComponentInfo(TypedDict):
     """Contains the data needed to generate an npm SBOM component."""
 
@@ -59,6 +63,9 @@ class ResolvedNpmPackage(TypedDict):
 class Package:
     """A npm package."""
 
+    # lockfiles of large monorepos have tens of thousands of packages
+    __slots__ = ("name", "path", "_package_dict", "_classified_url")
+
     def __init__(self, name: str, path: str, package_dict: dict[str, Any]) -> None:
         """Initialize a Package.
 
@@ -69,6 +76,7 @@ class Package:
         self.name = name
         self.path = path
         self._package_dict = package_dict
+        self._classified_url: Optional[tuple[NormalizedUrl, ResolvedUrlType]] = None
 
     @property
     def package_dict(self) -> dict[str, Any]:
@@ -118,6 +126,21 @@ class Package:
     def resolved_url(self, resolved_url: str) -> None:
         """Set the location where the package should be resolved from."""
         self._package_dict["resolved"] = resolved_url
+        self._classified_url = None
+
+    @property
+    def classified_url(self) -> Optional[tuple[NormalizedUrl, ResolvedUrlType]]:
+        """Get the normalized resolved url and its type, None if the package has no resolved url.
+
+        Computed only once, it is needed for the SBOM, the downloads and the updated lockfile.
+        """
+        resolved_url = self.resolved_url
+        if not resolved_url:
+            return None
+        if self._classified_url is None:
+            normalized_url = _normalize_resolved_url(resolved_url)
+            self._classified_url = (normalized_url, _classify_resolved_url(normalized_url))
+        return self._classified_url
 
     @property
     def bundled(self) -> bool:
@@ -270,9 +293,8 @@ class PackageLock:
             ).to_string()
 
             missing_hash_in_file = None
-            if package.resolved_url:  # dependency is not bundled
-                resolved_url = _normalize_resolved_url(package.resolved_url)
-                dep_type = _classify_resolved_url(resolved_url)
+            if classified_url := package.classified_url:  # dependency is not bundled
+                _, dep_type = classified_url
 
                 if not package.integrity:
                     if dep_type in ("registry", "https"):
@@ -369,18 +391,13 @@ class _Purlifier:
         )
 
 
-NormalizedUrl = NewType("NormalizedUrl", str)
-
-
 def _normalize_resolved_url(resolved_url: str) -> NormalizedUrl:
     if resolved_url.startswith(("github:", "gitlab:", "bitbucket:")):
         resolved_url = _update_vcs_url_with_full_hostname(resolved_url)
     return NormalizedUrl(resolved_url)
 
 
-def _classify_resolved_url(
-    resolved_url: NormalizedUrl,
-) -> Literal["registry", "git", "file", "https"]:
+def _classify_resolved_url(resolved_url: NormalizedUrl) -> ResolvedUrlType:
     url = urlparse(resolved_url)
     if url.hostname in NPM_REGISTRY_CNAMES:
         return "registry"
@@ -483,7 +500,9 @@ def _clone_repo_pack_archive(
 
 
 def _get_npm_dependencies(
-    download_dir: RootedPath, deps_to_download: Dict[str, Dict[str, Optional[str]]]
+    download_dir: RootedPath,
+    deps_to_download: Dict[str, Dict[str, Optional[str]]],
+    tarball_store: Optional[dict[str, RootedPath]] = None,
 ) -> Dict[NormalizedUrl, RootedPath]:
     """
     Download npm dependencies.
@@ -493,10 +512,16 @@ def _get_npm_dependencies(
 
     :param download_dir: Destination directory path where deps will be downloaded
     :param deps_to_download: Dict of dependencies to be downloaded.
+    :param tarball_store: the tarballs of the request by their integrity, dependencies with
+        the same integrity are hardlinked instead of downloaded again (the dict gets updated)
     :return: Dictionary of Resolved URL dependencies with downloaded paths
     """
+    if tarball_store is None:
+        tarball_store = {}
     files_to_download: dict[str, dict[str, Any]] = {}
     download_paths = {}
+    # paths to link to a tarball with the same integrity, once it is downloaded and verified
+    links: list[tuple[RootedPath, RootedPath]] = []
     for url, info in deps_to_download.items():
         url = _normalize_resolved_url(url)
         dep_type = _classify_resolved_url(url)
@@ -531,6 +556,12 @@ def _get_npm_dependencies(
                 directory = os.path.dirname(download_paths[url])
                 os.makedirs(directory, exist_ok=True)
 
+            if integrity := info["integrity"]:
+                if integrity in tarball_store:
+                    links.append((tarball_store[integrity], download_paths[url]))
+                    continue
+                tarball_store[integrity] = download_paths[url]
+
             files_to_download[url] = {
                 "download_path": download_paths[url],
                 "integrity": info["integrity"],
@@ -549,9 +580,14 @@ def _get_npm_dependencies(
             must_match_any_checksum(
                 item["download_path"], [ChecksumInfo.from_sri(str(item["integrity"]))]
             )
+            mark_verified(item["download_path"])
         else:
             log.warning("Missing integrity for %s, integrity check skipped.", url)
 
+    for tarball, download_path in links:
+        if download_path != tarball:
+            link_file(tarball.path, download_path.path)
+
     return download_paths
 
 
@@ -587,19 +623,19 @@ def _update_package_lock_with_local_paths(
                     if _should_replace_dependency(dependency_version):
                         package.package_dict[dep_type].update({dependency: ""})
 
-        if package.path and package.resolved_url:
-            url = _normalize_resolved_url(str(package.resolved_url))
+        if package.path and package.classified_url:
+            url, url_type = package.classified_url
         else:
             continue
 
         # Remove integrity for git sources, their integrity checksum will change when
         # constructing tar archive from cloned repository
-        if _classify_resolved_url(url) == "git":
+        if url_type == "git":
             if package.integrity:
                 package.integrity = ""
 
         # Replace the resolved_url of all packages, unless it's already a file url:
-        if _classify_resolved_url(url) != "file":
+        if url_type != "file":
             templated_abspath = Path("${output_dir}", download_paths[url].subpath_from_root)
             package.resolved_url = f"file://{templated_abspath}"
 
@@ -672,9 +708,13 @@ def fetch_npm_source(request: Request) -> RequestOutput:
 
     npm_deps_dir = request.output_dir.join_within_root("deps", "npm")
     npm_deps_dir.path.mkdir(parents=True, exist_ok=True)
+    # packages of a monorepo tend to have the same dependencies
+    tarball_store: dict[str, RootedPath] = {}
 
     for package in request.npm_packages:
-        info = _resolve_npm(request.source_dir.join_within_root(package.path), npm_deps_dir)
+        info = _resolve_npm(
+            request.source_dir.join_within_root(package.path), npm_deps_dir, tarball_store
+        )
         component_info.append(info["package"])
 
         for dependency in info["dependencies"]:
@@ -690,10 +730,15 @@ def fetch_npm_source(request: Request) -> RequestOutput:
     )
 
 
-def _resolve_npm(pkg_path: RootedPath, npm_deps_dir: RootedPath) -> ResolvedNpmPackage:
+def _resolve_npm(
+    pkg_path: RootedPath,
+    npm_deps_dir: RootedPath,
+    tarball_store: Optional[dict[str, RootedPath]] = None,
+) -> ResolvedNpmPackage:
     """Resolve and fetch npm dependencies for the given package.
 
     :param pkg_path: the path to the directory containing npm-shrinkwrap.json or package-lock.json
+    :param tarball_store: the verified tarballs of the request, see _get_npm_dependencies
     :return: a dictionary that has the following keys:
         ``package`` which is the dict representing the main Package,
         ``dependencies`` which is a list of dicts representing the package Dependencies
@@ -721,13 +766,16 @@ def _resolve_npm(pkg_path: RootedPath, npm_deps_dir: RootedPath) -> ResolvedNpmP
             solution="Ensure that there are no 'node_modules' directories in your repo",
         )
 
-    original_package_lock = PackageLock.from_file(package_lock_path)
-    package_lock = copy.deepcopy(original_package_lock)
+    package_lock = PackageLock.from_file(package_lock_path)
+    # The SBOM describes the lockfile from the repository, get the components before the lockfile
+    # gets updated in place (rather than keeping a deep copy of the whole lockfile for them)
+    main_package = package_lock.get_main_package()
+    dependencies = package_lock.get_sbom_components()
 
     # Download dependencies via resolved URLs and return download_paths for updating
     # package-lock.json with local file paths
     download_paths = _get_npm_dependencies(
-        npm_deps_dir, package_lock.get_dependencies_to_download()
+        npm_deps_dir, package_lock.get_dependencies_to_download(), tarball_store
     )
 
     # Update package-lock.json, package.json(s) files with local paths to dependencies and store them as ProjectFiles
@@ -736,7 +784,7 @@ def _resolve_npm(pkg_path: RootedPath, npm_deps_dir: RootedPath) -> ResolvedNpmP
     projectfiles.append(package_lock.get_project_file())
 
     return {
-        "package": original_package_lock.get_main_package(),
-        "dependencies": original_package_lock.get_sbom_components(),
+        "package": main_package,
+        "dependencies": dependencies,
         "projectfiles": projectfiles,
     }
@@ -2,15 +2,24 @@
 import ast
 import asyncio
 import configparser
+import contextlib
 import functools
+import hashlib
 import io
+import itertools
+import json
 import logging
 import os.path
 import re
+import sys
 import tarfile
+import tempfile
+import time
 import urllib
 import zipfile
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from os import PathLike
 from pathlib import Path
@@ -18,11 +27,14 @@ from typing import (
     IO,
     TYPE_CHECKING,
     Any,
+    Callable,
+    Collection,
     Iterable,
     Iterator,
     Literal,
     Optional,
     Pattern,
+    TypeVar,
     Union,
     cast,
 )
@@ -39,12 +51,19 @@ if TYPE_CHECKING:
 import pypi_simple
 import requests
 from packaging.requirements import InvalidRequirement, Requirement
-from packaging.utils import canonicalize_name, canonicalize_version
+from packaging.tags import Tag, compatible_tags, cpython_tags, mac_platforms
+from packaging.utils import (
+    InvalidWheelFilename,
+    canonicalize_name,
+    canonicalize_version,
+    parse_wheel_filename,
+)
 
 from cachi2.core.checksum import ChecksumInfo, must_match_any_checksum
 from cachi2.core.config import get_config
 from cachi2.core.errors import FetchError, PackageRejected, UnexpectedFormat, UnsupportedFeature
-from cachi2.core.models.input import Request
+from cachi2.core.http_requests import SAFE_REQUEST_METHODS, get_requests_session
+from cachi2.core.models.input import PipBinaryFilters, Request
 from cachi2.core.models.output import EnvironmentVariable, ProjectFile, RequestOutput
 from cachi2.core.models.property_semantics import PropertySet
 from cachi2.core.models.sbom import Component
@@ -52,10 +71,14 @@ from cachi2.core.package_managers.general import (
     async_download_files,
     download_binary_file,
     extract_git_info,
+    mark_verified,
 )
+from cachi2.core.utils import get_cache_dir
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 DEFAULT_BUILD_REQUIREMENTS_FILE = "requirements-build.txt"
 DEFAULT_REQUIREMENTS_FILE = "requirements.txt"
 
@@ -69,6 +92,8 @@ SDIST_FILE_EXTENSIONS = [ZIP_FILE_EXT, ".tar.gz", ".tar.bz2", ".tar.xz", COMPRES
 SDIST_EXT_PATTERN = r"|".join(map(re.escape, SDIST_FILE_EXTENSIONS))
 
 PYPI_URL = "https://pypi.org"
+# The content type of the JSON simple API, see https://peps.python.org/pep-0691/
+PYPI_SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
 
 PIP_METADATA_DOC = (
     "https://github.com/containerbuildsystem/cachi2/blob/main/docs/pip.md#project-metadata"
@@ -79,6 +104,9 @@ PIP_REQUIREMENTS_TXT_DOC = (
 PIP_EXTERNAL_DEPS_DOC = (
     "https://github.com/containerbuildsystem/cachi2/blob/main/docs/pip.md#external-dependencies"
 )
+PIP_BINARY_FILTERS_DOC = (
+    "https://github.com/containerbuildsystem/cachi2/blob/main/docs/pip.md#filtering-wheels"
+)
 PIP_NO_SDIST_DOC = "https://github.com/containerbuildsystem/cachi2/blob/main/docs/pip.md#dependency-does-not-distribute-sources"
 
 
@@ -156,6 +184,68 @@ class DistributionPackageInfo:
         }
 
 
+@dataclass
+class _RequestCache:
+    """Work shared by all the pip packages and requirement files of one request.
+
+    Packages of a monorepo tend to share files (e.g. a module with the version) and the same
+    requirement often appears in several requirement files. Each of them is parsed, looked up
+    and verified only once, every requirement file still gets its own SBOM components.
+    """
+
+    # parsed files by path and parse function, with the mtime of the file when it was parsed
+    parsed_files: dict[tuple[Path, Callable[[Path], Any]], tuple[int, Any]] = field(
+        default_factory=dict
+    )
+    # index pages by index URL and project name
+    project_pages: dict[tuple[str, str], pypi_simple.ProjectPage] = field(default_factory=dict)
+    # distributions of PyPI requirements, see _distributions_key()
+    distributions: dict[tuple[Any, ...], list[DistributionPackageInfo]] = field(
+        default_factory=dict
+    )
+    # files that matched their checksums, with the mtime of the file when it was verified
+    verified_files: set[tuple[Path, frozenset[ChecksumInfo], int]] = field(default_factory=set)
+
+
+# a context variable, the requests of fetch-deps-batch are processed in parallel threads
+_request_cache: ContextVar[Optional[_RequestCache]] = ContextVar("_request_cache", default=None)
+
+
+@contextlib.contextmanager
+def _request_cache_context() -> Iterator[None]:
+    """Share the work of resolving pip packages within this context, see _RequestCache."""
+    if _request_cache.get() is not None:
+        yield
+        return
+
+    token = _request_cache.set(_RequestCache())
+    try:
+        yield
+    finally:
+        _request_cache.reset(token)
+
+
+def _parse_file(path: Path, parse: Callable[[Path], T]) -> T:
+    """Parse a file, reusing the previous result if it was already parsed in this context.
+
+    The results are keyed by the path and modification time of the file. Errors are not cached,
+    a file that failed to parse will fail again (and be reported again) the next time.
+    """
+    cache = _request_cache.get()
+    if cache is None:
+        return parse(path)
+
+    mtime = path.stat().st_mtime_ns
+    cached = cache.parsed_files.get((path, parse))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    parsed = parse(path)
+    cache.parsed_files[path, parse] = (mtime, parsed)
+    return parsed
+
+
+@_request_cache_context()
 def fetch_pip_source(request: Request) -> RequestOutput:
     """Resolve and fetch pip dependencies for the given request."""
     components: list[Component] = []
@@ -176,6 +266,7 @@ def fetch_pip_source(request: Request) -> RequestOutput:
             package.requirements_files,
             package.requirements_build_files,
             package.allow_binary,
+            package.binary_filters,
         )
         purl = _generate_purl_main_package(info["package"], path_within_root)
         components.append(
@@ -407,6 +498,26 @@ def _get_top_level_attr(
         raise AttributeError(f"{attr_name!r} not found")
 
 
+def _parse_python_module(path: Path) -> ast.Module:
+    return ast.parse(path.read_text(), path.name)
+
+
+def _parse_toml(path: Path) -> dict[str, Any]:
+    if sys.version_info >= (3, 11):
+        import tomllib
+
+        # the stdlib parser is several times faster than tomlkit, which also keeps the formatting
+        return tomllib.loads(path.read_text())
+    return tomlkit.parse(path.read_text())
+
+
+def _parse_cfg(path: Path) -> configparser.ConfigParser:
+    parsed = configparser.ConfigParser()
+    with path.open() as f:
+        parsed.read_file(f)
+    return parsed
+
+
 class SetupFile(ABC):
     """Abstract base class for pyproject.toml, setup.cfg, and setup.py handling."""
 
@@ -468,7 +579,7 @@ class PyProjectTOML(SetupFile):
     def _parsed_toml(self) -> dict[str, Any]:
         try:
             log.debug("Parsing pyproject.toml at %r", str(self._setup_file))
-            return tomlkit.parse(self._setup_file.path.read_text())
+            return _parse_file(self._setup_file.path, _parse_toml)
         # no exceptions are exposed in the public API reference for tomlkit
         # check https://github.com/python-poetry/tomlkit/issues/399
         except Exception as e:
@@ -539,15 +650,11 @@ class SetupCFG(SetupFile):
         Will not parse file (or try to) more than once.
         """
         log.debug("Parsing setup.cfg at %r", str(self._setup_file))
-        parsed = configparser.ConfigParser()
-
-        with self._setup_file.path.open() as f:
-            try:
-                parsed.read_file(f)
-                return parsed
-            except configparser.Error as e:
-                log.error("Failed to parse setup.cfg: %s", e)
-                return None
+        try:
+            return _parse_file(self._setup_file.path, _parse_cfg)
+        except configparser.Error as e:
+            log.error("Failed to parse setup.cfg: %s", e)
+            return None
 
     def _get_option(self, section: str, option: str) -> Optional[str]:
         """Get option from config section, return None if option missing or file invalid."""
@@ -608,7 +715,7 @@ class SetupCFG(SetupFile):
             return None
 
         try:
-            module_ast = ast.parse(module_file.path.read_text(), module_file.path.name)
+            module_ast = _parse_file(module_file.path, _parse_python_module)
         except SyntaxError as e:
             log.error("Syntax error when parsing module: %s", e)
             return None
@@ -835,7 +942,7 @@ class SetupPY(SetupFile):
         """Try to parse the AST."""
         log.debug("Parsing setup.py at %r", str(self._setup_file))
         try:
-            return ast.parse(self._setup_file.path.read_text(), self._setup_file.path.name)
+            return _parse_file(self._setup_file.path, _parse_python_module)
         except SyntaxError as e:
             log.error("Syntax error when parsing setup.py: %s", e)
             return None
@@ -1466,23 +1573,12 @@ def _process_req(
     # "package_type" is *only* needed for PyPI deps
     download_info["package_type"] = ""
 
-    def _checksum_must_match_or_path_unlink(
-        path: Path, checksum_info: Iterable[ChecksumInfo]
-    ) -> None:
-        try:
-            # returns None, raises PackageRejected on failure
-            must_match_any_checksum(path, checksum_info)
-        except PackageRejected:
-            path.unlink()
-            log.warning("Download '%s' was removed from the output directory", path.name)
-
     if dpi:
         if dpi.req_file_checksums:
             download_info["missing_req_file_checksum"] = False
-        if dpi.has_checksums_to_match:
+        # sdists are verified as soon as they are downloaded, see _check_sdist()
+        if dpi.has_checksums_to_match and dpi.package_type != "sdist":
             _checksum_must_match_or_path_unlink(dpi.path, dpi.checksums_to_match)
-        if dpi.package_type == "sdist":
-            _check_metadata_in_sdist(dpi.path)
         download_info["package_type"] = dpi.package_type
         download_info["index_url"] = dpi.index_url
     elif req.kind == "vcs":
@@ -1506,36 +1602,412 @@ def _process_req(
     return download_info
 
 
+def _checksum_must_match_or_path_unlink(path: Path, checksum_info: Iterable[ChecksumInfo]) -> bool:
+    """Verify the checksums of a downloaded file, remove it if they do not match.
+
+    :return: True if the file matches, False if it was removed
+    """
+    # the same file is often listed in several requirement files
+    cache = _request_cache.get()
+    verified = None
+    if cache:
+        verified = (path, frozenset(checksum_info), path.stat().st_mtime_ns)
+        if verified in cache.verified_files:
+            return True
+    try:
+        # returns None, raises PackageRejected on failure
+        must_match_any_checksum(path, checksum_info)
+        mark_verified(path)
+        if cache and verified:
+            cache.verified_files.add(verified)
+        return True
+    except PackageRejected:
+        path.unlink()
+        log.warning("Download '%s' was removed from the output directory", path.name)
+        return False
+
+
+def _check_sdist(dpi: DistributionPackageInfo) -> None:
+    """Verify the checksums of a downloaded sdist first, only then check its metadata."""
+    if dpi.has_checksums_to_match and not _checksum_must_match_or_path_unlink(
+        dpi.path, dpi.checksums_to_match
+    ):
+        return
+    _check_metadata_in_sdist(dpi.path)
+
+
 def _process_pypi_req(
     req: PipRequirement,
     requirements_file: PipRequirementsFile,
-    index_url: str,
     pip_deps_dir: RootedPath,
-    allow_binary: bool,
+    artifacts: list[DistributionPackageInfo],
 ) -> list[dict[str, Any]]:
-    download_infos: list[dict[str, Any]] = []
+    return [
+        _process_req(
+            req,
+            requirements_file,
+            pip_deps_dir,
+            artifact.download_info,
+            dpi=artifact,
+        )
+        for artifact in artifacts
+    ]
 
-    artifacts: list[DistributionPackageInfo] = _process_package_distributions(
-        req, pip_deps_dir, allow_binary, index_url
-    )
 
-    files: dict[str, Union[str, PathLike[str]]] = {
-        dpi.url: dpi.path for dpi in artifacts if not dpi.path.exists()
+def _download_pypi_distributions(
+    requirements: list[PipRequirement],
+    pip_deps_dir: RootedPath,
+    allow_binary: bool,
+    index_url: str,
+    binary_filters: Optional[PipBinaryFilters] = None,
+) -> dict[PipRequirement, list[DistributionPackageInfo]]:
+    """Find and download the distributions of all PyPI requirements in one batch.
+
+    The index pages of all the projects are fetched concurrently first, then all the
+    distributions are downloaded together. The latency of the index is paid once, not once
+    per requirement.
+
+    Requirements already resolved for another requirement file of the request are not looked
+    up again.
+
+    :return: the downloaded distributions of each requirement
+    """
+    cache = _request_cache.get() or _RequestCache()
+    keys = {
+        req: _distributions_key(req, pip_deps_dir, allow_binary, index_url, binary_filters)
+        for req in requirements
     }
-    asyncio.run(async_download_files(files, get_config().concurrency_limit))
+    new_requirements = [req for req in requirements if keys[req] not in cache.distributions]
+
+    required_versions: dict[str, set[str]] = {}
+    for req in new_requirements:
+        required_versions.setdefault(req.package, set()).add(req.version_specs[0][1])
+
+    # a page looked up for another requirement file may predate the versions pinned in this one
+    project_pages = _get_project_pages(
+        [
+            name
+            for name, versions in required_versions.items()
+            if (index_url, name) not in cache.project_pages
+            or not _has_sdists(cache.project_pages[index_url, name], versions)
+        ],
+        index_url,
+        required_versions,
+    )
+    cache.project_pages.update(((index_url, name), page) for name, page in project_pages.items())
+    wheel_filter = _WheelFilter(binary_filters) if binary_filters else None
 
-    for artifact in artifacts:
-        download_infos.append(
-            _process_req(
+    for req in new_requirements:
+        if keys[req] not in cache.distributions:
+            cache.distributions[keys[req]] = _process_package_distributions(
                 req,
-                requirements_file,
                 pip_deps_dir,
-                artifact.download_info,
-                dpi=artifact,
+                allow_binary,
+                index_url,
+                cache.project_pages[index_url, req.package],
+                wheel_filter,
+            )
+
+    artifacts = {req: cache.distributions[keys[req]] for req in requirements}
+    all_dpis = [dpi for dpis in artifacts.values() for dpi in dpis]
+
+    # files removed after a checksum mismatch get downloaded (and rejected) again
+    files: dict[str, Union[str, PathLike[str]]] = {
+        dpi.url: dpi.path for dpi in all_dpis if not dpi.path.exists()
+    }
+    # the sdists of requirements resolved before have been checked already
+    sdists = {
+        dpi.path: dpi
+        for req in new_requirements
+        for dpi in artifacts[req]
+        if dpi.package_type == "sdist"
+    }
+    sdists.update(
+        (dpi.path, dpi) for dpi in all_dpis if dpi.package_type == "sdist" and dpi.url in files
+    )
+
+    # verify and check the metadata of each sdist in a worker thread as soon as it is downloaded
+    with ThreadPoolExecutor(get_config().concurrency_limit) as executor:
+        checks: dict[Path, Future[None]] = {}
+
+        def check_sdist(path: Path) -> None:
+            if path in sdists and path not in checks:
+                checks[path] = executor.submit(_check_sdist, sdists[path])
+
+        for path in sdists.keys() - set(map(Path, files.values())):
+            check_sdist(path)
+        if files:
+            asyncio.run(
+                async_download_files(
+                    files, get_config().concurrency_limit, on_downloaded=check_sdist
+                )
+            )
+        # sdists that were not downloaded (e.g. copied from a previous request)
+        for path in sdists:
+            check_sdist(path)
+
+        for check in checks.values():
+            check.result()
+
+    return artifacts
+
+
+def _distributions_key(
+    requirement: PipRequirement,
+    pip_deps_dir: RootedPath,
+    allow_binary: bool,
+    index_url: str,
+    binary_filters: Optional[PipBinaryFilters],
+) -> tuple[Any, ...]:
+    """Get everything the distributions of a PyPI requirement depend on, see _RequestCache.
+
+    Different spellings of the same project and version (e.g. Foo_Bar==1.0 and foo-bar==1.0.0)
+    have the same distributions.
+    """
+    return (
+        canonicalize_name(requirement.package),
+        canonicalize_version(requirement.version_specs[0][1]),
+        frozenset(requirement.hashes),
+        pip_deps_dir.path,
+        allow_binary,
+        index_url,
+        binary_filters.model_dump_json() if binary_filters else None,
+    )
+
+
+def _get_project_pages(
+    project_names: list[str],
+    index_url: str,
+    required_versions: Optional[dict[str, set[str]]] = None,
+) -> dict[str, pypi_simple.ProjectPage]:
+    """Get the index pages of the projects concurrently, sharing one HTTP session.
+
+    :param required_versions: the versions of each project that must have an sdist, cached
+        pages that are missing any of them are revalidated even if they are still fresh
+    """
+    names = sorted(set(project_names))
+    if not names:
+        return {}
+
+    log.info("Looking up %d projects in %s", len(names), index_url)
+    config = get_config()
+    session = get_requests_session(retry_options={"allowed_methods": SAFE_REQUEST_METHODS})
+    cache = _ProjectPageCache(index_url, config.pip_index_cache_ttl)
+
+    def get_project_page(name: str) -> pypi_simple.ProjectPage:
+        return _fetch_project_page(client, name, cache, (required_versions or {}).get(name, ()))
+
+    with pypi_simple.PyPISimple(index_url, session=session) as client:
+        with ThreadPoolExecutor(config.concurrency_limit) as executor:
+            try:
+                return dict(zip(names, executor.map(get_project_page, names)))
+            except (requests.RequestException, pypi_simple.NoSuchProjectError) as e:
+                raise FetchError(f"PyPI query failed: {e}")
+
+
+def _fetch_project_page(
+    client: pypi_simple.PyPISimple,
+    name: str,
+    cache: "_ProjectPageCache",
+    required_versions: Collection[str] = (),
+) -> pypi_simple.ProjectPage:
+    """Get the index page of a project, from the cache if the index says it has not changed.
+
+    A fresh cached page is used without asking the index only if it has an sdist of each of
+    the required versions. Otherwise, they may have been published since the page was cached.
+    """
+    cached = cache.load(name)
+    if cached and cache.is_fresh(cached) and _has_sdists(cached.page, required_versions):
+        return cached.page
+
+    headers = {"Accept": pypi_simple.ACCEPT_JSON_PREFERRED}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+
+    url = client.get_project_url(name)
+    response = client.s.get(url, headers=headers, timeout=get_config().requests_timeout)
+    if response.status_code == 304 and cached:
+        log.debug("The index page of %s has not changed since it was cached", name)
+        cache.store(name, cached.page, cached.etag)
+        return cached.page
+    if response.status_code == 404:
+        raise pypi_simple.NoSuchProjectError(name, url)
+    response.raise_for_status()
+
+    if response.headers.get("Content-Type", "").startswith(PYPI_SIMPLE_JSON):
+        page = _parse_json_project_page(response, name)
+    else:
+        page = pypi_simple.ProjectPage.from_response(response, name)
+    cache.store(name, page, response.headers.get("ETag"))
+    return page
+
+
+def _has_sdists(page: pypi_simple.ProjectPage, versions: Collection[str]) -> bool:
+    """Check if the index page of a project has an sdist of each of the versions."""
+    sdist_versions = {
+        canonicalize_version(package.version)
+        for package in page.packages
+        if package.package_type == "sdist" and package.version is not None
+    }
+    return all(canonicalize_version(version) in sdist_versions for version in versions)
+
+
+def _parse_json_project_page(response: requests.Response, name: str) -> pypi_simple.ProjectPage:
+    """Parse a PEP 691 JSON project page, keeping only what cachi2 uses.
+
+    Unlike ProjectPage.from_response, skip all the metadata cachi2 does not need and only
+    resolve the URLs of the files that are relative (they are absolute on PyPI). This makes
+    parsing the pages of projects with thousands of files a few times faster.
+
+    :raises FetchError: if the page does not have the fields the API version requires
+    """
+    data = response.json()
+    try:
+        api_version = data["meta"]["api-version"]
+        if not api_version.startswith("1."):
+            # let pypi_simple report the unsupported version
+            return pypi_simple.ProjectPage.from_response(response, name)
+
+        project = data["name"]
+        packages = []
+        for file in data["files"]:
+            filename = file["filename"]
+            try:
+                _, version, package_type = pypi_simple.parse_filename(filename, project)
+            except pypi_simple.UnparsableFilenameError:
+                version, package_type = None, None
+
+            url = file["url"]
+            if "://" not in url:
+                url = urllib.parse.urljoin(response.url, url)
+
+            yanked = file.get("yanked", False)
+            packages.append(
+                pypi_simple.DistributionPackage(
+                    filename=filename,
+                    url=url,
+                    project=project,
+                    version=version,
+                    package_type=package_type,
+                    digests=file.get("hashes", {}),
+                    requires_python=None,
+                    has_sig=None,
+                    is_yanked=yanked is True or isinstance(yanked, str),
+                )
             )
+
+        last_serial = data["meta"].get("_last-serial", response.headers.get("X-PyPI-Last-Serial"))
+        return pypi_simple.ProjectPage(
+            project, packages, api_version, None if last_serial is None else str(last_serial)
         )
+    except (KeyError, TypeError, AttributeError) as e:
+        # e.g. a missing or null field
+        raise FetchError(
+            f"PyPI query failed: invalid JSON project page for {name} at {response.url}: {e!r}"
+        )
+
+
+@dataclass
+class _CachedProjectPage:
+    page: pypi_simple.ProjectPage
+    etag: Optional[str]
+    fetched_at: float
+
+
+class _ProjectPageCache:
+    """Index pages of projects, cached on disk per package index.
+
+    Only the attributes of the distributions that cachi2 uses are stored, as JSON, so that
+    a cached page does not need to be parsed again. A cached page is used as is until it is
+    older than the TTL, then it is revalidated with the index (If-None-Match with the ETag).
+
+    Pages of indexes with credentials in the URL are not cached, the URLs of the
+    distributions may contain the credentials too.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, index_url: str, ttl: int) -> None:
+        """Open the cache for the given index, pages older than ttl seconds get revalidated."""
+        self.ttl = ttl
+        self._dir: Optional[Path] = None
+        if not urllib.parse.urlsplit(index_url).username:
+            index_key = hashlib.sha256(index_url.encode()).hexdigest()
+            self._dir = get_cache_dir() / "pip" / "index-pages" / index_key
+
+    def _path(self, directory: Path, name: str) -> Path:
+        return directory / f"{canonicalize_name(name)}.json"
+
+    def is_fresh(self, cached: _CachedProjectPage) -> bool:
+        """Check if a cached page can be used without asking the index."""
+        return time.time() - cached.fetched_at < self.ttl
+
+    def load(self, name: str) -> Optional[_CachedProjectPage]:
+        """Load the cached page of a project, if there is one."""
+        if self._dir is None:
+            return None
 
-    return download_infos
+        path = self._path(self._dir, name)
+        try:
+            data = json.loads(path.read_text())
+            if data["format"] != self.FORMAT_VERSION:
+                return None
+            packages = [
+                pypi_simple.DistributionPackage(
+                    project=data["project"], requires_python=None, has_sig=None, **package
+                )
+                for package in data["packages"]
+            ]
+            page = pypi_simple.ProjectPage(
+                data["project"], packages, data["repository_version"], data["last_serial"]
+            )
+            return _CachedProjectPage(page, data["etag"], data["fetched_at"])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            log.debug("Ignoring invalid cached index page %s: %s", path, e)
+            return None
+
+    def store(self, name: str, page: pypi_simple.ProjectPage, etag: Optional[str]) -> None:
+        """Cache the page of a project, failing to write the cache is not an error."""
+        if self._dir is None:
+            return
+
+        data = {
+            "format": self.FORMAT_VERSION,
+            "project": page.project,
+            "repository_version": page.repository_version,
+            "last_serial": page.last_serial,
+            "etag": etag,
+            "fetched_at": time.time(),
+            "packages": [
+                {
+                    "filename": package.filename,
+                    "url": package.url,
+                    "version": package.version,
+                    "package_type": package.package_type,
+                    "digests": package.digests,
+                    "is_yanked": package.is_yanked,
+                }
+                for package in page.packages
+            ],
+        }
+        tmp_path = None
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            # other processes may be reading the page, replace it atomically
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self._dir, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_path = Path(tmp_file.name)
+                json.dump(data, tmp_file)
+            os.replace(tmp_path, self._path(self._dir, name))
+        except OSError as e:
+            log.debug("Failed to cache the index page of %s: %s", name, e)
+        finally:
+            # gone already if it replaced the cached page
+            if tmp_path:
+                tmp_path.unlink(missing_ok=True)
 
 
 def _process_vcs_req(
@@ -1564,6 +2036,7 @@ def _download_dependencies(
     output_dir: RootedPath,
     requirements_file: PipRequirementsFile,
     allow_binary: bool = False,
+    binary_filters: Optional[PipBinaryFilters] = None,
 ) -> list[dict[str, Any]]:
     """
     Download artifacts of all dependency packages in a requirements.txt file.
@@ -1571,6 +2044,7 @@ def _download_dependencies(
     :param output_dir: the root output directory for this request
     :param requirements_file: A requirements.txt file
     :param bool allow_binary: process wheels?
+    :param binary_filters: which wheels to process, all of them if not set
     :return: Info about downloaded packages; all items will contain "kind" and "path" keys
         (and more based on kind, see _download_*_package functions for more details)
     :rtype: list[dict]
@@ -1601,15 +2075,22 @@ def _download_dependencies(
     pip_deps_dir: RootedPath = output_dir.join_within_root("deps", "pip")
     pip_deps_dir.path.mkdir(parents=True, exist_ok=True)
 
+    pypi_artifacts = _download_pypi_distributions(
+        [req for req in requirements_file.requirements if req.kind == "pypi"],
+        pip_deps_dir,
+        allow_binary,
+        index_url=options["index_url"] or pypi_simple.PYPI_SIMPLE_ENDPOINT,
+        binary_filters=binary_filters,
+    )
+
     for req in requirements_file.requirements:
         log.info("-- Processing requirement line '%s'", req.download_line)
         if req.kind == "pypi":
             download_infos: list[dict[str, Any]] = _process_pypi_req(
                 req,
                 requirements_file=requirements_file,
-                index_url=options["index_url"] or pypi_simple.PYPI_SIMPLE_ENDPOINT,
                 pip_deps_dir=pip_deps_dir,
-                allow_binary=allow_binary,
+                artifacts=pypi_artifacts[req],
             )
             processed.extend(download_infos)
         elif req.kind == "vcs":
@@ -1828,11 +2309,13 @@ def _process_package_distributions(
     pip_deps_dir: RootedPath,
     allow_binary: bool = False,
     index_url: str = pypi_simple.PYPI_SIMPLE_ENDPOINT,
+    project_page: Optional[pypi_simple.ProjectPage] = None,
+    wheel_filter: Optional["_WheelFilter"] = None,
 ) -> list[DistributionPackageInfo]:
     """
     Return a list of DPI objects for the provided pip package.
 
-    Scrape the package's PyPI page and generate a list of all available
+    Scrape the package's PyPI page (unless already provided) and generate a list of all available
     artifacts. Filter by version and allowed artifact type. Filter to find the
     best matching sdist artifact. Process wheel artifacts.
 
@@ -1851,11 +2334,13 @@ def _process_package_distributions(
     :param requirement: which pip package to process
     :param str pip_deps_dir:
     :param bool allow_binary: process wheels?
+    :param str index_url: the index to query for the package
+    :param project_page: the already fetched index page of the package
+    :param wheel_filter: which wheels to process, all of them if not set
     :return: a list of DPI
     :rtype: list[DistributionPackageInfo]
     """
     allowed_distros = ["sdist", "wheel"] if allow_binary else ["sdist"]
-    client = pypi_simple.PyPISimple(index_url)
     processed_dpis: list[DistributionPackageInfo] = []
     name = requirement.package
     version = requirement.version_specs[0][1]
@@ -1864,12 +2349,9 @@ def _process_package_distributions(
     req_file_checksums = set(map(_to_checksum_info, requirement.hashes))
     wheels: list[DistributionPackageInfo] = []
 
-    try:
-        timeout = get_config().requests_timeout
-        project_page = client.get_project_page(name, timeout)
-        packages: list[pypi_simple.DistributionPackage] = project_page.packages
-    except (requests.RequestException, pypi_simple.NoSuchProjectError) as e:
-        raise FetchError(f"PyPI query failed: {e}")
+    if project_page is None:
+        project_page = _get_project_pages([name], index_url, {name: {version}})[name]
+    packages: list[pypi_simple.DistributionPackage] = project_page.packages
 
     def _is_valid(pkg: pypi_simple.DistributionPackage) -> bool:
         return (
@@ -1879,10 +2361,20 @@ def _process_package_distributions(
             and pkg.package_type in allowed_distros
         )
 
+    filtered_wheels = 0
     for package in packages:
         if not _is_valid(package):
             continue
 
+        if (
+            package.package_type == "wheel"
+            and wheel_filter
+            and not wheel_filter.matches(package.filename)
+        ):
+            log.debug("Filtering out %s, it does not match the binary filters", package.filename)
+            filtered_wheels += 1
+            continue
+
         pypi_checksums: set[ChecksumInfo] = {
             ChecksumInfo(algorithm, digest) for algorithm, digest in package.digests.items()
         }
@@ -1918,7 +2410,15 @@ def _process_package_distributions(
         log.warning("No sdist found for package %s==%s", name, version)
 
         if len(wheels) == 0:
-            if allow_binary:
+            if allow_binary and filtered_wheels:
+                solution = (
+                    f"None of the {filtered_wheels} wheels of this version match the"
+                    " binary_filters of the package.\n"
+                    "Please check that the filters are correct, or add the platform tags"
+                    " of the wheels you need."
+                )
+                docs = PIP_BINARY_FILTERS_DOC
+            elif allow_binary:
                 solution = (
                     "Please check that the package exists on PyPI or that the name"
                     " and version are correct.\n"
@@ -1944,6 +2444,80 @@ def _process_package_distributions(
     return processed_dpis
 
 
+class _WheelFilter:
+    """Match wheels against the binary filters of a package, using packaging.tags.
+
+    A wheel matches if any of its tags is accepted by all the filters. The Python versions
+    expand to every interpreter and ABI tag that a CPython of that version can install
+    (e.g. 3.11 accepts cp311-cp311, cp39-abi3 and py3-none). Platforms expand to every older
+    platform they are compatible with (e.g. manylinux_2_28_x86_64 accepts manylinux2014_x86_64).
+    """
+
+    def __init__(self, filters: PipBinaryFilters) -> None:
+        """Prepare the sets of accepted tags for the filters."""
+        self._interpreter_abis: Optional[set[tuple[str, str]]] = None
+        if filters.python_versions:
+            self._interpreter_abis = set()
+            for version in filters.python_versions:
+                python_version = tuple(map(int, version.split(".")))
+                interpreter = "cp{}{}".format(*python_version)
+                tags = itertools.chain(
+                    cpython_tags(python_version, platforms=["any"]),
+                    compatible_tags(python_version, interpreter, platforms=["any"]),
+                )
+                self._interpreter_abis.update((tag.interpreter, tag.abi) for tag in tags)
+
+        self._abis = None if filters.abis is None else {*filters.abis, "none"}
+        self._platforms = None
+        if filters.platforms is not None:
+            self._platforms = {"any"}
+            for platform in filters.platforms:
+                self._platforms.update(_compatible_platforms(platform))
+
+    def matches(self, filename: str) -> bool:
+        """Check if the wheel with this filename matches the filters."""
+        try:
+            *_, tags = parse_wheel_filename(filename)
+        except InvalidWheelFilename as e:
+            log.debug("Cannot match %s against the binary filters: %s", filename, e)
+            return False
+        return any(self._matches_tag(tag) for tag in tags)
+
+    def _matches_tag(self, tag: Tag) -> bool:
+        return (
+            (self._interpreter_abis is None or (tag.interpreter, tag.abi) in self._interpreter_abis)
+            and (self._abis is None or tag.abi in self._abis)
+            and (self._platforms is None or tag.platform in self._platforms)
+        )
+
+
+# The legacy manylinux platform tags, by the glibc version they stand for
+_LEGACY_MANYLINUX = {(2, 17): "manylinux2014", (2, 12): "manylinux2010", (2, 5): "manylinux1"}
+
+
+def _compatible_platforms(platform: str) -> list[str]:
+    """Return the platform tags of all the wheels that can be installed on the platform."""
+    for legacy_glibc, legacy_name in _LEGACY_MANYLINUX.items():
+        if platform.startswith(f"{legacy_name}_"):
+            platform = platform.replace(legacy_name, "manylinux_{}_{}".format(*legacy_glibc), 1)
+
+    if match := re.fullmatch(r"(manylinux|musllinux)_(\d+)_(\d+)_(\w+)", platform):
+        policy, major, minor, arch = match[1], int(match[2]), int(match[3]), match[4]
+        platforms = [f"{policy}_{major}_{older}_{arch}" for older in range(minor, -1, -1)]
+        if policy == "manylinux":
+            platforms.extend(
+                f"{legacy_name}_{arch}"
+                for (legacy_major, legacy_minor), legacy_name in _LEGACY_MANYLINUX.items()
+                if legacy_major == major and legacy_minor <= minor
+            )
+        return platforms
+
+    if match := re.fullmatch(r"macosx_(\d+)_(\d+)_(\w+)", platform):
+        return list(mac_platforms((int(match[1]), int(match[2])), match[3]))
+
+    return [platform]
+
+
 def _sdist_preference(sdist_pkg: DistributionPackageInfo) -> tuple[int, int]:
     """
     Compute preference for a sdist package, can be used to sort in ascending order.
@@ -2053,7 +2627,10 @@ def _to_checksum_info(hash_: str) -> ChecksumInfo:
 
 
 def _download_from_requirement_files(
-    output_dir: RootedPath, files: list[RootedPath], allow_binary: bool = False
+    output_dir: RootedPath,
+    files: list[RootedPath],
+    allow_binary: bool = False,
+    binary_filters: Optional[PipBinaryFilters] = None,
 ) -> list[dict[str, Any]]:
     """
     Download dependencies listed in the requirement files.
@@ -2061,6 +2638,7 @@ def _download_from_requirement_files(
     :param output_dir: the root output directory for this request
     :param files: list of absolute paths to pip requirements files
     :param allow_binary: process wheels?
+    :param binary_filters: which wheels to process, all of them if not set
     :return: Info about downloaded packages; see download_dependencies return docs for further
         reference
     :raises PackageRejected: If requirement file does not exist
@@ -2073,7 +2651,9 @@ def _download_from_requirement_files(
                 solution="Please check that you have specified correct requirements file paths",
             )
         requirements.extend(
-            _download_dependencies(output_dir, PipRequirementsFile(req_file), allow_binary)
+            _download_dependencies(
+                output_dir, PipRequirementsFile(req_file), allow_binary, binary_filters
+            )
         )
 
     return requirements
@@ -2098,6 +2678,7 @@ def _resolve_pip(
     requirement_files: Optional[list[Path]] = None,
     build_requirement_files: Optional[list[Path]] = None,
     allow_binary: bool = False,
+    binary_filters: Optional[PipBinaryFilters] = None,
 ) -> dict[str, Any]:
     """
     Resolve and fetch pip dependencies for the given pip application.
@@ -2109,6 +2690,7 @@ def _resolve_pip(
     :param list build_requirement_files: a list of str representing paths to the Python build
         requirement files to be used to compile a list of build dependencies to be fetched
     :param bool allow_binary: process wheels?
+    :param binary_filters: which wheels to process, all of them if not set
     :return: a dictionary that has the following keys:
         ``package`` which is the dict representing the main Package,
         ``dependencies`` which is a list of dicts representing the package Dependencies
@@ -2130,9 +2712,11 @@ def _resolve_pip(
     resolved_req_files = resolve_req_files(requirement_files, False)
     resolved_build_req_files = resolve_req_files(build_requirement_files, True)
 
-    requires = _download_from_requirement_files(output_dir, resolved_req_files, allow_binary)
+    requires = _download_from_requirement_files(
+        output_dir, resolved_req_files, allow_binary, binary_filters
+    )
     build_requires = _download_from_requirement_files(
-        output_dir, resolved_build_req_files, allow_binary
+        output_dir, resolved_build_req_files, allow_binary, binary_filters
     )
 
     # Mark all build dependencies as such
@@ -2206,7 +2790,9 @@ def _iter_zip_file(file_path: Path) -> Iterator[str]:
 
 
 def _iter_tar_file(file_path: Path) -> Iterator[str]:
-    with tarfile.open(file_path, "r") as tar:
+    # stream mode decompresses the archive as it is read and does not keep a list of all the
+    # members, the caller can stop reading as soon as it finds what it is looking for
+    with tarfile.open(file_path, "r|*") as tar:
         for member in tar:
             yield member.name
 
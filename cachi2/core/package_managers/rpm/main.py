@@ -19,7 +19,7 @@ from cachi2.core.errors import PackageManagerError, PackageRejected
 from cachi2.core.models.input import ExtraOptions, Request, SSLOptions
 from cachi2.core.models.output import RequestOutput
 from cachi2.core.models.sbom import Component, Property
-from cachi2.core.package_managers.general import async_download_files
+from cachi2.core.package_managers.general import async_download_files, mark_verified
 from cachi2.core.package_managers.rpm.redhat import RedhatRpmsLock
 from cachi2.core.rooted_path import RootedPath
 from cachi2.core.utils import run_cmd
@@ -385,6 +385,7 @@ def _verify_downloaded(metadata: dict[Path, Any]) -> None:
                     h.update(chunk)
             if digest != h.hexdigest():
                 raise_exception(f"Unmatched checksum of '{file_path}' != '{digest}'")
+            mark_verified(file_path)
 
 
 def _is_rpm_file(file_path: Path) -> bool:
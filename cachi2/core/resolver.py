@@ -1,3 +1,4 @@
+import importlib
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Any, Callable
@@ -5,27 +6,42 @@ from typing import Any, Callable
 from cachi2.core.errors import UnsupportedFeature
 from cachi2.core.models.input import PackageManagerType, Request
 from cachi2.core.models.output import RequestOutput
-from cachi2.core.package_managers import bundler, cargo, generic, gomod, metayarn, npm, pip, rpm
 from cachi2.core.package_managers.utils import merge_outputs
 from cachi2.core.rooted_path import RootedPath
 from cachi2.core.utils import copy_directory
 
 Handler = Callable[[Request], RequestOutput]
 
+
+def _lazy_handler(module_name: str, handler_name: str) -> Handler:
+    """Return a handler that imports its package manager module only when it gets called.
+
+    The package managers pull in heavy dependencies (aiohttp, GitPython, pypi_simple...), the CLI
+    commands that don't fetch anything should not have to pay for importing them.
+    """
+
+    def handler(request: Request) -> RequestOutput:
+        module = importlib.import_module(f"cachi2.core.package_managers.{module_name}")
+        fetch_source: Handler = getattr(module, handler_name)
+        return fetch_source(request)
+
+    return handler
+
+
 _package_managers: dict[PackageManagerType, Handler] = {
-    "bundler": bundler.fetch_bundler_source,
-    "gomod": gomod.fetch_gomod_source,
-    "npm": npm.fetch_npm_source,
-    "pip": pip.fetch_pip_source,
-    "yarn": metayarn.fetch_yarn_source,
-    "generic": generic.fetch_generic_source,
+    "bundler": _lazy_handler("bundler", "fetch_bundler_source"),
+    "gomod": _lazy_handler("gomod", "fetch_gomod_source"),
+    "npm": _lazy_handler("npm", "fetch_npm_source"),
+    "pip": _lazy_handler("pip", "fetch_pip_source"),
+    "yarn": _lazy_handler("metayarn", "fetch_yarn_source"),
+    "generic": _lazy_handler("generic", "fetch_generic_source"),
 }
 
 # This is where we put package managers currently under development in order to
 # invoke them via CLI
 _dev_package_managers: dict[PackageManagerType, Handler] = {
-    "cargo": cargo.fetch_cargo_source,
-    "rpm": rpm.fetch_rpm_source,
+    "cargo": _lazy_handler("cargo", "fetch_cargo_source"),
+    "rpm": _lazy_handler("rpm", "fetch_rpm_source"),
 }
 
 # This is *only* used to provide a list for `cachi2 --version`
@@ -80,6 +96,11 @@ def _resolve_packages(request: Request) -> RequestOutput:
 
 def inject_files_post(from_output_dir: Path, for_output_dir: Path, **kwargs: Any) -> None:
     """Do extra steps for package manager."""
+    # only the RPM package manager needs extra steps, don't import it if there are no RPMs
+    if not from_output_dir.joinpath("deps", "rpm").exists():
+        return
+
+    rpm = importlib.import_module("cachi2.core.package_managers.rpm")
     # if there is a callback method defined within the particular package manager, run it
     if hasattr(rpm, "inject_files_post"):
         callback_method = getattr(rpm, "inject_files_post")
@@ -1,4 +1,7 @@
+import codecs
+import contextlib
 import errno
+import fcntl
 import json
 import logging
 import os
@@ -6,10 +9,12 @@ import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 from functools import cache
 from itertools import filterfalse, tee
 from pathlib import Path
-from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, Sequence
 
 from cachi2.core.config import get_config
 from cachi2.core.errors import Cachi2Error
@@ -38,18 +43,7 @@ def run_cmd(cmd: Sequence[str], params: dict) -> str:
     conf = get_config()
     params.setdefault("timeout", conf.subprocess_timeout)
 
-    executable, *args = cmd
-    executable_path = shutil.which(executable)
-    if executable_path is None:
-        raise Cachi2Error(
-            f"{executable!r} executable not found in PATH",
-            solution=(
-                f"Please make sure that the {executable!r} executable is installed in your PATH.\n"
-                "If you are using Cachi2 via its container image, this should not happen - please report this bug."
-            ),
-        )
-
-    response = subprocess.run([executable_path, *args], **params)
+    response = subprocess.run(_locate_executable(cmd), **params)
 
     try:
         response.check_returncode()
@@ -63,6 +57,87 @@ def run_cmd(cmd: Sequence[str], params: dict) -> str:
     return response.stdout
 
 
+def run_cmd_json_stream(cmd: Sequence[str], params: dict) -> Generator[Any, None, None]:
+    """
+    Run the given command and parse the JSON objects from its output while it is running.
+
+    Same as load_json_stream(run_cmd(cmd, params)), except that the output is never held in memory
+    as a whole, only the object currently being parsed is. The command runs while the returned
+    generator is being consumed, closing the generator early kills the command.
+
+    :param iter cmd: iterable representing command to be executed
+    :param dict params: keyword parameters for command execution
+    :returns: a generator of the parsed objects
+    :raises CalledProcessError: if the command fails (once all of its output was consumed)
+    :raises TimeoutExpired: if the command does not finish within the subprocess timeout
+    """
+    params = dict(params)
+    timeout = params.pop("timeout", get_config().subprocess_timeout)
+    executable_cmd = _locate_executable(cmd)
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stderr:
+        with subprocess.Popen(
+            executable_cmd, stdout=subprocess.PIPE, stderr=stderr, **params
+        ) as proc:
+            yield from _json_stream_from_process(proc, timeout)
+
+        if proc.returncode != 0:
+            stderr.seek(0)
+            stderr_output = stderr.read()
+            log.error('The command "%s" failed', " ".join(cmd))
+            _log_error_output("STDERR", stderr_output)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr_output)
+
+
+def _json_stream_from_process(proc: subprocess.Popen, timeout: float) -> Iterator[Any]:
+    """Parse the JSON objects from the output of a process, kill it if it runs out of time."""
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        yield from _load_json_chunks(_read_text_chunks(proc))
+    except json.JSONDecodeError:
+        # a failed command may not finish its output, report the failure instead
+        if proc.wait() == 0 and not timed_out.is_set():
+            raise
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+    proc.wait()
+
+
+def _read_text_chunks(proc: subprocess.Popen) -> Iterator[str]:
+    """Read the output of a process as soon as it is available, decoded as UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while chunk := proc.stdout.read1(2**16):  # type: ignore
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _locate_executable(cmd: Sequence[str]) -> list[str]:
+    """Return the command with the executable replaced by its absolute path."""
+    executable, *args = cmd
+    executable_path = shutil.which(executable)
+    if executable_path is None:
+        raise Cachi2Error(
+            f"{executable!r} executable not found in PATH",
+            solution=(
+                f"Please make sure that the {executable!r} executable is installed in your PATH.\n"
+                "If you are using Cachi2 via its container image, this should not happen - please report this bug."
+            ),
+        )
+    return [executable_path, *args]
+
+
 def _log_error_output(out_or_err: str, output: Optional[str]) -> None:
     if output:
         log.error("%s:\n%s", out_or_err, output.rstrip())
@@ -77,13 +152,54 @@ def load_json_stream(s: str) -> Iterator:
     The objects can be separated by one or more whitespace characters. The return value is
     a generator that will yield the parsed objects one by one.
     """
+    return _load_json_chunks([s])
+
+
+def _load_json_chunks(chunks: Iterable[str]) -> Iterator:
+    """Load all JSON objects from text that comes in chunks, objects may span several chunks.
+
+    An incomplete object is not decoded again with every chunk, which would take quadratic time
+    for objects that span many chunks. It is retried once its size doubled, or sooner if a chunk
+    ends like an object does. A complete value at the end of the text is retried with any chunk.
+    """
     decoder = json.JSONDecoder()
     non_whitespace = re.compile(r"\S")
-    i = 0
-
-    while match := non_whitespace.search(s, i):
-        obj, i = decoder.raw_decode(s, match.start())
-        yield obj
+    chunks = iter(chunks)
+    buffer = ""
+    eof = False
+
+    while True:
+        i = 0
+        incomplete = False
+        while match := non_whitespace.search(buffer, i):
+            try:
+                obj, end = decoder.raw_decode(buffer, match.start())
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                incomplete = True
+                break  # the object continues in the next chunk (or is invalid)
+            if end == len(buffer) and not eof:
+                break  # e.g. a number may continue in the next chunk
+            yield obj
+            i = end
+
+        if eof:
+            return
+
+        buffer = buffer[i:]
+        new_chunks: list[str] = []
+        new_len = 0
+        while True:
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+                break
+            new_chunks.append(chunk)
+            new_len += len(chunk)
+            if not incomplete or new_len >= len(buffer) or chunk.rstrip()[-1:] in ("}", "]"):
+                break
+        buffer += "".join(new_chunks)
 
 
 @cache
@@ -189,6 +305,65 @@ def copy_directory(origin: Path, destination: Path) -> Path:
     return destination
 
 
+def copy_file(origin: Path, destination: Path) -> Path:
+    """
+    Copy a file to another path.
+
+    Use fast in-kernel copying (including reflink file system optimization) and fall back to
+    regular copy if the former fails for some reason.
+    """
+    try:
+        _fast_copy(origin, destination)
+    except _FastCopyFailedFallback:
+        shutil.copyfile(origin, destination)
+
+    return destination
+
+
+def link_file(origin: Path, destination: Path) -> Path:
+    """
+    Hardlink a file to another path, replacing the destination if it exists.
+
+    Fall back to copying the file if hardlinking fails (e.g. across file systems). The links
+    share the content, only use this for files that do not get modified afterwards.
+    """
+    try:
+        if destination.exists() and destination.samefile(origin):
+            return destination
+        destination.unlink(missing_ok=True)
+        os.link(origin, destination)
+    except OSError as e:
+        log.debug("Could not hardlink %s to %s, copying it: %s", origin, destination, e)
+        copy_file(origin, destination)
+
+    return destination
+
+
+@contextlib.contextmanager
+def file_lock(lock_file: Path, shared: bool = False, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold a lock on a file for the duration of the context, to synchronize cachi2 processes.
+
+    :param lock_file: the file to lock, gets created if it does not exist
+    :param shared: take a shared lock, which can be held by several processes at once
+    :param blocking: wait for the lock, otherwise give up right away if it is not available
+    :return: (yields) whether the lock was acquired, always True when blocking
+    """
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with lock_file.open("a") as f:
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(f, operation if blocking else operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
 def get_cache_dir() -> Path:
     """Return cachi2's global cache directory, useful for storing reusable data."""
     try:
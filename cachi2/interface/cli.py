@@ -3,13 +3,16 @@ import functools
 import importlib.metadata
 import json
 import logging
+import re
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Callable, List, Optional, Union
 
 import pydantic
 import typer
+import yaml
 
 import cachi2.core.config as config
 from cachi2.core.errors import Cachi2Error, InvalidInput, UnexpectedFormat
@@ -20,6 +23,7 @@ from cachi2.core.models.sbom import Sbom, SPDXSbom, spdx_now
 from cachi2.core.resolver import inject_files_post, resolve_packages, supported_package_managers
 from cachi2.core.rooted_path import RootedPath
 from cachi2.interface.logging import LogLevel, setup_logging
+from cachi2.interface.worker import serve as serve_jobs
 
 app = typer.Typer(no_args_is_help=True, pretty_exceptions_show_locals=False)
 log = logging.getLogger(__name__)
@@ -290,7 +294,14 @@ def fetch_deps(
         },
     )
 
-    deps_dir = output / "deps"
+    _fetch_deps(request, sbom_type)
+
+    log.info(r"All dependencies fetched successfully \o/")
+
+
+def _fetch_deps(request: Request, sbom_type: SBOMFormat) -> None:
+    """Resolve the packages of a request and write the output files."""
+    deps_dir = request.output_dir.path / "deps"
     if deps_dir.exists():
         log.debug(f"Removing existing deps directory '{deps_dir}'")
         shutil.rmtree(deps_dir, ignore_errors=True)
@@ -311,6 +322,104 @@ def fetch_deps(
         sbom.model_dump_json(indent=2, by_alias=True, exclude_none=True)
     )
 
+
+class _BatchJob(pydantic.BaseModel, extra="forbid"):
+    source: Path
+    output: Path
+    packages: list[PackageInput]
+    flags: list[Flag] = list()
+
+
+class _BatchManifest(pydantic.BaseModel, extra="forbid"):
+    jobs: list[_BatchJob] = pydantic.Field(min_length=1)
+
+
+@app.command()
+@handle_errors
+def fetch_deps_batch(
+    manifest: Path = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        resolve_path=True,
+        readable=True,
+        help="YAML (or JSON) file listing the source directories to process.",
+    ),
+    max_parallel_jobs: int = typer.Option(
+        4,
+        "--max-parallel-jobs",
+        min=1,
+        help="Process at most this many source directories at the same time.",
+    ),
+    sbom_type: SBOMFormat = SBOM_TYPE_OPTION,
+) -> None:
+    """Fetch dependencies for many source directories in a single process.
+
+    Every job in the manifest is processed as if by a separate fetch-deps command and gets
+    its own output directory, with the same content. Files downloaded for one job are reused
+    by the other jobs instead of being downloaded again. Relative paths in the manifest are
+    relative to the directory of the manifest.
+
+    \b
+    jobs:
+      - source: ./my-repo
+        output: ./my-repo-output
+        packages: [{"type": "pip"}]
+      - source: ./other-repo
+        output: ./other-repo-output
+        packages: [{"type": "gomod"}, {"type": "npm", "path": "web"}]
+        flags: ["cgo-disable"]
+    """  # noqa: D301; backslashes intentional
+    # importing the package managers is expensive, only do it when actually fetching
+    from cachi2.core.package_managers.general import shared_downloads
+
+    try:
+        manifest_data = yaml.safe_load(manifest.read_text())
+    except yaml.YAMLError as e:
+        raise InvalidInput(f"{manifest} is not a valid YAML file: {e}")
+
+    batch = parse_user_input(_BatchManifest.model_validate, manifest_data)
+    requests = [
+        parse_user_input(
+            Request.model_validate,
+            {
+                "source_dir": manifest.parent.joinpath(job.source).resolve(),
+                "output_dir": manifest.parent.joinpath(job.output).resolve(),
+                "packages": job.packages,
+                "flags": job.flags,
+            },
+        )
+        for job in batch.jobs
+    ]
+    output_dirs = [request.output_dir.path for request in requests]
+    if duplicates := sorted({str(path) for path in output_dirs if output_dirs.count(path) > 1}):
+        raise InvalidInput(
+            f"Every job needs its own output directory, used more than once: {', '.join(duplicates)}"
+        )
+
+    # the errors of the jobs in the order of the manifest, not in the order they failed
+    errors: dict[int, Exception] = {}
+    max_workers = min(max_parallel_jobs, len(requests))
+    with shared_downloads(), ThreadPoolExecutor(max_workers) as executor:
+        futures = {
+            executor.submit(_fetch_deps, request, sbom_type): i
+            for i, request in enumerate(requests)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            source_dir = requests[i].source_dir
+            try:
+                future.result()
+            except Exception as e:
+                log.error("Failed to fetch dependencies for %s", source_dir)
+                errors[i] = e
+            else:
+                log.info("Fetched dependencies for %s", source_dir)
+
+    if errors:
+        log.error("Failed to fetch dependencies for %d of %d jobs", len(errors), len(requests))
+        raise errors[min(errors)]
+
     log.info(r"All dependencies fetched successfully \o/")
 
 
@@ -465,6 +574,89 @@ def merge_sboms(
         print(sbom_json)
 
 
+@app.command()
+@handle_errors
+def serve(
+    socket: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        dir_okay=False,
+        resolve_path=True,
+        help="Accept jobs on this Unix socket instead of standard input.",
+    ),
+) -> None:
+    """Run a long-lived worker that processes cachi2 commands sent as JSON lines.
+
+    Avoids paying the startup cost of cachi2 for every command and keeps HTTP connections
+    and lookups warm between commands. Each line is one job, the worker runs the jobs one
+    at a time and answers each one with a line of JSON.
+
+    \b
+    # job
+    {"id": "1", "args": ["fetch-deps", "--output", "./output-1", "pip"], "cwd": "/path/to/repo"}
+
+    \b
+    # result
+    {"id": "1", "exit_code": 0, "stdout": "...", "stderr": "..."}
+
+    Jobs can run the fetch-deps, generate-env, inject-files and merge-sboms commands. Global
+    options like --config-file apply to a single job. Without a cwd, relative paths are resolved
+    against the working directory of the worker.
+    """  # noqa: D301; backslashes intentional
+    serve_jobs(app, socket)
+
+
+toolchains_app = typer.Typer(no_args_is_help=True, help="Manage the Go toolchains used by cachi2.")
+app.add_typer(toolchains_app, name="toolchains")
+
+GO_RELEASE_PATTERN = re.compile(r"(?:go)?(\d+)\.(\d+)(\.\d+)?((?:rc|beta)\d+)?")
+
+
+def _go_release(version: str) -> Optional[str]:
+    """Return the Go release name of a version (e.g. 1.21 -> go1.21.0), None if it is not one.
+
+    Starting with Go 1.21, the first release of a minor version is named go1.N.0, not go1.N.
+    """
+    if not (match := GO_RELEASE_PATTERN.fullmatch(version)):
+        return None
+    major, minor, patch, prerelease = match.groups()
+    if not patch and not prerelease and (int(major), int(minor)) >= (1, 21):
+        patch = ".0"
+    return f"go{major}.{minor}{patch or ''}{prerelease or ''}"
+
+
+@toolchains_app.command("prefetch")
+@handle_errors
+def prefetch_toolchains(
+    go_mods_or_versions: list[str] = typer.Argument(
+        ...,
+        metavar="GO_MOD_OR_VERSION...",
+        help="go.mod files to install the needed toolchains for, or Go versions (e.g. 1.21.0).",
+    ),
+) -> None:
+    """Install Go toolchains ahead of time, fetch-deps will not have to wait for them.
+
+    The toolchains are installed to $XDG_CACHE_HOME/cachi2/go (by default ~/.cache/cachi2/go),
+    the ones pre-installed in /usr/local/go are used as they are. Prints the path to the go
+    binary of each toolchain.
+    """
+    # importing the package managers is expensive, only do it when actually fetching
+    from cachi2.core.package_managers import gomod
+
+    go_mod_files = []
+    releases = []
+    for go_mod_or_version in go_mods_or_versions:
+        if Path(go_mod_or_version).is_file():
+            go_mod_files.append(RootedPath(Path(go_mod_or_version).resolve()))
+        elif release := _go_release(go_mod_or_version):
+            releases.append(release)
+        else:
+            raise InvalidInput(f"Not a go.mod file or a Go version: {go_mod_or_version}")
+
+    for go_binary in gomod.prefetch_toolchains(go_mod_files, releases):
+        print(go_binary)
+
+
 def _get_build_config(output_dir: Path) -> BuildConfig:
     build_config_json = RootedPath(output_dir).join_within_root(".build-config.json").path
     if not build_config_json.exists():
@@ -0,0 +1,180 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import socketserver
+import sys
+import traceback
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+import pydantic
+import typer
+
+import cachi2.core.config as config
+from cachi2.core.errors import Cachi2Error, InvalidInput
+from cachi2.core.models.input import parse_user_input
+from cachi2.interface.logging import LOG_FORMAT
+
+log = logging.getLogger(__name__)
+
+# Commands that can be sent to the worker as jobs
+JOB_COMMANDS = frozenset({"fetch-deps", "generate-env", "inject-files", "merge-sboms"})
+
+
+class Job(pydantic.BaseModel, extra="forbid"):
+    """A job for the worker, the same arguments as for a cachi2 CLI invocation.
+
+    Relative paths in the arguments are resolved against the working directory of the job,
+    which defaults to the working directory of the worker.
+    """
+
+    id: str
+    args: list[str]
+    cwd: Optional[Path] = None
+
+
+class JobResult(pydantic.BaseModel):
+    """The result of a job, with everything the CLI invocation would have printed."""
+
+    id: Optional[str]
+    exit_code: int
+    stdout: str = ""
+    stderr: str = ""
+
+
+class Worker:
+    """Run cachi2 commands in-process, one job at a time.
+
+    Everything that lives longer than one command stays warm between jobs: imported modules,
+    HTTP connection pools, cache directory and toolchain lookups. Everything that belongs to
+    a single job is reset after the job: the configuration, the log level and the working
+    directory.
+    """
+
+    def __init__(self, app: typer.Typer) -> None:
+        """Create a worker running the commands of the given CLI app."""
+        self._command = typer.main.get_command(app)
+        self._cli_commands = set(getattr(self._command, "commands", {}))
+
+    def handle_line(self, line: str) -> JobResult:
+        """Parse a JSON-lines job and run it."""
+        try:
+            job = parse_user_input(Job.model_validate_json, line)
+        except Cachi2Error as e:
+            return _error_result(_get_job_id(line), e)
+        return self.run(job)
+
+    def run(self, job: Job) -> JobResult:
+        """Run a job, isolated from the jobs before and after it."""
+        command = next((arg for arg in job.args if arg in self._cli_commands), None)
+        if command not in JOB_COMMANDS:
+            error = InvalidInput(
+                f"Unsupported job command: {command}",
+                solution=f"Jobs can only run: {', '.join(sorted(JOB_COMMANDS))}",
+            )
+            return _error_result(job.id, error)
+
+        log.info("Running job %s: cachi2 %s", job.id, " ".join(job.args))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with _isolated_job(job.cwd, stdout, stderr):
+            exit_code = self._invoke(job.args)
+        log.info("Job %s finished with exit code %d", job.id, exit_code)
+
+        return JobResult(
+            id=job.id, exit_code=exit_code, stdout=stdout.getvalue(), stderr=stderr.getvalue()
+        )
+
+    def _invoke(self, args: list[str]) -> int:
+        try:
+            self._command.main(args=args, prog_name="cachi2", standalone_mode=True)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            # unexpected errors get logged by the CLI already, but the worker must survive them
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def process_lines(self, lines: Iterable[str]) -> Iterator[JobResult]:
+        """Run the jobs from an iterable of JSON lines, yield the result of each job."""
+        for line in lines:
+            if line.strip():
+                yield self.handle_line(line)
+
+    def serve_unix_socket(self, socket_path: Path) -> None:
+        """Accept connections on a Unix socket, every connection can send any number of jobs."""
+        worker = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                lines = (line.decode("utf-8") for line in self.rfile)
+                for result in worker.process_lines(lines):
+                    self.wfile.write(result.model_dump_json().encode("utf-8") + b"\n")
+
+        socket_path.unlink(missing_ok=True)
+        # jobs change process-wide state (cwd, stdout, config), so serve one connection at a time
+        with socketserver.UnixStreamServer(str(socket_path), Handler) as server:
+            log.info("Listening on %s", socket_path)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                log.info("Stopping the worker")
+            finally:
+                socket_path.unlink(missing_ok=True)
+
+
+@contextlib.contextmanager
+def _isolated_job(cwd: Optional[Path], stdout: IO[str], stderr: IO[str]) -> Iterator[None]:
+    """Capture the output of a job and undo its changes to the process-wide state afterwards."""
+    original_cwd = Path.cwd()
+    original_config = config.config
+    cachi2_logger = logging.getLogger("cachi2")
+    original_level = cachi2_logger.level
+
+    job_log_handler = logging.StreamHandler(stderr)
+    job_log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    cachi2_logger.addHandler(job_log_handler)
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            yield
+    finally:
+        cachi2_logger.removeHandler(job_log_handler)
+        cachi2_logger.setLevel(original_level)
+        config.config = original_config
+        os.chdir(original_cwd)
+
+
+def _error_result(job_id: Optional[str], error: Cachi2Error) -> JobResult:
+    """Report an error the same way as the CLI does."""
+    log.error("Job %s: %s: %s", job_id, type(error).__name__, error)
+    return JobResult(
+        id=job_id,
+        exit_code=2 if error.is_invalid_usage else 1,
+        stderr=f"Error: {type(error).__name__}: {error.friendly_msg()}\n",
+    )
+
+
+def _get_job_id(line: str) -> Optional[str]:
+    """Try to get the id of an invalid job, to let the client know which job failed."""
+    try:
+        job_id = json.loads(line).get("id")
+    except (ValueError, AttributeError):
+        return None
+    return job_id if isinstance(job_id, str) else None
+
+
+def serve(app: typer.Typer, socket_path: Optional[Path]) -> None:
+    """Process jobs from a Unix socket or, if no socket is given, from stdin."""
+    worker = Worker(app)
+    if socket_path:
+        worker.serve_unix_socket(socket_path)
+    else:
+        # job results go to stdout, make sure nothing else does
+        output = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            for result in worker.process_lines(sys.stdin):
+                print(result.model_dump_json(), file=output, flush=True)
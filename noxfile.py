@@ -143,6 +143,15 @@ def generate_test_data(session: Session) -> None:
     )
 
 
+@nox.session()
+def benchmarks(session: Session) -> None:
+    """Run the fetch-deps benchmarks against a local stand-in server."""
+    install_requirements(session)
+    session.install(".")
+    cmd = "pytest --log-cli-level=WARNING tests/benchmarks"
+    session.run(*cmd.split(), *session.posargs, env={"CACHI2_RUN_BENCHMARKS": "true"})
+
+
 @nox.session(name="pip-compile")
 def pip_compile(session: Session) -> None:
     """Update requirements.txt and requirements-extras.txt files."""
@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Record the HTTP traffic of a cachi2 run and replay it from the stand-in server.
+
+A cassette is a directory with an index.json file and the recorded response bodies, stored
+under bodies/ by their sha256 digest (the same body is only stored once). Recording captures
+everything cachi2 downloads through:
+
+- general.async_download_files (npm, pip, rpm, generic)
+- general.download_binary_file (pip VCS/URL requirements, bundler)
+- the pypi_simple client (pip index lookups)
+
+Replaying rewrites the URLs of the same entry points so that every request is answered by a
+StandInServer from the recorded responses, with the latency and bandwidth of the server. URLs
+that were not recorded get a 404, nothing ever reaches the network.
+
+Traffic made by external tools (go, yarn, bundler, cargo) is not captured.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+import pypi_simple
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from yarl import URL
+
+from cachi2.core.package_managers import general
+
+if TYPE_CHECKING:
+    from tests.benchmarks.standin import StandInServer
+
+log = logging.getLogger(__name__)
+
+
+def cassette_key(url: str) -> str:
+    """Normalize a URL to the form used to look up recorded responses.
+
+    Credentials and fragments are never sent to the server, so they are not part of the key.
+    """
+    return str(URL(url).with_user(None).with_fragment(None))
+
+
+@dataclass
+class RecordedResponse:
+    """A recorded response, the body is stored separately."""
+
+    status: int
+    content_type: str
+    sha256: str
+
+
+class Cassette:
+    """An archive of recorded responses, keyed by URL."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the cassette at path, the directory does not need to exist yet."""
+        self.path = path
+        self.metadata: dict[str, Any] = {}
+        self.responses: dict[str, RecordedResponse] = {}
+
+        index = path / "index.json"
+        if index.exists():
+            data = json.loads(index.read_text())
+            self.metadata = data["metadata"]
+            self.responses = {
+                url: RecordedResponse(**response) for url, response in data["responses"].items()
+            }
+
+    def body_path(self, response: RecordedResponse) -> Path:
+        return self.path / "bodies" / response.sha256
+
+    def record(
+        self,
+        url: str,
+        body: bytes,
+        status: int = 200,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        sha256 = hashlib.sha256(body).hexdigest()
+        body_path = self.path / "bodies" / sha256
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+        self.responses[cassette_key(url)] = RecordedResponse(status, content_type, sha256)
+
+    def save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        data = {
+            "metadata": self.metadata,
+            "responses": {url: asdict(response) for url, response in self.responses.items()},
+        }
+        self.path.joinpath("index.json").write_text(json.dumps(data, indent=2, sort_keys=True))
+        log.info("Saved %d responses to %s", len(self.responses), self.path)
+
+
+class _CassetteAdapter(BaseAdapter):
+    """Wrap the transport adapter of a requests session to record or redirect its requests."""
+
+    def __init__(
+        self,
+        wrapped: BaseAdapter,
+        cassette: Cassette,
+        server: Optional["StandInServer"] = None,
+    ) -> None:
+        super().__init__()
+        self.wrapped = wrapped
+        self.cassette = cassette
+        self.server = server
+
+    def send(
+        self, request: requests.PreparedRequest, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        if self.server is not None:
+            request.url = self.server.replay_url(request.url or "")
+            return self.wrapped.send(request, *args, **kwargs)
+
+        response = self.wrapped.send(request, *args, **kwargs)
+        # reading the content here is fine for streamed responses too, requests serves
+        # the subsequent iter_content() calls from the already read content
+        self.cassette.record(
+            request.url or "",
+            response.content,
+            response.status_code,
+            response.headers.get("Content-Type", "application/octet-stream"),
+        )
+        return response
+
+    def close(self) -> None:
+        self.wrapped.close()
+
+
+class CassettePlayer:
+    """Patch the cachi2 download entry points to record to or replay from a cassette."""
+
+    def __init__(
+        self, cassette: Cassette, monkeypatch: pytest.MonkeyPatch, server: Optional["StandInServer"]
+    ) -> None:
+        """Prepare to record (server is None) or to replay from the given stand-in server."""
+        self.cassette = cassette
+        self.server = server
+        self._monkeypatch = monkeypatch
+
+    @classmethod
+    def record(cls, cassette: Cassette, monkeypatch: pytest.MonkeyPatch) -> "CassettePlayer":
+        player = cls(cassette, monkeypatch, server=None)
+        player._patch()
+        return player
+
+    @classmethod
+    def replay(
+        cls, cassette: Cassette, monkeypatch: pytest.MonkeyPatch, server: "StandInServer"
+    ) -> "CassettePlayer":
+        for url, response in cassette.responses.items():
+            server.add_recorded_response(url, response, cassette.body_path(response))
+        player = cls(cassette, monkeypatch, server=server)
+        player._patch()
+        return player
+
+    def _patch(self) -> None:
+        self._patch_session(general.pkg_requests_session)
+        self._patch_pypi_simple()
+        self._patch_async_download()
+
+    def _patch_session(self, session: requests.Session) -> None:
+        for prefix, adapter in list(session.adapters.items()):
+            self._monkeypatch.setitem(
+                session.adapters, prefix, _CassetteAdapter(adapter, self.cassette, self.server)
+            )
+
+    def _patch_pypi_simple(self) -> None:
+        original_init = pypi_simple.PyPISimple.__init__
+        player = self
+
+        def init(client: pypi_simple.PyPISimple, *args: Any, **kwargs: Any) -> None:
+            original_init(client, *args, **kwargs)
+            # the client may share its session with others, do not wrap the adapters twice
+            for prefix, adapter in list(client.s.adapters.items()):
+                if not isinstance(adapter, _CassetteAdapter):
+                    client.s.adapters[prefix] = _CassetteAdapter(
+                        adapter, player.cassette, player.server
+                    )
+
+        self._monkeypatch.setattr(pypi_simple.PyPISimple, "__init__", init)
+
+    def _patch_async_download(self) -> None:
+        original: Callable[..., Any] = general._async_download_binary_file
+        cassette = self.cassette
+        server = self.server
+
+        async def download(
+            session: Any,
+            url: str,
+            download_path: Union[str, PathLike[str]],
+            *args: Any,
+            **kwargs: Any,
+        ) -> None:
+            if server is not None:
+                await original(session, server.replay_url(url), download_path, *args, **kwargs)
+                return
+
+            await original(session, url, download_path, *args, **kwargs)
+            cassette.record(url, Path(download_path).read_bytes())
+
+        self._monkeypatch.setattr(general, "_async_download_binary_file", download)
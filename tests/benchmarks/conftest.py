@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from tests.benchmarks.standin import StandInServer
+from tests.benchmarks.timing import Baselines, BenchmarkResult
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BASELINES = Path(__file__).parent / "baselines.json"
+
+
+def _float_env(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+@pytest.fixture(scope="session")
+def benchmark_scale() -> float:
+    """Multiplier for the size of the synthetic projects, 1.0 means the full size."""
+    return _float_env("CACHI2_BENCHMARK_SCALE", 1.0)
+
+
+@pytest.fixture(scope="session")
+def benchmark_settings(benchmark_scale: float) -> str:
+    """Identify the settings of this run, results are only comparable for equal settings."""
+    latency_ms = _float_env("CACHI2_BENCHMARK_LATENCY_MS", 0)
+    bandwidth = os.getenv("CACHI2_BENCHMARK_BANDWIDTH", "unlimited")
+    return f"scale={benchmark_scale},latency_ms={latency_ms:g},bandwidth={bandwidth}"
+
+
+@pytest.fixture(scope="session")
+def standin_server() -> Iterator[StandInServer]:
+    """Start the stand-in server for all benchmarks.
+
+    CACHI2_BENCHMARK_LATENCY_MS: delay added to every response
+    CACHI2_BENCHMARK_BANDWIDTH: maximum bytes per second for every response body
+    """
+    latency = _float_env("CACHI2_BENCHMARK_LATENCY_MS", 0) / 1000
+    bandwidth = os.getenv("CACHI2_BENCHMARK_BANDWIDTH")
+
+    with StandInServer(latency, int(bandwidth) if bandwidth else None) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def baselines() -> Iterator[Baselines]:
+    """Load the stored baselines and save them at the end if CACHI2_BENCHMARK_UPDATE_BASELINES."""
+    path = Path(os.getenv("CACHI2_BENCHMARK_BASELINES", DEFAULT_BASELINES))
+    tolerance = _float_env("CACHI2_BENCHMARK_TOLERANCE", 0.25)
+    baselines = Baselines(path, tolerance)
+
+    yield baselines
+
+    if os.getenv("CACHI2_BENCHMARK_UPDATE_BASELINES") == "true":
+        log.info("Saving benchmark baselines to %s", path)
+        baselines.save()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results() -> Iterator[list[BenchmarkResult]]:
+    """Collect the results of all benchmarks and write them to CACHI2_BENCHMARK_REPORT."""
+    results: list[BenchmarkResult] = []
+
+    yield results
+
+    for result in results:
+        log.warning(result.summary())
+
+    if report := os.getenv("CACHI2_BENCHMARK_REPORT"):
+        Path(report).write_text(
+            json.dumps([result.to_dict() for result in results], indent=2) + "\n"
+        )
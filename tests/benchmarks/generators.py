@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Generators for large synthetic projects served by the stand-in server.
+
+Every generator writes a project into a source directory, registers all of the artifacts the
+project depends on with a StandInServer and returns a SyntheticProject describing what to pass
+to cachi2. The content is deterministic: running a generator twice with the same size produces
+the same files and the same checksums.
+"""
+import base64
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import yaml
+from git import Repo
+
+from tests.benchmarks.standin import GoModuleVersion, StandInServer
+
+# sizes requested for the full-scale benchmarks, multiplied by CACHI2_BENCHMARK_SCALE
+NPM_PACKAGES = 50_000
+PIP_REQUIREMENTS = 2_000
+RPM_PACKAGES = 5_000
+GENERIC_ARTIFACTS = 10_000
+GO_MODULES = 3_000
+
+GO_MODULE_PREFIX = "bench.example"
+GO_MODULE_TIME = "2024-01-01T00:00:00Z"
+
+
+@dataclass
+class SyntheticProject:
+    """A generated project, ready to be processed by cachi2."""
+
+    name: str
+    source_dir: Path
+    packages: list[dict[str, Any]]
+    n_dependencies: int
+    n_bytes: int
+    config: dict[str, Any] = field(default_factory=dict)
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _sri_sha512(content: bytes) -> str:
+    return "sha512-" + base64.b64encode(hashlib.sha512(content).digest()).decode()
+
+
+def _payload(kind: str, i: int, size: int = 512) -> bytes:
+    """Return deterministic, poorly compressible content of roughly the given size."""
+    seed = hashlib.sha256(f"{kind}-{i}".encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+def _tar_gz(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = 0
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def init_git_repo(source_dir: Path, name: str) -> None:
+    """Commit the source directory to a git repository with a resolvable 'origin' remote.
+
+    The origin URL looks like a real hosted repository, git is told to fetch it from a local bare
+    clone instead, so that operations like fetching tags work without network access.
+    """
+    repo = Repo.init(source_dir)
+    repo.git.config("user.name", "cachi2-benchmarks")
+    repo.git.config("user.email", "cachi2-benchmarks@example.com")
+    repo.git.add("--all")
+    repo.index.commit("Synthetic benchmark project")
+
+    origin_url = f"https://github.com/cachi2-benchmarks/{name}.git"
+    bare_dir = source_dir.parent / f"{source_dir.name}-origin.git"
+    Repo.clone_from(source_dir, bare_dir, bare=True)
+
+    repo.create_remote("origin", origin_url)
+    repo.git.config(f"url.{bare_dir.as_uri()}.insteadOf", origin_url)
+    repo.remote("origin").fetch()
+
+
+def generate_npm_project(
+    server: StandInServer, source_dir: Path, n_packages: int = NPM_PACKAGES
+) -> SyntheticProject:
+    """Generate a package-lock.json with n_packages tarball dependencies."""
+    source_dir.mkdir(parents=True)
+    dependencies = {}
+    lock_packages: dict[str, Any] = {}
+    n_bytes = 0
+
+    for i in range(n_packages):
+        name = f"synthetic-pkg-{i:05}"
+        tarball = gzip.compress(_payload("npm", i), mtime=0)
+        n_bytes += len(tarball)
+        url = server.add_file(f"npm/{name}/-/{name}-1.0.0.tgz", tarball)
+
+        dependencies[name] = "^1.0.0"
+        lock_packages[f"node_modules/{name}"] = {
+            "version": "1.0.0",
+            "resolved": url,
+            "integrity": _sri_sha512(tarball),
+            # every fifth package is a dev dependency, like in a typical frontend project
+            **({"dev": True} if i % 5 == 0 else {}),
+        }
+
+    package_json = {"name": "npm-bench", "version": "1.0.0", "dependencies": dependencies}
+    package_lock = {
+        "name": "npm-bench",
+        "version": "1.0.0",
+        "lockfileVersion": 3,
+        "requires": True,
+        "packages": {"": package_json, **lock_packages},
+    }
+    source_dir.joinpath("package.json").write_text(json.dumps(package_json, indent=2))
+    source_dir.joinpath("package-lock.json").write_text(json.dumps(package_lock, indent=2))
+    init_git_repo(source_dir, "npm-bench")
+
+    return SyntheticProject("npm", source_dir, [{"type": "npm"}], n_packages, n_bytes)
+
+
+def generate_pip_project(
+    server: StandInServer, source_dir: Path, n_requirements: int = PIP_REQUIREMENTS
+) -> SyntheticProject:
+    """Generate a hashed requirements.txt with n_requirements sdist dependencies."""
+    source_dir.mkdir(parents=True)
+    lines = [f"--index-url {server.pypi_index_url}"]
+    n_bytes = 0
+
+    for i in range(n_requirements):
+        name = f"synthetic-pkg-{i:04}"
+        dist_name = name.replace("-", "_")
+        pkg_info = f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0.0\n".encode()
+        sdist = _tar_gz(
+            {
+                f"{dist_name}-1.0.0/PKG-INFO": pkg_info,
+                f"{dist_name}-1.0.0/{dist_name}/__init__.py": _payload("pip", i),
+            }
+        )
+        n_bytes += len(sdist)
+        server.add_pypi_distribution(name, f"{dist_name}-1.0.0.tar.gz", sdist)
+        lines.append(f"{name}==1.0.0 --hash=sha256:{_sha256(sdist)}")
+
+    source_dir.joinpath("requirements.txt").write_text("\n".join(lines) + "\n")
+    source_dir.joinpath("pyproject.toml").write_text(
+        '[project]\nname = "pip-bench"\nversion = "1.0.0"\n'
+    )
+    init_git_repo(source_dir, "pip-bench")
+
+    return SyntheticProject("pip", source_dir, [{"type": "pip"}], n_requirements, n_bytes)
+
+
+def generate_rpm_project(
+    server: StandInServer, source_dir: Path, n_packages: int = RPM_PACKAGES
+) -> SyntheticProject:
+    """Generate an rpms.lock.yaml with n_packages RPMs spread over a few repositories.
+
+    The RPM files are not real RPMs, see the rpm benchmark for how their headers are read.
+    """
+    source_dir.mkdir(parents=True)
+    packages = []
+    n_bytes = 0
+
+    for i in range(n_packages):
+        filename = f"synthetic-pkg-{i:04}-1.0-1.el9.x86_64.rpm"
+        content = _payload("rpm", i, size=2048)
+        n_bytes += len(content)
+        url = server.add_file(f"rpm/x86_64/Packages/{filename}", content)
+        packages.append(
+            {
+                "url": url,
+                "repoid": f"bench-repo-{i % 4}",
+                "checksum": f"sha256:{_sha256(content)}",
+                "size": len(content),
+            }
+        )
+
+    lockfile = {
+        "lockfileVersion": 1,
+        "lockfileVendor": "redhat",
+        "arches": [{"arch": "x86_64", "packages": packages}],
+    }
+    source_dir.joinpath("rpms.lock.yaml").write_text(yaml.safe_dump(lockfile))
+    init_git_repo(source_dir, "rpm-bench")
+
+    return SyntheticProject("rpm", source_dir, [{"type": "rpm"}], n_packages, n_bytes)
+
+
+def generate_generic_project(
+    server: StandInServer, source_dir: Path, n_artifacts: int = GENERIC_ARTIFACTS
+) -> SyntheticProject:
+    """Generate an artifacts.lock.yaml with n_artifacts URL artifacts."""
+    source_dir.mkdir(parents=True)
+    artifacts = []
+    n_bytes = 0
+
+    for i in range(n_artifacts):
+        content = _payload("generic", i, size=1024)
+        n_bytes += len(content)
+        url = server.add_file(f"generic/artifact-{i:05}.bin", content)
+        artifacts.append({"download_url": url, "checksum": f"sha256:{_sha256(content)}"})
+
+    lockfile = {"metadata": {"version": "1.0"}, "artifacts": artifacts}
+    source_dir.joinpath("artifacts.lock.yaml").write_text(yaml.safe_dump(lockfile))
+    init_git_repo(source_dir, "generic-bench")
+
+    return SyntheticProject("generic", source_dir, [{"type": "generic"}], n_artifacts, n_bytes)
+
+
+def _go_h1(files: list[tuple[str, bytes]]) -> str:
+    """Compute the go.sum 'h1:' hash of a list of files (see golang.org/x/mod/sumdb/dirhash)."""
+    summary = "".join(f"{_sha256(content)}  {name}\n" for name, content in sorted(files))
+    return "h1:" + base64.b64encode(hashlib.sha256(summary.encode()).digest()).decode()
+
+
+def _go_module(i: int) -> str:
+    return f"{GO_MODULE_PREFIX}/m{i:04}"
+
+
+def generate_gomod_project(
+    server: StandInServer, source_dir: Path, n_modules: int = GO_MODULES
+) -> SyntheticProject:
+    """Generate a Go module depending on n_modules modules served by the GOPROXY routes.
+
+    The dependencies form a binary tree: module i imports modules 2i+1 and 2i+2, the main module
+    only imports module 0. The go.sum file is complete, so Go never needs to consult a checksum
+    database.
+    """
+    source_dir.mkdir(parents=True)
+    version = "v1.0.0"
+    go_sum = []
+    n_bytes = 0
+
+    for i in range(n_modules):
+        module = _go_module(i)
+        package = f"m{i:04}"
+        children = [_go_module(c) for c in (2 * i + 1, 2 * i + 2) if c < n_modules]
+
+        go_mod = f"module {module}\n\ngo 1.21\n"
+        if children:
+            go_mod += "\nrequire (\n" + "".join(f"\t{c} {version}\n" for c in children) + ")\n"
+        imports = "".join(f'import _ "{c}"\n' for c in children)
+        go_file = f'package {package}\n\n{imports}\nconst Name = "{package}"\n'.encode()
+
+        prefix = f"{module}@{version}/"
+        zip_files = [(prefix + "go.mod", go_mod.encode()), (prefix + f"{package}.go", go_file)]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for name, content in zip_files:
+                zf.writestr(name, content)
+        module_zip = buffer.getvalue()
+        n_bytes += len(module_zip)
+
+        info = json.dumps({"Version": version, "Time": GO_MODULE_TIME}).encode()
+        server.add_go_module(module, version, GoModuleVersion(info, go_mod.encode(), module_zip))
+
+        go_sum.append(f"{module} {version} {_go_h1(zip_files)}")
+        go_sum.append(f"{module} {version}/go.mod {_go_h1([('go.mod', go_mod.encode())])}")
+
+    requires = "".join(f"\t{_go_module(i)} {version}\n" for i in range(n_modules))
+    source_dir.joinpath("go.mod").write_text(
+        f"module github.com/cachi2-benchmarks/gomod-bench\n\ngo 1.21\n\nrequire (\n{requires})\n"
+    )
+    source_dir.joinpath("go.sum").write_text("\n".join(sorted(go_sum)) + "\n")
+    source_dir.joinpath("main.go").write_text(
+        f'package main\n\nimport _ "{_go_module(0)}"\n\nfunc main() {{}}\n'
+    )
+    init_git_repo(source_dir, "gomod-bench")
+
+    return SyntheticProject(
+        "gomod",
+        source_dir,
+        [{"type": "gomod"}],
+        n_modules,
+        n_bytes,
+        config={"goproxy_url": server.goproxy_url},
+    )
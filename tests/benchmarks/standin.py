@@ -0,0 +1,271 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""A local stand-in for the remote services cachi2 talks to.
+
+The server keeps every artifact in memory and serves it over plain HTTP from 127.0.0.1. It can
+mimic several kinds of upstreams at once:
+
+- /files/<path>                 static artifacts (npm tarballs, generic artifacts, RPMs, sdists)
+- /simple/<project>/            a PEP 503 PyPI simple index built from the registered dists
+- /goproxy/<module>/@v/<file>   a GOPROXY serving the registered Go module versions
+- /cassette/<scheme>/<url>      responses recorded from real upstreams, see cassette.py
+
+Every response can be delayed by a fixed latency and throttled to a maximum bandwidth, which
+makes the network-bound phases of a benchmark behave like a (predictable) remote service.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from html import escape
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import web
+from aiohttp.typedefs import Handler
+from yarl import URL
+
+from tests.benchmarks.cassette import RecordedResponse, cassette_key
+from tests.integration.utils import TEST_SERVER_LOCALHOST
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class PyPIDistribution:
+    """A file registered under a project in the simple index."""
+
+    filename: str
+    content: bytes
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.content).hexdigest()
+
+
+@dataclass
+class GoModuleVersion:
+    """A Go module version as served by a GOPROXY."""
+
+    info: bytes
+    mod: bytes
+    zip: bytes
+
+
+@dataclass
+class StandInStats:
+    """Counters collected by the server, reset between benchmark runs."""
+
+    requests: int = 0
+    bytes_sent: int = 0
+    by_route: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class StandInServer:
+    """In-memory HTTP server with configurable latency and bandwidth."""
+
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[int] = None) -> None:
+        """Initialize the server.
+
+        :param latency: seconds to wait before answering each request
+        :param bandwidth: maximum bytes per second for each response body, None means unlimited
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.stats = StandInStats()
+
+        self._files: dict[str, bytes] = {}
+        self._pypi_projects: dict[str, list[PyPIDistribution]] = defaultdict(list)
+        self._go_modules: dict[str, dict[str, GoModuleVersion]] = defaultdict(dict)
+        self._recorded: dict[str, tuple[RecordedResponse, Path]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{TEST_SERVER_LOCALHOST}:{self.port}"
+
+    def file_url(self, path: str) -> str:
+        return f"{self.url}/files/{path}"
+
+    @property
+    def pypi_index_url(self) -> str:
+        return f"{self.url}/simple"
+
+    @property
+    def goproxy_url(self) -> str:
+        return f"{self.url}/goproxy"
+
+    def replay_url(self, url: str) -> str:
+        """Return the URL under which this server replays the recorded response for url.
+
+        The original URL is kept as the path, so relative links in recorded pages still resolve
+        to other recorded responses.
+        """
+        if url.startswith(self.url):
+            return url
+        parsed = URL(cassette_key(url))
+        return f"{self.url}/cassette/{parsed.scheme}/{str(parsed)[len(parsed.scheme) + 3 :]}"
+
+    # -- registration -------------------------------------------------------------------------
+
+    def add_file(self, path: str, content: bytes) -> str:
+        """Register a static artifact and return its URL."""
+        self._files[path] = content
+        return self.file_url(path)
+
+    def add_pypi_distribution(self, project: str, filename: str, content: bytes) -> str:
+        """Register a distribution file for a project in the simple index and return its URL."""
+        self._pypi_projects[_normalize_project_name(project)].append(
+            PyPIDistribution(filename, content)
+        )
+        return self.add_file(f"pypi/{filename}", content)
+
+    def add_go_module(self, module: str, version: str, module_version: GoModuleVersion) -> None:
+        """Register a Go module version for the GOPROXY routes."""
+        self._go_modules[module][version] = module_version
+
+    def add_recorded_response(self, url: str, response: RecordedResponse, body: Path) -> None:
+        """Register a recorded response, the body is read from the file on every request."""
+        self._recorded[cassette_key(url)] = (response, body)
+
+    def reset_stats(self) -> None:
+        self.stats = StandInStats()
+
+    # -- lifecycle ----------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start serving from a background thread with its own event loop."""
+        self._thread = threading.Thread(target=self._serve, name="standin-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        log.info("Stand-in server listening on %s", self.url)
+
+    def stop(self) -> None:
+        if self._loop is None or self._runner is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def _serve(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        app = web.Application(middlewares=[self._latency_middleware])
+        app.router.add_get("/files/{path:.+}", self._handle_file)
+        app.router.add_get("/simple/{project}/", self._handle_simple_project)
+        app.router.add_get("/goproxy/{module:.+}/@v/list", self._handle_go_list)
+        app.router.add_get("/goproxy/{module:.+}/@v/{version}.{ext:info|mod|zip}", self._handle_go)
+        app.router.add_get("/cassette/{url:.+}", self._handle_recorded)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, TEST_SERVER_LOCALHOST, 0)
+        self._loop.run_until_complete(site.start())
+        # the OS picked a free port for us
+        self.port = self._runner.addresses[0][1]
+
+        self._started.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    # -- handlers -----------------------------------------------------------------------------
+
+    @web.middleware
+    async def _latency_middleware(
+        self, request: web.Request, handler: Handler
+    ) -> web.StreamResponse:
+        self.stats.requests += 1
+        route = request.path.split("/", 2)[1]
+        self.stats.by_route[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def _send(
+        self,
+        request: web.Request,
+        body: bytes,
+        content_type: str = "application/octet-stream",
+        status: int = 200,
+    ) -> web.StreamResponse:
+        """Send the body in chunks, sleeping between them to respect the bandwidth limit."""
+        response = web.StreamResponse(status=status, headers={"Content-Type": content_type})
+        response.content_length = len(body)
+        await response.prepare(request)
+
+        for offset in range(0, len(body), CHUNK_SIZE):
+            chunk = body[offset : offset + CHUNK_SIZE]
+            await response.write(chunk)
+            if self.bandwidth:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+
+        await response.write_eof()
+        self.stats.bytes_sent += len(body)
+        return response
+
+    async def _handle_file(self, request: web.Request) -> web.StreamResponse:
+        content = self._files.get(request.match_info["path"])
+        if content is None:
+            raise web.HTTPNotFound()
+        return await self._send(request, content)
+
+    async def _handle_simple_project(self, request: web.Request) -> web.StreamResponse:
+        project = _normalize_project_name(request.match_info["project"])
+        if project not in self._pypi_projects:
+            raise web.HTTPNotFound()
+
+        links = "\n".join(
+            f'<a href="{escape(self.file_url("pypi/" + dist.filename))}#sha256={dist.sha256}">'
+            f"{escape(dist.filename)}</a><br/>"
+            for dist in self._pypi_projects[project]
+        )
+        page = (
+            "<!DOCTYPE html>\n<html><head><meta name='pypi:repository-version' content='1.0'>"
+            f"<title>Links for {escape(project)}</title></head>\n<body>\n{links}\n</body></html>"
+        )
+        return await self._send(request, page.encode(), "text/html")
+
+    async def _handle_go_list(self, request: web.Request) -> web.StreamResponse:
+        versions = self._go_modules.get(request.match_info["module"])
+        if not versions:
+            raise web.HTTPNotFound()
+        return await self._send(request, "\n".join(versions).encode(), "text/plain")
+
+    async def _handle_go(self, request: web.Request) -> web.StreamResponse:
+        versions = self._go_modules.get(request.match_info["module"], {})
+        module_version = versions.get(request.match_info["version"])
+        if module_version is None:
+            raise web.HTTPNotFound()
+        return await self._send(request, getattr(module_version, request.match_info["ext"]))
+
+    async def _handle_recorded(self, request: web.Request) -> web.StreamResponse:
+        # use the raw path, the recorded URLs are stored with their original quoting
+        scheme, _, rest = request.raw_path.removeprefix("/cassette/").partition("/")
+        recorded = self._recorded.get(cassette_key(f"{scheme}://{rest}"))
+        if recorded is None:
+            raise web.HTTPNotFound()
+        response, body = recorded
+        return await self._send(request, body.read_bytes(), response.content_type, response.status)
+
+
+def _normalize_project_name(name: str) -> str:
+    """Normalize a project name as described in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
@@ -0,0 +1,304 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""End-to-end performance benchmarks of cachi2 fetch-deps on large synthetic projects.
+
+The benchmarks only run when CACHI2_RUN_BENCHMARKS=true, see `nox -s benchmarks`.
+"""
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+import typer.testing
+import yaml
+
+import cachi2.core.config
+from cachi2.core import checksum
+from cachi2.core.models.output import RequestOutput
+from cachi2.core.package_managers import gomod, npm, pip
+from cachi2.core.package_managers.generic import main as generic_main
+from cachi2.core.package_managers.rpm import main as rpm_main
+from cachi2.core.utils import get_cache_dir
+from cachi2.interface.cli import app
+from tests.benchmarks import generators
+from tests.benchmarks.cassette import Cassette, CassettePlayer
+from tests.benchmarks.generators import SyntheticProject
+from tests.benchmarks.standin import StandInServer
+from tests.benchmarks.timing import Baselines, BenchmarkResult, PhaseTimer
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("CACHI2_RUN_BENCHMARKS") != "true",
+    reason="benchmarks only run with CACHI2_RUN_BENCHMARKS=true",
+)
+
+runner = typer.testing.CliRunner()
+
+Generator = Callable[[StandInServer, Path, int], SyntheticProject]
+
+
+def _instrument_common(timer: PhaseTimer) -> None:
+    for module in (npm, pip, generic_main, rpm_main):
+        timer.instrument(module, "async_download_files", "download")
+    for module in (npm, pip, generic_main):
+        timer.instrument(module, "must_match_any_checksum", "verify")
+    timer.instrument(RequestOutput, "generate_sbom", "sbom")
+    # the external tools (go, yarn, rpm, ...) are run via utils.run_cmd and
+    # utils.run_cmd_json_stream, both of which start a subprocess.Popen
+    timer.count(subprocess, "Popen", "subprocesses")
+
+
+def _instrument_npm(timer: PhaseTimer) -> None:
+    timer.instrument(npm.PackageLock, "from_file", "parse")
+    timer.instrument(npm.PackageLock, "get_sbom_components", "components")
+    timer.instrument(npm, "_update_package_lock_with_local_paths", "rewrite")
+    timer.instrument(npm.PackageLock, "get_project_file", "rewrite")
+
+
+def _instrument_pip(timer: PhaseTimer) -> None:
+    timer.instrument(pip, "_process_package_distributions", "index")
+    timer.instrument(pip, "_check_metadata_in_sdist", "sdist-metadata")
+
+
+def _instrument_rpm(timer: PhaseTimer) -> None:
+    timer.instrument(rpm_main.RedhatRpmsLock, "model_validate", "parse")
+    timer.instrument(rpm_main, "_verify_downloaded", "verify")
+    timer.instrument(rpm_main, "_generate_sbom_components", "components")
+
+
+def _instrument_generic(timer: PhaseTimer) -> None:
+    timer.instrument(generic_main, "_load_lockfile", "parse")
+
+
+def _instrument_gomod(timer: PhaseTimer) -> None:
+    timer.instrument(gomod.ModuleVersionResolver, "from_repo_path", "git-tags")
+    timer.instrument(gomod, "_resolve_gomod", "resolve")
+    timer.instrument(gomod.Go, "_run", "go")
+    timer.instrument(gomod.Go, "json_stream", "go")
+    timer.instrument(gomod, "_create_packages_from_parsed_data", "components")
+    timer.instrument(gomod, "_link_download_cache", "copy-cache")
+    timer.instrument(gomod.GoCacheTemporaryDirectory, "__exit__", "clean-cache")
+
+
+def _query_rpm_fields_from_filename(file_path: Path) -> dict[str, str]:
+    """Read the NVRA from the file name, the synthetic RPMs have no headers to query."""
+    match = re.fullmatch(r"(.+)-([^-]+)-([^-]+)\.([^.]+)\.rpm", file_path.name)
+    assert match, f"unexpected synthetic RPM name: {file_path.name}"
+    name, version, release, arch = match.groups()
+    return {"name": name, "version": version, "release": release, "arch": arch}
+
+
+@pytest.fixture
+def go_toolchain(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make sure the go1.21.0 toolchain requested for 'go 1.21' projects can be located.
+
+    If it is not installed, but the Go in PATH is a 1.21.x release, expose that one under the
+    cachi2 cache directory instead of letting cachi2 download go1.21.0 (which needs network).
+    """
+    release = "go1.21.0"
+    if gomod.Go._locate_toolchain(release):
+        return
+
+    try:
+        go_version = subprocess.run(
+            ["go", "env", "GOVERSION", "GOROOT"], capture_output=True, text=True, check=True
+        ).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("the gomod benchmark needs a Go toolchain")
+
+    system_release, goroot = go_version
+    if not system_release.startswith("go1.21."):
+        pytest.skip(f"the gomod benchmark needs the {release} toolchain or a go1.21.x in PATH")
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+    toolchain_dir = get_cache_dir() / "go" / release
+    toolchain_dir.parent.mkdir(parents=True)
+    toolchain_dir.symlink_to(goroot)
+
+
+@pytest.fixture
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every benchmark with an empty cachi2 cache directory (e.g. no cached index pages)."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+
+
+@pytest.fixture
+def reset_config() -> Iterator[None]:
+    """Do not leak the benchmark configuration to other tests."""
+    yield
+    cachi2.core.config.config = None
+
+
+def _fetch_deps(
+    source_dir: Path,
+    packages: list[dict[str, Any]],
+    output_dir: Path,
+    config: dict[str, Any],
+    tmp_path: Path,
+) -> float:
+    """Run cachi2 fetch-deps in-process and return how long it took."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump(config))
+
+    start = time.perf_counter()
+    result = runner.invoke(
+        app,
+        [
+            "--config-file",
+            str(config_file),
+            "--log-level",
+            "WARNING",
+            "fetch-deps",
+            "--dev-package-managers",
+            "--source",
+            str(source_dir),
+            "--output",
+            str(output_dir),
+            json.dumps({"packages": packages}),
+        ],
+        catch_exceptions=False,
+    )
+    elapsed = time.perf_counter() - start
+    assert result.exit_code == 0, result.output
+    return elapsed
+
+
+SCENARIOS: dict[str, tuple[Generator, int, Callable[[PhaseTimer], None]]] = {
+    "npm": (generators.generate_npm_project, generators.NPM_PACKAGES, _instrument_npm),
+    "pip": (generators.generate_pip_project, generators.PIP_REQUIREMENTS, _instrument_pip),
+    "rpm": (generators.generate_rpm_project, generators.RPM_PACKAGES, _instrument_rpm),
+    "generic": (
+        generators.generate_generic_project,
+        generators.GENERIC_ARTIFACTS,
+        _instrument_generic,
+    ),
+    "gomod": (generators.generate_gomod_project, generators.GO_MODULES, _instrument_gomod),
+}
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+@pytest.mark.usefixtures("isolated_cache", "reset_config")
+def test_fetch_deps_benchmark(
+    scenario: str,
+    standin_server: StandInServer,
+    benchmark_scale: float,
+    benchmark_settings: str,
+    baselines: Baselines,
+    benchmark_results: list[BenchmarkResult],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    request: pytest.FixtureRequest,
+) -> None:
+    generate, full_size, instrument = SCENARIOS[scenario]
+    if scenario == "gomod":
+        request.getfixturevalue("go_toolchain")
+    if scenario == "rpm":
+        monkeypatch.setattr(
+            rpm_main.Package, "_query_rpm_fields", staticmethod(_query_rpm_fields_from_filename)
+        )
+
+    size = max(1, int(full_size * benchmark_scale))
+    project = generate(standin_server, tmp_path / f"{scenario}-source", size)
+
+    timer = PhaseTimer(monkeypatch)
+    _instrument_common(timer)
+    instrument(timer)
+    # make sure the checksum module is timed also when called from unlisted modules
+    timer.instrument(checksum, "must_match_any_checksum", "verify")
+
+    standin_server.reset_stats()
+    output_dir = tmp_path / "output"
+    elapsed = _fetch_deps(
+        project.source_dir, project.packages, output_dir, project.config, tmp_path
+    )
+
+    # sanity check: the SBOM must contain (at least) every generated dependency
+    sbom = json.loads(output_dir.joinpath("bom.json").read_text())
+    assert len(sbom["components"]) >= project.n_dependencies
+
+    benchmark_result = BenchmarkResult(
+        scenario=scenario,
+        n_dependencies=project.n_dependencies,
+        n_bytes=project.n_bytes,
+        elapsed=elapsed,
+        phases=dict(timer.durations),
+        calls=dict(timer.calls),
+        requests=standin_server.stats.requests,
+        subprocesses=timer.counts["subprocesses"],
+    )
+    benchmark_results.append(benchmark_result)
+
+    key = f"{scenario}[{benchmark_settings}]"
+    regressions = baselines.regressions(key, benchmark_result)
+    baselines.update(key, benchmark_result)
+    assert not regressions, f"{scenario} is slower than the baseline: {'; '.join(regressions)}"
+
+
+@pytest.mark.skipif(
+    not os.getenv("CACHI2_BENCHMARK_CASSETTE"),
+    reason="CACHI2_BENCHMARK_CASSETTE is not set",
+)
+@pytest.mark.usefixtures("isolated_cache", "reset_config")
+def test_fetch_deps_cassette(
+    standin_server: StandInServer,
+    benchmark_settings: str,
+    baselines: Baselines,
+    benchmark_results: list[BenchmarkResult],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Benchmark fetch-deps on a real project, with the upstream responses recorded in a cassette.
+
+    CACHI2_BENCHMARK_CASSETTE_MODE=record runs fetch-deps with network access and records every
+    response. The source directory and the packages to process are taken from
+    CACHI2_BENCHMARK_CASSETTE_SOURCE and CACHI2_BENCHMARK_CASSETTE_PACKAGES (a JSON list, as in
+    the fetch-deps input) and saved in the cassette.
+
+    CACHI2_BENCHMARK_CASSETTE_MODE=replay (the default) runs the recorded project offline, with the
+    stand-in server answering every request from the cassette.
+    """
+    cassette = Cassette(Path(os.environ["CACHI2_BENCHMARK_CASSETTE"]))
+    mode = os.getenv("CACHI2_BENCHMARK_CASSETTE_MODE", "replay")
+    output_dir = tmp_path / "output"
+
+    if mode == "record":
+        source_dir = Path(os.environ["CACHI2_BENCHMARK_CASSETTE_SOURCE"]).resolve()
+        packages = json.loads(os.environ["CACHI2_BENCHMARK_CASSETTE_PACKAGES"])
+        cassette.metadata = {"source": str(source_dir), "packages": packages}
+
+        CassettePlayer.record(cassette, monkeypatch)
+        _fetch_deps(source_dir, packages, output_dir, {}, tmp_path)
+        cassette.save()
+        return
+
+    assert mode == "replay", f"unknown CACHI2_BENCHMARK_CASSETTE_MODE: {mode}"
+    assert cassette.responses, f"no recorded responses in {cassette.path}"
+    source_dir = Path(cassette.metadata["source"])
+    packages = cassette.metadata["packages"]
+
+    timer = PhaseTimer(monkeypatch)
+    _instrument_common(timer)
+    CassettePlayer.replay(cassette, monkeypatch, standin_server)
+
+    standin_server.reset_stats()
+    elapsed = _fetch_deps(source_dir, packages, output_dir, {}, tmp_path)
+    sbom = json.loads(output_dir.joinpath("bom.json").read_text())
+
+    benchmark_result = BenchmarkResult(
+        scenario=f"cassette:{cassette.path.name}",
+        n_dependencies=len(sbom["components"]),
+        n_bytes=standin_server.stats.bytes_sent,
+        elapsed=elapsed,
+        phases=dict(timer.durations),
+        calls=dict(timer.calls),
+        requests=standin_server.stats.requests,
+        subprocesses=timer.counts["subprocesses"],
+    )
+    benchmark_results.append(benchmark_result)
+
+    key = f"{benchmark_result.scenario}[{benchmark_settings}]"
+    regressions = baselines.regressions(key, benchmark_result)
+    baselines.update(key, benchmark_result)
+    assert not regressions, f"{cassette.path} is slower than the baseline: {'; '.join(regressions)}"
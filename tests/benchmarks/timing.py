@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Per-phase timing and baseline bookkeeping for the benchmark suite."""
+import contextlib
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import pytest
+
+
+class PhaseTimer:
+    """Accumulate wall-clock time spent in named phases of a cachi2 run.
+
+    Phases are attached to existing functions with instrument(). The time of a phase is inclusive
+    (a "download" phase called from a "resolve" phase counts towards both), but re-entering a phase
+    that is already running does not count the same time (or the same call) twice.
+    """
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Initialize a PhaseTimer that patches functions via the given monkeypatch."""
+        self._monkeypatch = monkeypatch
+        self._active: dict[str, int] = defaultdict(int)
+        self.durations: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self.counts: dict[str, int] = defaultdict(int)
+        self._counts_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self._active[name]:
+            self.calls[name] += 1
+        self._active[name] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active[name] -= 1
+            if not self._active[name]:
+                self.durations[name] += time.perf_counter() - start
+
+    def instrument(self, target: Any, name: str, phase: str) -> None:
+        """Replace target.name with a wrapper that records its runtime under the given phase.
+
+        Generators are timed while they are being consumed, the time of the consumer included.
+        """
+        static_attr = inspect.getattr_static(target, name)
+        original: Callable[..., Any] = getattr(target, name)
+
+        wrapper: Callable[..., Any]
+        if inspect.iscoroutinefunction(original):
+
+            @functools.wraps(original)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(phase):
+                    return await original(*args, **kwargs)
+
+        elif inspect.isgeneratorfunction(original):
+
+            @functools.wraps(original)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(phase):
+                    return (yield from original(*args, **kwargs))
+
+        else:
+
+            @functools.wraps(original)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(phase):
+                    return original(*args, **kwargs)
+
+        # class- and staticmethods are already bound by getattr(), keep them from being re-bound
+        if isinstance(static_attr, (classmethod, staticmethod)):
+            wrapper = staticmethod(wrapper)  # type: ignore[assignment]
+
+        self._monkeypatch.setattr(target, name, wrapper)
+
+    def count(self, target: Any, name: str, counter: str) -> None:
+        """Replace target.name with a wrapper that counts every call, concurrent ones included.
+
+        Classes are replaced with a subclass that counts the instances, so that isinstance()
+        checks against the class keep working.
+        """
+        original: Callable[..., Any] = getattr(target, name)
+
+        def increment() -> None:
+            with self._counts_lock:
+                self.counts[counter] += 1
+
+        wrapper: Callable[..., Any]
+        if inspect.isclass(original):
+
+            def __init__(instance: Any, *args: Any, **kwargs: Any) -> None:
+                increment()
+                original.__init__(instance, *args, **kwargs)
+
+            namespace = {"__init__": __init__, "__module__": original.__module__}
+            wrapper = type(original.__name__, (original,), namespace)
+        else:
+
+            @functools.wraps(original)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                increment()
+                return original(*args, **kwargs)
+
+        self._monkeypatch.setattr(target, name, wrapper)
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of a single benchmark scenario."""
+
+    scenario: str
+    n_dependencies: int
+    n_bytes: int
+    elapsed: float
+    phases: dict[str, float] = field(default_factory=dict)
+    calls: dict[str, int] = field(default_factory=dict)
+    requests: int = 0
+    subprocesses: int = 0
+
+    @property
+    def dependencies_per_second(self) -> float:
+        return self.n_dependencies / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.n_bytes / 2**20 / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {
+            "dependencies_per_second": round(self.dependencies_per_second, 2),
+            "megabytes_per_second": round(self.megabytes_per_second, 3),
+        }
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name}={secs:.2f}s" for name, secs in sorted(self.phases.items()))
+        return (
+            f"{self.scenario}: {self.elapsed:.2f}s total, {self.n_dependencies} deps "
+            f"({self.dependencies_per_second:.1f}/s), {self.megabytes_per_second:.2f} MiB/s, "
+            f"{self.requests} requests, {self.subprocesses} subprocesses [{phases}]"
+        )
+
+
+class Baselines:
+    """Stored results of previous runs, used to detect performance regressions."""
+
+    def __init__(self, path: Path, tolerance: float) -> None:
+        """Load baselines from path (if it exists).
+
+        :param path: JSON file with the baselines
+        :param tolerance: allowed relative slowdown, e.g. 0.25 means up to 25% slower than baseline
+        """
+        self.path = path
+        self.tolerance = tolerance
+        self._data: dict[str, Any] = json.loads(path.read_text()) if path.exists() else {}
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        return self._data.get(key)
+
+    def update(self, key: str, result: BenchmarkResult) -> None:
+        self._data[key] = {
+            "elapsed": result.elapsed,
+            "phases": result.phases,
+            "subprocesses": result.subprocesses,
+        }
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self._data, indent=2, sort_keys=True) + "\n")
+
+    def regressions(self, key: str, result: BenchmarkResult) -> list[str]:
+        """Return a description of everything that got slower than the baseline allows."""
+        baseline = self.get(key)
+        if baseline is None:
+            return []
+
+        limit = 1 + self.tolerance
+        slower = []
+        if result.elapsed > baseline["elapsed"] * limit:
+            slower.append(f"total {result.elapsed:.2f}s > {baseline['elapsed']:.2f}s")
+        for phase, secs in result.phases.items():
+            baseline_secs = baseline["phases"].get(phase)
+            # ignore phases too short to be measured reliably
+            if baseline_secs and baseline_secs > 0.1 and secs > baseline_secs * limit:
+                slower.append(f"{phase} {secs:.2f}s > {baseline_secs:.2f}s")
+        # the number of subprocesses does not depend on the machine, any increase is a regression
+        baseline_subprocesses = baseline.get("subprocesses")
+        if baseline_subprocesses is not None and result.subprocesses > baseline_subprocesses:
+            slower.append(f"subprocesses {result.subprocesses} > {baseline_subprocesses}")
+        return slower
@@ -46,6 +46,7 @@ class TestPackageInput:
                     "requirements_files": None,
                     "requirements_build_files": None,
                     "allow_binary": False,
+                    "binary_filters": None,
                 },
             ),
             (
@@ -61,6 +62,29 @@ class TestPackageInput:
                     "requirements_files": [Path("reqs.txt")],
                     "requirements_build_files": [],
                     "allow_binary": True,
+                    "binary_filters": None,
+                },
+            ),
+            (
+                {
+                    "type": "pip",
+                    "allow_binary": True,
+                    "binary_filters": {
+                        "python_versions": ["3.9", "3.12"],
+                        "platforms": ["manylinux_2_28_x86_64"],
+                    },
+                },
+                {
+                    "type": "pip",
+                    "path": Path("."),
+                    "requirements_files": None,
+                    "requirements_build_files": None,
+                    "allow_binary": True,
+                    "binary_filters": {
+                        "python_versions": ["3.9", "3.12"],
+                        "abis": None,
+                        "platforms": ["manylinux_2_28_x86_64"],
+                    },
                 },
             ),
             (
@@ -198,6 +222,21 @@ class TestPackageInput:
                 r"none is not an allowed value",
                 id="pip_no_requirements_build_files",
             ),
+            pytest.param(
+                {"type": "pip", "binary_filters": {"platforms": ["any"]}},
+                r"Value error, binary_filters can only be used with allow_binary: true",
+                id="pip_binary_filters_without_allow_binary",
+            ),
+            pytest.param(
+                {"type": "pip", "allow_binary": True, "binary_filters": {"abis": []}},
+                r"pip.binary_filters.abis\n  Value error, must not be empty",
+                id="pip_empty_binary_filter",
+            ),
+            pytest.param(
+                {"type": "pip", "allow_binary": True, "binary_filters": {"python_versions": ["3"]}},
+                r"Value error, expected a Python version like 3.11, got: 3",
+                id="pip_invalid_python_version",
+            ),
             pytest.param(
                 {"type": "rpm", "options": {"extra": "foo"}},
                 r".*Extra inputs are not permitted \[type=extra_forbidden, input_value='foo'.*",
@@ -312,6 +351,7 @@ class TestRequest:
                     "requirements_files": None,
                     "requirements_build_files": [],
                     "allow_binary": False,
+                    "binary_filters": None,
                 },
             ],
             "flags": frozenset(),
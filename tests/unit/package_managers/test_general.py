@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import asyncio
+import os
 import random
 from os import PathLike
 from pathlib import Path
@@ -49,6 +50,21 @@ def test_download_binary_file(
     mock_response.iter_content.assert_called_with(chunk_size=chunk_size)
 
 
+@mock.patch.object(pkg_requests_session, "get")
+def test_download_binary_file_to_hardlink(mock_get: Any, tmp_path: Path) -> None:
+    mock_get.return_value.iter_content.return_value = [b"other content"]
+    verified = tmp_path / "verified.tgz"
+    verified.write_bytes(b"verified content")
+    download_path = tmp_path / "foo-1.0.0.tgz"
+    os.link(verified, download_path)
+
+    download_binary_file("http://example.org/foo-1.0.0.tgz", download_path)
+
+    assert download_path.read_bytes() == b"other content"
+    # the file it was linked to is left alone
+    assert verified.read_bytes() == b"verified content"
+
+
 @mock.patch.object(pkg_requests_session, "get")
 def test_download_binary_file_failed(mock_get: Any) -> None:
     mock_get.side_effect = [requests.RequestException("Something went wrong")]
@@ -186,6 +202,28 @@ async def test_async_download_binary_file(
     )
 
 
+@pytest.mark.asyncio
+async def test_async_download_binary_file_to_hardlink(tmp_path: Path) -> None:
+    verified = tmp_path / "verified.tgz"
+    verified.write_bytes(b"verified content")
+    download_path = tmp_path / "foo-1.0.0.tgz"
+    os.link(verified, download_path)
+
+    response, session = MagicMock(), MagicMock()
+    response.content.read = mock.AsyncMock(side_effect=[b"other content", b""])
+
+    async def mock_aenter() -> MagicMock:
+        return response
+
+    session.get().__aenter__.side_effect = mock_aenter
+
+    await _async_download_binary_file(session, "http://example.org/foo-1.0.0.tgz", download_path)
+
+    assert download_path.read_bytes() == b"other content"
+    # e.g. a tarball with a different integrity, the verified one it was linked to is left alone
+    assert verified.read_bytes() == b"verified content"
+
+
 @pytest.mark.asyncio
 async def test_async_download_binary_file_exception(
     tmp_path: Path, caplog: pytest.LogCaptureFixture
@@ -249,6 +287,31 @@ async def test_async_download_files(
         assert file, path in files_to_download.items()
 
 
+@pytest.mark.asyncio
+@mock.patch("cachi2.core.package_managers.general._async_download_binary_file")
+async def test_async_download_files_on_downloaded(
+    mock_download_file: MagicMock, tmp_path: Path
+) -> None:
+    downloaded: list[Path] = []
+
+    async def mock_download_binary_file(
+        session: aiohttp_retry.RetryClient, url: str, download_path: str, **kwargs: Any
+    ) -> None:
+        # the callback must not see the file before it is complete
+        assert Path(download_path) not in downloaded
+        Path(download_path).write_text(url)
+
+    mock_download_file.side_effect = mock_download_binary_file
+    files_to_download: Dict[str, Union[str, PathLike[str]]] = {
+        "https://a.example/a": tmp_path / "a",
+        "https://b.example/b": str(tmp_path / "b"),
+    }
+
+    await async_download_files(files_to_download, 1, on_downloaded=downloaded.append)
+
+    assert downloaded == [tmp_path / "a", tmp_path / "b"]
+
+
 @pytest.mark.asyncio
 async def test_async_download_files_exception(
     tmp_path: Path, caplog: pytest.LogCaptureFixture
@@ -266,3 +329,79 @@ async def test_async_download_files_exception(
 
     assert f"Unsuccessful download: {url}" in caplog.text
     assert str(exc_info.value) == f"exception_name: Exception, details: {exception_message}"
+
+
+@pytest.mark.asyncio
+@mock.patch("cachi2.core.package_managers.general._async_download_binary_file")
+async def test_async_download_files_shared_downloads(
+    mock_download_file: MagicMock, tmp_path: Path
+) -> None:
+    async def mock_download_binary_file(
+        session: aiohttp_retry.RetryClient, url: str, download_path: str, **kwargs: Any
+    ) -> None:
+        Path(download_path).write_text(f"content of {url}")
+
+    mock_download_file.side_effect = mock_download_binary_file
+    first_dir = tmp_path / "first"
+    second_dir = tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+
+    with general.shared_downloads():
+        await async_download_files(
+            {"https://a.example/a": first_dir / "a", "https://b.example/b": first_dir / "b"}, 2
+        )
+        general.mark_verified(first_dir / "a")
+        general.mark_verified(first_dir / "b")
+        await async_download_files(
+            {"https://a.example/a": second_dir / "a", "https://c.example/c": second_dir / "c"}, 2
+        )
+
+    downloaded_urls = [call.args[1] for call in mock_download_file.mock_calls]
+    assert sorted(downloaded_urls) == [
+        "https://a.example/a",
+        "https://b.example/b",
+        "https://c.example/c",
+    ]
+    assert second_dir.joinpath("a").read_text() == "content of https://a.example/a"
+
+    # without shared downloads, everything gets downloaded
+    await async_download_files({"https://a.example/a": tmp_path / "a"}, 2)
+    assert mock_download_file.call_count == 4
+
+
+@mock.patch.object(pkg_requests_session, "get")
+def test_download_binary_file_shared_downloads(mock_get: Any, tmp_path: Path) -> None:
+    url = "http://example.org/example.tar.gz"
+    mock_get.return_value.iter_content.return_value = [b"file content"]
+
+    with general.shared_downloads():
+        download_binary_file(url, tmp_path / "first.tar.gz")
+        general.mark_verified(tmp_path / "first.tar.gz")
+        download_binary_file(url, tmp_path / "second.tar.gz")
+
+    mock_get.assert_called_once()
+    assert tmp_path.joinpath("second.tar.gz").read_bytes() == b"file content"
+
+
+@mock.patch.object(pkg_requests_session, "get")
+def test_download_binary_file_shared_downloads_unverified(mock_get: Any, tmp_path: Path) -> None:
+    url = "http://example.org/example.tar.gz"
+    mock_get.return_value.iter_content.return_value = [b"file content"]
+
+    with general.shared_downloads():
+        download_binary_file(url, tmp_path / "first.tar.gz")
+        # e.g. the checksum did not match, the file is not shared
+        tmp_path.joinpath("first.tar.gz").unlink()
+        download_binary_file(url, tmp_path / "second.tar.gz")
+
+    assert mock_get.call_count == 2
+
+
+def test_shared_downloads_missing_file(tmp_path: Path) -> None:
+    shared = general.SharedDownloads()
+    shared.add("https://example.org/file", tmp_path / "removed")
+    shared.verified(tmp_path / "removed")
+
+    assert not shared.copy_to("https://example.org/file", tmp_path / "copy")
+    assert not shared.copy_to("https://example.org/other", tmp_path / "copy")
@@ -4,6 +4,7 @@ import os
 import re
 import subprocess
 import textwrap
+import time
 from pathlib import Path
 from string import Template
 from typing import Any, Iterator, Literal, Optional, Tuple, Union
@@ -38,21 +39,27 @@ from cachi2.core.package_managers.gomod import (
     _get_gomod_version,
     _get_repository_name,
     _go_list_deps,
+    _go_list_main_deps,
+    _link_download_cache,
     _parse_go_sum,
     _parse_local_modules,
     _parse_packages,
     _parse_vendor,
     _parse_workspace_module,
+    _PersistentModuleCache,
     _process_modules_json_stream,
     _resolve_gomod,
     _setup_go_toolchain,
+    _ToolchainCache,
     _validate_local_replacements,
     _vendor_changed,
     _vendor_deps,
+    _VendorSnapshot,
     fetch_gomod_source,
+    prefetch_toolchains,
 )
 from cachi2.core.rooted_path import PathOutsideRoot, RootedPath
-from cachi2.core.utils import load_json_stream
+from cachi2.core.utils import file_lock, load_json_stream
 from tests.common_utils import GIT_REF, write_file_tree
 
 GO_CMD_PATH = "/usr/bin/go"
@@ -149,6 +156,7 @@ def _parse_go_list_deps_data(data_dir: Path, file_path: str) -> list[ParsedPacka
     ),
 )
 @mock.patch("cachi2.core.package_managers.gomod._go_list_deps")
+@mock.patch("cachi2.core.package_managers.gomod._go_list_main_deps")
 @mock.patch("cachi2.core.package_managers.gomod._parse_packages")
 @mock.patch("cachi2.core.package_managers.gomod.GoWork._get_go_work")
 @mock.patch("cachi2.core.package_managers.gomod.GoWork._get_go_work_path")
@@ -157,9 +165,11 @@ def _parse_go_list_deps_data(data_dir: Path, file_path: str) -> list[ParsedPacka
 @mock.patch("cachi2.core.package_managers.gomod._get_gomod_version")
 @mock.patch("cachi2.core.package_managers.gomod.ModuleVersionResolver")
 @mock.patch("cachi2.core.package_managers.gomod._validate_local_replacements")
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
 @mock.patch("subprocess.run")
 def test_resolve_gomod(
     mock_run: mock.Mock,
+    mock_run_json_stream: mock.Mock,
     mock_validate_local_replacements: mock.Mock,
     mock_version_resolver: mock.Mock,
     mock_get_gomod_version: mock.Mock,
@@ -168,6 +178,7 @@ def test_resolve_gomod(
     mock_get_go_work_path: mock.Mock,
     mock_get_go_work: mock.Mock,
     mock_parse_packages: mock.Mock,
+    mock_go_list_main_deps: mock.Mock,
     mock_go_list_deps: mock.Mock,
     cgo_disable: bool,
     has_workspaces: bool,
@@ -195,20 +206,20 @@ def test_resolve_gomod(
         )
     )
 
-    run_side_effects.append(
-        proc_mock(
-            "go list -e -m",
-            returncode=0,
-            stdout=get_mocked_data(data_dir, f"{mocked_data_folder}/go_list_modules.json").replace(
-                "{repo_dir}", str(module_dir)
-            ),
+    mock_run.side_effect = run_side_effects
+
+    # the output of "go list -e -m -json"
+    mock_run_json_stream.return_value = load_json_stream(
+        get_mocked_data(data_dir, f"{mocked_data_folder}/go_list_modules.json").replace(
+            "{repo_dir}", str(module_dir)
         )
     )
-    mock_run.side_effect = run_side_effects
-    mock_go_list_deps.side_effect = [
-        _parse_go_list_deps_data(data_dir, f"{mocked_data_folder}/go_list_deps_all.json"),
-        _parse_go_list_deps_data(data_dir, f"{mocked_data_folder}/go_list_deps_threedot.json"),
-    ]
+    main_packages = _parse_go_list_deps_data(
+        data_dir, f"{mocked_data_folder}/go_list_deps_threedot.json"
+    )
+    all_packages = _parse_go_list_deps_data(data_dir, f"{mocked_data_folder}/go_list_deps_all.json")
+    mock_go_list_main_deps.return_value = (all_packages, main_packages)
+    mock_go_list_deps.return_value = all_packages
 
     mock_version_resolver.get_golang_version.return_value = "v0.1.0"
     mock_go_release.return_value = "go0.1.0"
@@ -260,13 +271,19 @@ def test_resolve_gomod(
 
     assert mock_run.call_args_list[0][1]["env"]["GOMODCACHE"] == f"{tmp_path}/pkg/mod"
 
-    # Assert that _parse_packages was called exactly once.
-    # Assert that the module-parsing _go_list_deps call was called with the 'all' pattern. The
-    # other _go_list_deps invocations from resolve_gomod are wrapped by _parse_packages and tested
-    # in test_parse_packages.
-    mock_parse_packages.assert_called_once()
-    mock_go_list_deps.assert_called_once()
-    assert "all" in mock_go_list_deps.call_args[0]
+    # Without workspaces, the packages are selected from the 'go list -deps all' result.
+    # Workspace modules are queried by _parse_packages, which is tested in test_parse_packages.
+    if has_workspaces:
+        mock_go_list_deps.assert_called_once()
+        assert "all" in mock_go_list_deps.call_args[0]
+        mock_go_list_main_deps.assert_not_called()
+        mock_parse_packages.assert_called_once()
+        assert resolve_result.parsed_packages == parse_packages_mocked_data
+    else:
+        mock_go_list_main_deps.assert_called_once()
+        mock_go_list_deps.assert_not_called()
+        mock_parse_packages.assert_not_called()
+        assert resolve_result.parsed_packages == main_packages
 
     for call in mock_run.call_args_list:
         env = call.kwargs["env"]
@@ -275,6 +292,13 @@ def test_resolve_gomod(
         else:
             assert "CGO_ENABLED" not in env
 
+    for call in mock_run_json_stream.call_args_list:
+        env = call.args[1]["env"]
+        if cgo_disable:
+            assert env["CGO_ENABLED"] == "0"
+        else:
+            assert "CGO_ENABLED" not in env
+
     if has_workspaces:
         expect_result = _parse_mocked_data(
             data_dir, "expected-results/resolve_gomod_workspaces.json"
@@ -284,7 +308,6 @@ def test_resolve_gomod(
 
     assert resolve_result.parsed_main_module == expect_result.parsed_main_module
     assert list(resolve_result.parsed_modules) == expect_result.parsed_modules
-    # skip comparing parsed packages, these are tested using the same data in test_parse_packages
     assert resolve_result.modules_in_go_sum == expect_result.modules_in_go_sum
 
     mock_validate_local_replacements.assert_called_once_with(
@@ -298,9 +321,11 @@ def test_resolve_gomod(
 @mock.patch("cachi2.core.package_managers.gomod.ModuleVersionResolver")
 @mock.patch("cachi2.core.package_managers.gomod._validate_local_replacements")
 @mock.patch("cachi2.core.package_managers.gomod._vendor_changed")
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
 @mock.patch("subprocess.run")
 def test_resolve_gomod_vendor_dependencies(
     mock_run: mock.Mock,
+    mock_run_json_stream: mock.Mock,
     mock_vendor_changed: mock.Mock,
     mock_validate_local_replacements: mock.Mock,
     mock_version_resolver: mock.Mock,
@@ -320,31 +345,18 @@ def test_resolve_gomod_vendor_dependencies(
     # Mock the "subprocess.run" calls
     run_side_effects = []
     run_side_effects.append(proc_mock("go mod vendor", returncode=0, stdout=None))
-    run_side_effects.append(
-        proc_mock(
-            "go list -e -m -json",
-            returncode=0,
-            stdout=get_mocked_data(data_dir, "non-vendored/go_list_modules.json").replace(
-                "{repo_dir}", str(module_dir)
-            ),
-        )
-    )
-    run_side_effects.append(
-        proc_mock(
-            "go list -e -deps -json all",
-            returncode=0,
-            stdout=get_mocked_data(data_dir, "vendored/go_list_deps_all.json"),
-        )
-    )
-    run_side_effects.append(
-        proc_mock(
-            "go list -e -deps -json ./...",
-            returncode=0,
-            stdout=get_mocked_data(data_dir, "vendored/go_list_deps_threedot.json"),
-        )
-    )
     mock_run.side_effect = run_side_effects
 
+    # Mock the "go list -e -m -json" and "go list -e -deps -json all" calls
+    mock_run_json_stream.side_effect = [
+        load_json_stream(
+            get_mocked_data(data_dir, "non-vendored/go_list_modules.json").replace(
+                "{repo_dir}", str(module_dir)
+            )
+        ),
+        load_json_stream(get_mocked_data(data_dir, "vendored/go_list_deps_all.json")),
+    ]
+
     mock_version_resolver.get_golang_version.return_value = "v0.1.0"
     mock_go_release.return_value = "go0.1.0"
     mock_get_gomod_version.return_value = ("0.1.1", "0.1.2")
@@ -364,20 +376,25 @@ def test_resolve_gomod_vendor_dependencies(
 
     assert mock_run.call_args_list[0][0][0] == [GO_CMD_PATH, "mod", "vendor"]
     assert mock_run.call_args_list[0][1]["env"]["GOMODCACHE"] == f"{tmp_path}/vendor-cache"
-    assert mock_run.call_args_list[-2][0][0] == [
-        GO_CMD_PATH,
+    assert mock_run_json_stream.call_args_list[-1][0][0] == [
+        "go",
         "list",
         "-e",
         "-deps",
         "-json=ImportPath,Module,Standard,Deps",
         "all",
     ]
+    # the packages are selected from the 'all' result, 'go list ./...' does not run
+    assert mock_run_json_stream.call_count == 2
 
     expect_result = _parse_mocked_data(data_dir, "expected-results/resolve_gomod_vendored.json")
 
     assert resolve_result.parsed_main_module == expect_result.parsed_main_module
     assert list(resolve_result.parsed_modules) == expect_result.parsed_modules
-    assert list(resolve_result.parsed_packages) == expect_result.parsed_packages
+    # the packages come in the order of the 'all' result, which differs from './...'
+    assert sorted(resolve_result.parsed_packages, key=lambda p: p.import_path) == sorted(
+        expect_result.parsed_packages, key=lambda p: p.import_path
+    )
     assert resolve_result.modules_in_go_sum == expect_result.modules_in_go_sum
 
 
@@ -387,9 +404,11 @@ def test_resolve_gomod_vendor_dependencies(
 @mock.patch("cachi2.core.package_managers.gomod.Go._locate_toolchain")
 @mock.patch("cachi2.core.package_managers.gomod._get_gomod_version")
 @mock.patch("cachi2.core.package_managers.gomod.ModuleVersionResolver")
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
 @mock.patch("subprocess.run")
 def test_resolve_gomod_no_deps(
     mock_run: mock.Mock,
+    mock_run_json_stream: mock.Mock,
     mock_version_resolver: mock.Mock,
     mock_get_gomod_version: mock.Mock,
     mock_go_locate_toolchain: mock.Mock,
@@ -432,21 +451,14 @@ def test_resolve_gomod_no_deps(
     # Mock the "subprocess.run" calls
     run_side_effects = []
     run_side_effects.append(proc_mock("go mod download -json", returncode=0, stdout=""))
-    run_side_effects.append(
-        proc_mock(
-            "go list -e -m",
-            returncode=0,
-            stdout=mock_go_list_modules,
-        )
-    )
-    run_side_effects.append(
-        proc_mock("go list -e -deps -json all", returncode=0, stdout=mock_pkg_deps_no_deps)
-    )
-    run_side_effects.append(
-        proc_mock("go list -e -deps -json ./...", returncode=0, stdout=mock_pkg_deps_no_deps)
-    )
     mock_run.side_effect = run_side_effects
 
+    # Mock the "go list -e -m -json" and "go list -e -deps -json all" calls
+    mock_run_json_stream.side_effect = [
+        load_json_stream(mock_go_list_modules),
+        load_json_stream(mock_pkg_deps_no_deps),
+    ]
+
     mock_version_resolver.get_golang_version.return_value = "v1.21.4"
     mock_go_release.return_value = "go1.21.0"
     mock_go_install.return_value = "/usr/bin/go"
@@ -584,7 +596,7 @@ def test_parse_local_modules(mock_workspace_paths: mock.Mock, version_resolver:
     version_resolver.get_golang_version.return_value = "1.0.0"
     mock_workspace_paths.return_value = [app_dir.join_within_root("workspace/foo")]
     go = mock.Mock()
-    go.return_value = go_list_m_json
+    go.json_stream.return_value = load_json_stream(go_list_m_json)
 
     go_work = mock.Mock()
     go_work.workspace_paths = mock_workspace_paths
@@ -691,7 +703,7 @@ def test_process_modules_json_stream(
     expected_modules: tuple[ModuleDict, list[ModuleDict]],
 ) -> None:
     app_dir = RootedPath(project_path)
-    result = _process_modules_json_stream(app_dir, stream)
+    result = _process_modules_json_stream(app_dir, load_json_stream(stream))
 
     assert result == expected_modules
 
@@ -1060,6 +1072,10 @@ def test_create_packages_from_parsed_data() -> None:
         ParsedPackage(
             import_path="github.com/my-org/my-repo/child-module/child-pkg",
         ),
+        # package from the main module, its path only starts with the name of the child module
+        ParsedPackage(
+            import_path="github.com/my-org/my-repo/child-module-not/pkg",
+        ),
     ]
 
     expect_packages = [
@@ -1101,6 +1117,16 @@ def test_create_packages_from_parsed_data() -> None:
                 real_path="github.com/my-org/my-repo/child-module",
             ),
         ),
+        Package(
+            relative_path="child-module-not/pkg",
+            module=Module(
+                name="github.com/my-org/my-repo",
+                version="v1.5.0",
+                original_name="github.com/my-org/my-repo",
+                real_path="github.com/my-org/my-repo",
+                main=True,
+            ),
+        ),
     ]
 
     packages = _create_packages_from_parsed_data(modules, parsed_packages)
@@ -1169,7 +1195,7 @@ def test_package_to_component(package: Package, expected_component: Component) -
 
 
 @pytest.mark.parametrize("pattern", ["./...", "all"])
-@mock.patch("cachi2.core.package_managers.gomod.run_cmd")
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
 def test_go_list_deps(mock_run_cmd: mock.Mock, pattern: Literal["all", "./..."]) -> None:
     go_list_deps_json = """
         {
@@ -1207,22 +1233,40 @@ def test_go_list_deps(mock_run_cmd: mock.Mock, pattern: Literal["all", "./..."])
         ),
     ]
 
-    mock_run_cmd.return_value = go_list_deps_json
-    call_args = ["go", "list", "-e", "-deps", "-json=ImportPath,Module,Standard,Deps", pattern]
+    mock_run_cmd.return_value = load_json_stream(go_list_deps_json)
+    call_args = ["go", "list", "-e", "-deps", "-json=ImportPath,Module,Standard", pattern]
     assert list(_go_list_deps(Go(), pattern, {})) == parsed_packages
     mock_run_cmd.assert_called_once_with(call_args, {})
 
 
-@mock.patch("cachi2.core.package_managers.gomod.run_cmd")
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
 def test_go_list_deps_fail(
     mock_run_cmd: mock.Mock,
 ) -> None:
     mock_run_cmd.side_effect = subprocess.CalledProcessError(1, cmd="foo")
-    expect_error = "Go execution failed: `go list -e -m -json` failed"
+    expect_error = "Go execution failed: `go list -e -deps -json=ImportPath,Module,Standard"
 
-    with pytest.raises(PackageManagerError) as ex:
-        _go_list_deps(Go(), "./...", {})
-        expect_error in str(ex)
+    with pytest.raises(PackageManagerError, match=re.escape(expect_error)):
+        list(_go_list_deps(Go(), "./...", {}))
+
+
+@pytest.mark.parametrize("input_subdir", ["non-vendored", "vendored"])
+@mock.patch("cachi2.core.package_managers.gomod.run_cmd_json_stream")
+def test_go_list_main_deps(mock_run_cmd: mock.Mock, data_dir: Path, input_subdir: str) -> None:
+    mock_run_cmd.return_value = load_json_stream(
+        get_mocked_data(data_dir, f"{input_subdir}/go_list_deps_all.json")
+    )
+
+    packages, main_packages = _go_list_main_deps(Go(), {})
+
+    assert packages == _parse_go_list_deps_data(data_dir, f"{input_subdir}/go_list_deps_all.json")
+    # the same packages as 'go list -deps ./...' returns, in the order of the 'all' result
+    threedot = _parse_go_list_deps_data(data_dir, f"{input_subdir}/go_list_deps_threedot.json")
+    assert sorted(p.import_path for p in main_packages) == sorted(p.import_path for p in threedot)
+    assert all(package in packages for package in main_packages)
+    mock_run_cmd.assert_called_once_with(
+        ["go", "list", "-e", "-deps", "-json=ImportPath,Module,Standard,Deps", "all"], {}
+    )
 
 
 def test_deduplicate_resolved_modules() -> None:
@@ -1467,7 +1511,7 @@ def test_vendor_deps(
         _vendor_deps(Go(), app_dir, go_vendor_cmd == "work", run_params)
 
     mock_run_cmd.assert_called_once_with(["go", go_vendor_cmd, "vendor"], **run_params)
-    mock_vendor_changed.assert_called_once_with(app_dir)
+    mock_vendor_changed.assert_called_once_with(app_dir, _VendorSnapshot({}, None))
 
 
 def test_parse_vendor(rooted_tmp_path: RootedPath, data_dir: Path) -> None:
@@ -1625,17 +1669,36 @@ def test_vendor_changed(
     write_file_tree(vendor_before, app_dir)
     repo.index.add([app_dir.join_within_root(path) for path in vendor_before])
     repo.index.commit("before vendoring", skip_hooks=True)
+    snapshot = _VendorSnapshot.take(app_dir)
 
     write_file_tree(vendor_changes, app_dir, exist_ok=True)
 
-    assert _vendor_changed(app_dir) == bool(expected_change)
+    assert _vendor_changed(app_dir, snapshot) == bool(expected_change)
     if expected_change:
         assert expected_change.format(subpath=subpath) in caplog.text
 
-    # The _vendor_changed function should reset the `git add` => added files should not be tracked
+    # The git index is not touched => added files should not be tracked
+    assert not repo.git.diff("--cached", "--name-only")
     assert not repo.git.diff("--diff-filter", "A")
 
 
+def test_vendor_changed_deleted_files(
+    rooted_tmp_path: RootedPath, caplog: pytest.LogCaptureFixture
+) -> None:
+    write_file_tree(
+        {"vendor": {"modules.txt": "foo v1.0.0\n", "a": "a", "b": "b"}}, rooted_tmp_path
+    )
+    snapshot = _VendorSnapshot.take(rooted_tmp_path)
+
+    rooted_tmp_path.join_within_root("vendor/b").path.unlink()
+    assert _vendor_changed(rooted_tmp_path, snapshot)
+    assert "vendor directory changed after vendoring:\nD\tvendor/b" in caplog.text
+
+    rooted_tmp_path.join_within_root("vendor/modules.txt").path.unlink()
+    assert _vendor_changed(rooted_tmp_path, snapshot)
+    assert "--- a/vendor/modules.txt\n+++ /dev/null\n@@ -1 +0,0 @@\n-foo v1.0.0" in caplog.text
+
+
 @pytest.mark.parametrize(
     "file_tree",
     (
@@ -1815,6 +1878,7 @@ def test_fetch_gomod_source(
         tmp_dir: Path,
         version_resolver: ModuleVersionResolver,
         go_work: GoWork,
+        module_cache: None,
     ) -> ResolvedGoModule:
         # Find package output based on the path being processed
         return packages_output_by_path[
@@ -1840,6 +1904,7 @@ def test_fetch_gomod_source(
             tmp_dir,
             mock_version_resolver.return_value,
             fake_go_work,
+            None,
         )
         for package in gomod_request.packages
     ]
@@ -1856,6 +1921,192 @@ def test_fetch_gomod_source(
     assert output == expected_output
 
 
+def test_link_download_cache(tmp_path: Path) -> None:
+    download_dir = tmp_path / "download"
+    output_dir = tmp_path / "output"
+    download_dir.mkdir()
+    write_file_tree(
+        {
+            "github.com": {
+                "!burnt!sushi": {
+                    "toml": {
+                        "@v": {
+                            "list": "v1.0.0\n",
+                            "v1.0.0.mod": "module github.com/BurntSushi/toml",
+                            "v1.0.0.zip": "zip",
+                            "v1.0.0.ziphash": "h1:abc=",
+                            "v1.0.0.lock": "",
+                        },
+                    },
+                },
+                "other": {"mod": {"@v": {"v0.1.0.mod": "module other", "v0.1.0.zip": "zip"}}},
+            },
+            "sumdb": {"sum.golang.org": {"lookup": {"github.com": "tile"}}},
+        },
+        download_dir,
+    )
+
+    _link_download_cache(download_dir, output_dir)
+
+    linked_files = [
+        p.relative_to(output_dir).as_posix() for p in output_dir.rglob("*") if p.is_file()
+    ]
+    assert sorted(linked_files) == [
+        "github.com/!burnt!sushi/toml/@v/list",
+        "github.com/!burnt!sushi/toml/@v/v1.0.0.mod",
+        "github.com/!burnt!sushi/toml/@v/v1.0.0.zip",
+        "github.com/!burnt!sushi/toml/@v/v1.0.0.ziphash",
+        "github.com/other/mod/@v/v0.1.0.mod",
+        "github.com/other/mod/@v/v0.1.0.zip",
+        "sumdb/sum.golang.org/lookup/github.com",
+    ]
+    zip_file = "github.com/!burnt!sushi/toml/@v/v1.0.0.zip"
+    assert output_dir.joinpath(zip_file).samefile(download_dir / zip_file)
+
+
+def test_persistent_module_cache(tmp_path: Path) -> None:
+    module_cache = _PersistentModuleCache(tmp_path / "cache", max_age=30)
+    download_dir = tmp_path / "download"
+    download_dir.mkdir()
+    module_files = {
+        "list": "v1.0.0\n",
+        "v1.0.0.info": "{}",
+        "v1.0.0.mod": "module github.com/foo/bar",
+        "v1.0.0.zip": "zip",
+        "v1.0.0.ziphash": "h1:abc=",
+        "v1.0.0.lock": "",
+    }
+    write_file_tree(
+        {
+            "github.com": {"foo": {"bar": {"@v": module_files}}},
+            "sumdb": {"sum.golang.org": {"lookup": {"github.com": "tile"}}},
+        },
+        download_dir,
+    )
+
+    with module_cache.use():
+        assert module_cache.goproxy("https://proxy.example") == (
+            f"file://{tmp_path}/cache/download,https://proxy.example"
+        )
+        module_cache.add_modules(download_dir)
+
+    cached_files = [p.name for p in module_cache.download_dir.rglob("*") if p.is_file()]
+    assert sorted(cached_files) == ["v1.0.0.info", "v1.0.0.mod", "v1.0.0.zip"]
+
+    # the module has not been used for 40 days, until it gets added again
+    cached_zip = module_cache.download_dir / "github.com/foo/bar/@v/v1.0.0.zip"
+    forty_days_ago = time.time() - 40 * 24 * 3600
+    for path in cached_zip.parent.iterdir():
+        os.utime(path, (forty_days_ago, forty_days_ago))
+    download_dir.joinpath("github.com/foo/bar/@v/v1.0.0.zip").unlink()
+
+    module_cache.add_modules(download_dir)
+    module_cache.evict()
+    assert sorted(p.name for p in cached_zip.parent.iterdir()) == ["v1.0.0.info", "v1.0.0.mod"]
+
+    with module_cache.use():
+        module_cache.evict()
+    assert cached_zip.parent.joinpath("v1.0.0.mod").exists()
+
+
+def test_toolchain_cache(tmp_path: Path) -> None:
+    toolchain_cache = _ToolchainCache(tmp_path / "go")
+    toolchain_cache.path.mkdir()
+    write_file_tree(
+        {release: {"bin": {"go": ""}} for release in ("go1.20", "go1.21.0", "go1.22.0")},
+        toolchain_cache.path,
+    )
+    toolchain_cache.path.joinpath(".go1.23.0.tmp").mkdir()
+
+    # go1.20 used a day ago, go1.21.0 two days ago, go1.22.0 right now
+    for days, release in enumerate(["go1.22.0", "go1.20", "go1.21.0"]):
+        used_at = time.time() - days * 24 * 3600
+        os.utime(toolchain_cache.path / release, (used_at, used_at))
+    toolchain_cache.mark_used(toolchain_cache.path / "go1.22.0")
+
+    with toolchain_cache.use():
+        toolchain_cache.prune(max_size=1)
+    assert sorted(p.name for p in toolchain_cache.path.iterdir()) == [
+        ".go1.23.0.tmp",
+        ".lock",
+        "go1.20",
+        "go1.21.0",
+        "go1.22.0",
+    ]
+
+    toolchain_cache.prune(max_size=2)
+    assert sorted(p.name for p in toolchain_cache.path.iterdir()) == [
+        ".go1.23.0.tmp",
+        ".lock",
+        "go1.20",
+        "go1.22.0",
+    ]
+
+    sdk_dir = tmp_path / "sdk/go1.23.0"
+    sdk_dir.mkdir(parents=True)
+    write_file_tree({"bin": {"go": ""}}, sdk_dir)
+    toolchain_cache.add(sdk_dir, "go1.23.0")
+    assert not sdk_dir.exists()
+    assert sorted(p.name for p in toolchain_cache.path.iterdir()) == [
+        ".lock",
+        "go1.20",
+        "go1.22.0",
+        "go1.23.0",
+    ]
+
+
+@mock.patch("cachi2.core.package_managers.gomod.get_config")
+@mock.patch("cachi2.core.package_managers.gomod.get_cache_dir")
+@mock.patch("cachi2.core.package_managers.gomod.Go._install")
+@mock.patch("cachi2.core.package_managers.gomod.Go._locate_toolchain")
+@mock.patch("cachi2.core.package_managers.gomod._setup_go_toolchain")
+def test_prefetch_toolchains(
+    mock_setup_go_toolchain: mock.Mock,
+    mock_locate_toolchain: mock.Mock,
+    mock_install: mock.Mock,
+    mock_cache_dir: mock.Mock,
+    mock_get_config: mock.Mock,
+    rooted_tmp_path: RootedPath,
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    cache_dir = tmp_path / "go"
+    cache_dir.joinpath("go1.19", "bin").mkdir(parents=True)
+    cache_dir.joinpath("go1.19", "bin", "go").touch()
+
+    def setup_go_toolchain(go_mod: RootedPath) -> Go:
+        # the toolchains are located while the cache is in use, they cannot be pruned meanwhile
+        with file_lock(cache_dir / ".lock", blocking=False) as locked:
+            assert not locked
+        return Go(release="go1.21.0")
+
+    mock_locate_toolchain.side_effect = lambda release: (
+        "/usr/local/go/go1.20/bin/go" if release == "go1.20" else None
+    )
+    mock_install.side_effect = lambda release: f"{tmp_path}/go/{release}/bin/go"
+    mock_setup_go_toolchain.side_effect = setup_go_toolchain
+    mock_cache_dir.return_value = tmp_path
+    mock_get_config.return_value.concurrency_limit = 2
+    mock_get_config.return_value.gomod_toolchain_cache_size = 2
+    go_mod_files = [rooted_tmp_path.join_within_root(f"{name}/go.mod") for name in ("a", "b")]
+
+    go_binaries = prefetch_toolchains(go_mod_files, ["go1.20", "go1.22.0"])
+
+    assert go_binaries == [
+        "/usr/local/go/go1.20/bin/go",
+        f"{tmp_path}/go/go1.21.0/bin/go",
+        f"{tmp_path}/go/go1.22.0/bin/go",
+    ]
+    assert sorted(call.args[0] for call in mock_install.call_args_list) == [
+        "go1.21.0",
+        "go1.22.0",
+    ]
+    assert mock_setup_go_toolchain.call_count == 2
+    # prefetching does not prune the cache
+    assert cache_dir.joinpath("go1.19", "bin", "go").exists()
+    assert "Prefetched 3 Go toolchains, but only the 2 most recently used ones" in caplog.text
+
+
 @pytest.mark.parametrize(
     "input_url",
     (
@@ -1933,6 +2184,74 @@ def test_fetch_tags_fail(repo_remote_with_tag: tuple[RootedPath, RootedPath]) ->
         ModuleVersionResolver.from_repo_path(remote_repo_path)
 
 
+@mock.patch("cachi2.core.package_managers.gomod.get_cache_dir")
+@mock.patch("cachi2.core.package_managers.gomod.get_config")
+def test_fetch_tags_ttl(
+    mock_get_config: mock.Mock,
+    mock_cache_dir: mock.Mock,
+    repo_remote_with_tag: tuple[RootedPath, RootedPath],
+    tmp_path: Path,
+) -> None:
+    remote_repo_path, local_repo_path = repo_remote_with_tag
+    mock_get_config.return_value.gomod_skip_tags_fetch_if_present = False
+    mock_get_config.return_value.gomod_tags_fetch_ttl = 600
+    mock_cache_dir.return_value = tmp_path / "cache"
+
+    ModuleVersionResolver.from_repo_path(local_repo_path)
+    git.Repo(remote_repo_path).create_tag("v2.0.1")
+
+    # fetched recently for the same commit, the new tag is not fetched
+    version_resolver = ModuleVersionResolver.from_repo_path(local_repo_path)
+    assert version_resolver._commit_tags == ["v2.0.0"]
+
+    mock_get_config.return_value.gomod_tags_fetch_ttl = 0
+    version_resolver = ModuleVersionResolver.from_repo_path(local_repo_path)
+    assert version_resolver._commit_tags == ["v2.0.0", "v2.0.1"]
+
+
+@mock.patch("cachi2.core.package_managers.gomod.get_config")
+def test_skip_tags_fetch_if_present(
+    mock_get_config: mock.Mock, repo_remote_with_tag: tuple[RootedPath, RootedPath]
+) -> None:
+    remote_repo_path, local_repo_path = repo_remote_with_tag
+    mock_get_config.return_value.gomod_skip_tags_fetch_if_present = True
+    mock_get_config.return_value.gomod_tags_fetch_ttl = 0
+
+    # no tags yet, they get fetched
+    version_resolver = ModuleVersionResolver.from_repo_path(local_repo_path)
+    assert version_resolver._commit_tags == ["v2.0.0"]
+
+    git.Repo(remote_repo_path).create_tag("v2.0.1")
+    version_resolver = ModuleVersionResolver.from_repo_path(local_repo_path)
+    assert version_resolver._commit_tags == ["v2.0.0"]
+
+
+def test_index_semver_tags(repo_remote_with_tag: tuple[RootedPath, RootedPath]) -> None:
+    remote_repo_path, _ = repo_remote_with_tag
+    repo = git.Repo(remote_repo_path)
+    version_resolver = ModuleVersionResolver(repo, repo.head.commit)
+
+    tag_names = [
+        "v1.0.0",
+        "v1.2.0-rc.1",
+        "v1.10.0",
+        "v2.0.0",
+        "v2.0.0+incompatible.build",
+        "v3",
+        "release-1",
+        "sub/v1.5.0",
+        "sub/module/v0.1.0",
+        "sub/module/v0.2.0",
+        "sub/v1.4.0",
+    ]
+    assert version_resolver._index_semver_tags(tag_names) == {
+        (None, 1): "v1.10.0",
+        (None, 2): "v2.0.0",
+        ("sub", 1): "sub/v1.5.0",
+        ("sub/module", 0): "sub/module/v0.2.0",
+    }
+
+
 @pytest.mark.parametrize(
     "go_mod_file, go_mod_version, go_toolchain_version",
     [
@@ -2096,9 +2415,9 @@ def test_parse_packages(
 
         go_work = mock.MagicMock()
         go_work.__bool__.return_value = False
-        go.return_value = mocked_indata
+        go.json_stream.return_value = load_json_stream(mocked_indata)
     else:
-        side_effects = []
+        outputs_by_workspace = {}
 
         mocked_go_work_json_path = get_mock_dir(data_dir) / f"{input_subdir}/go_work.json"
         mock_get_go_work_path.return_value = RootedPath(mocked_go_work_json_path)
@@ -2109,21 +2428,23 @@ def test_parse_packages(
         ws_paths = list(go_work.workspace_paths(go, {}))
         for wp in ws_paths:
             indata_relative = f"{input_subdir}/{wp.subpath_from_root}/go_list_deps_threedot.json"
-            mocked_indata = get_mocked_data(data_dir, indata_relative)
-            side_effects.append(mocked_indata)
+            outputs_by_workspace[wp.path] = get_mocked_data(data_dir, indata_relative)
 
-        go.side_effect = side_effects
+        # the workspaces are queried concurrently, the order of the calls is not deterministic
+        go.json_stream.side_effect = lambda cmd, params: load_json_stream(
+            outputs_by_workspace[params["cwd"]]
+        )
 
     run_params = {"env": {"GOMODCACHE": "foo"}}
     pkgs = _parse_packages(go_work, go, run_params)
 
-    calls = go.call_args_list
+    calls = go.json_stream.call_args_list
     if request.node.callspec.id == "without_workspaces":
-        go.assert_called_once()
+        go.json_stream.assert_called_once()
     else:
-        calls = go.call_args_list
-        assert go.call_count == len(ws_paths)
-        assert all([run_params | {"cwd": ws_paths[i].path} in c.args for i, c in enumerate(calls)])
+        assert go.json_stream.call_count == len(ws_paths)
+        assert sorted(c.args[1]["cwd"] for c in calls) == sorted(wp.path for wp in ws_paths)
+        assert all(c.args[1] == run_params | {"cwd": c.args[1]["cwd"]} for c in calls)
 
     # _parse_packages calls _go_list_deps always with the './...' pattern
     assert all("./..." in call.args[0] for call in calls)
@@ -2279,6 +2600,23 @@ class TestGo:
         assert binary.exists()
         assert str(binary) == f"{dest_cache_dir}/go/{release}/bin/go"
 
+    @mock.patch("cachi2.core.package_managers.gomod.Go._retry")
+    @mock.patch("cachi2.core.package_managers.gomod.get_cache_dir")
+    def test_install_installed_meanwhile(
+        self, mock_cache_dir: mock.Mock, mock_go_retry: mock.Mock, tmp_path: Path
+    ) -> None:
+        mock_cache_dir.return_value = tmp_path
+        go = Go(release="go1.21.0")
+        assert go._install_toolchain is True
+
+        # another process installed the release while this one was waiting for the lock
+        write_file_tree({"go": {"go1.21.0": {"bin": {"go": ""}}}}, tmp_path)
+        go.install_toolchain()
+
+        assert go._bin == f"{tmp_path}/go/go1.21.0/bin/go"
+        assert go._install_toolchain is False
+        mock_go_retry.assert_not_called()
+
     @pytest.mark.parametrize(
         "release, needs_install, retry",
         [
@@ -2400,6 +2738,18 @@ class TestGo:
         assert go._bin == "go"
         assert go._install_toolchain is True
 
+    @mock.patch("cachi2.core.package_managers.gomod.Go._install")
+    @mock.patch("cachi2.core.package_managers.gomod.Go._locate_toolchain")
+    def test_binary(self, mock_locate_toolchain: mock.Mock, mock_install: mock.Mock) -> None:
+        mock_locate_toolchain.return_value = None
+        mock_install.return_value = "/cache/go/go1.20/bin/go"
+
+        go = Go(release="go1.20")
+
+        assert go.binary == "/cache/go/go1.20/bin/go"
+        assert go.binary == "/cache/go/go1.20/bin/go"
+        mock_install.assert_called_once_with("go1.20")
+
     @pytest.mark.parametrize(
         "release, expect, go_output",
         [
@@ -1,3 +1,5 @@
+import base64
+import hashlib
 import json
 import os
 import urllib.parse
@@ -169,6 +171,19 @@ class TestPackage:
         assert package.version == expected_version
         assert package.resolved_url == expected_resolved_url
 
+    def test_classified_url(self) -> None:
+        package = Package("foo", "node_modules/foo", {"resolved": "github:foo/bar#abc"})
+        expected_url = "git+ssh://git@github.com/foo/bar.git#abc"
+        assert package.classified_url == (expected_url, "git")
+
+        with mock.patch("cachi2.core.package_managers.npm._classify_resolved_url") as mock_classify:
+            assert package.classified_url == (expected_url, "git")
+            mock_classify.assert_not_called()
+
+        package.resolved_url = "file:///foo-1.0.0.tgz"
+        assert package.classified_url == ("file:///foo-1.0.0.tgz", "file")
+        assert Package("foo", "node_modules/foo", {"inBundle": True}).classified_url is None
+
     def test_eq(self) -> None:
         assert Package("foo", "", {}) == Package("foo", "", {})
         assert Package("foo", "", {}) != Package("bar", "", {})
@@ -1438,6 +1453,40 @@ def test_resolve_npm(
     mock_get_repo_id.assert_called_once_with(rooted_tmp_path.root)
 
 
+@mock.patch("cachi2.core.package_managers.npm._get_npm_dependencies")
+def test_resolve_npm_sbom_describes_original_lockfile(
+    mock_get_npm_dependencies: mock.Mock,
+    rooted_tmp_path: RootedPath,
+    mock_get_repo_id: mock.Mock,
+) -> None:
+    """The SBOM must have the original URLs, not the local paths from the updated lockfile."""
+    url = "https://example.org/bar-1.0.0.tgz"
+    package_lock_json = {
+        "name": "foo",
+        "version": "1.0.0",
+        "lockfileVersion": 3,
+        "packages": {
+            "": {"name": "foo", "version": "1.0.0", "dependencies": {"bar": url}},
+            "node_modules/bar": {"version": "1.0.0", "resolved": url, "integrity": "sha512-YmFy"},
+        },
+    }
+    rooted_tmp_path.join_within_root("package-lock.json").path.write_text(
+        json.dumps(package_lock_json)
+    )
+    rooted_tmp_path.join_within_root("package.json").path.write_text("{}")
+    npm_deps_dir = rooted_tmp_path.join_within_root("output", "deps", "npm")
+    mock_get_npm_dependencies.return_value = {url: npm_deps_dir.join_within_root("bar.tgz")}
+
+    pkg_info = _resolve_npm(rooted_tmp_path, npm_deps_dir)
+
+    [dependency] = pkg_info["dependencies"]
+    assert dependency["purl"].endswith(f"download_url={urlq(url)}")
+    lockfile_template = json.loads(pkg_info["projectfiles"][-1].template)
+    assert lockfile_template["packages"]["node_modules/bar"]["resolved"] == (
+        "file://${output_dir}/output/deps/npm/bar.tgz"
+    )
+
+
 def test_resolve_npm_unsupported_lockfileversion(rooted_tmp_path: RootedPath) -> None:
     """Test _resolve_npm with unsupported lockfileVersion."""
     package_lock_json = {
@@ -1638,6 +1687,45 @@ def test_get_npm_dependencies(
     assert download_paths == expected_download_paths
 
 
+@mock.patch("cachi2.core.package_managers.npm.async_download_files")
+def test_get_npm_dependencies_links_identical_tarballs(
+    mock_async_download_files: mock.Mock, rooted_tmp_path: RootedPath
+) -> None:
+    content = b"tarball content"
+    integrity = "sha512-" + base64.b64encode(hashlib.sha512(content).digest()).decode()
+
+    async def download_files(files_to_download: dict[str, Path], concurrency: int) -> None:
+        for path in files_to_download.values():
+            Path(path).write_bytes(content)
+
+    mock_async_download_files.side_effect = download_files
+    registry_url = "https://registry.npmjs.org/foo/-/foo-1.0.0.tgz"
+    https_url = "https://example.org/foo-1.0.0.tgz"
+    tarball_store: dict[str, RootedPath] = {}
+
+    download_paths = _get_npm_dependencies(
+        rooted_tmp_path,
+        {
+            registry_url: {"name": "foo", "version": "1.0.0", "integrity": integrity},
+            https_url: {"name": "foo", "version": "1.0.0", "integrity": integrity},
+        },
+        tarball_store,
+    )
+    other_download_paths = _get_npm_dependencies(
+        rooted_tmp_path,
+        {registry_url: {"name": "foo", "version": "1.0.0", "integrity": integrity}},
+        tarball_store,
+    )
+
+    assert list(mock_async_download_files.call_args_list[0].args[0]) == [registry_url]
+    assert mock_async_download_files.call_args_list[1].args[0] == {}
+
+    registry_tarball = download_paths[NormalizedUrl(registry_url)].path
+    assert tarball_store == {integrity: download_paths[NormalizedUrl(registry_url)]}
+    assert download_paths[NormalizedUrl(https_url)].path.samefile(registry_tarball)
+    assert other_download_paths[NormalizedUrl(registry_url)].path == registry_tarball
+
+
 @pytest.mark.parametrize(
     "lockfile_data, download_paths, expected_lockfile_data",
     [
@@ -3,7 +3,10 @@ import importlib.metadata
 import logging
 import os
 import re
+import subprocess
+import sys
 import tempfile
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 from textwrap import dedent
@@ -15,6 +18,7 @@ import typer.testing
 import yaml
 
 import cachi2.core.config as config_file
+from cachi2.core.errors import PackageRejected
 from cachi2.core.models.input import Request
 from cachi2.core.models.output import (
     BuildConfig,
@@ -24,6 +28,7 @@ from cachi2.core.models.output import (
     Sbom,
 )
 from cachi2.core.models.sbom import SPDXSbom
+from cachi2.core.rooted_path import RootedPath
 from cachi2.interface.cli import DEFAULT_OUTPUT, DEFAULT_SOURCE, app
 
 runner = typer.testing.CliRunner()
@@ -1010,3 +1015,198 @@ class TestMergeSboms:
                 ["merge-sboms", "-o", fp.name, "--sbom-output-type", "spdx", *sbom_files_to_merge],
             )
             assert Path(fp.name).lstat().st_size > 0, "SBOM failed to be written to output file!"
+
+
+class TestFetchDepsBatch:
+    @pytest.fixture
+    def manifest(self, tmp_cwd: Path) -> Path:
+        for repo in ("repo-a", "repo-b"):
+            tmp_cwd.joinpath(repo).mkdir()
+        manifest = {
+            "jobs": [
+                {"source": "repo-a", "output": "output-a", "packages": [{"type": "pip"}]},
+                {
+                    "source": str(tmp_cwd / "repo-b"),
+                    "output": "output-b",
+                    "packages": [{"type": "npm"}, {"type": "gomod"}],
+                    "flags": ["cgo-disable"],
+                },
+            ]
+        }
+        manifest_path = tmp_cwd / "manifest.yaml"
+        manifest_path.write_text(yaml.safe_dump(manifest))
+        return manifest_path
+
+    @pytest.mark.parametrize("max_parallel_jobs", ["1", "4"])
+    def test_fetch_deps_batch(self, max_parallel_jobs: str, manifest: Path, tmp_cwd: Path) -> None:
+        output = RequestOutput.from_obj_list(
+            components=[Component(name="foo", version="1.0.0", purl="pkg:generic/foo@1.0.0")],
+            environment_variables=[EnvironmentVariable(name="FOO", value="bar")],
+        )
+        with mock_fetch_deps(output=output) as mock_resolve_packages:
+            invoke_expecting_sucess(
+                app,
+                [
+                    "fetch-deps-batch",
+                    str(manifest),
+                    "--max-parallel-jobs",
+                    max_parallel_jobs,
+                ],
+            )
+
+        requests = sorted(
+            (call.args[0] for call in mock_resolve_packages.call_args_list),
+            key=lambda request: request.source_dir.path,
+        )
+        assert requests == [
+            Request(
+                source_dir=tmp_cwd / "repo-a",
+                output_dir=tmp_cwd / "output-a",
+                packages=[{"type": "pip"}],
+            ),
+            Request(
+                source_dir=tmp_cwd / "repo-b",
+                output_dir=tmp_cwd / "output-b",
+                packages=[{"type": "npm"}, {"type": "gomod"}],
+                flags=["cgo-disable"],
+            ),
+        ]
+        for output_dir in ("output-a", "output-b"):
+            # the same output files as from fetch-deps
+            build_config = tmp_cwd.joinpath(output_dir, ".build-config.json").read_text()
+            assert build_config == output.build_config.model_dump_json(indent=2, exclude_none=True)
+            sbom = Sbom.model_validate_json(tmp_cwd.joinpath(output_dir, "bom.json").read_text())
+            assert sbom == output.generate_sbom()
+
+    def test_one_job_fails(self, manifest: Path, tmp_cwd: Path) -> None:
+        def resolve_packages(request: Request) -> RequestOutput:
+            if request.source_dir.path.name == "repo-a":
+                raise PackageRejected("repo-a is broken", solution=None)
+            return RequestOutput.empty()
+
+        with mock_fetch_deps() as mock_resolve_packages:
+            mock_resolve_packages.side_effect = resolve_packages
+            result = runner.invoke(app, ["fetch-deps-batch", str(manifest)])
+
+        assert result.exit_code == 2
+        assert "Error: PackageRejected: repo-a is broken" in result.output
+        assert not tmp_cwd.joinpath("output-a", "bom.json").exists()
+        assert tmp_cwd.joinpath("output-b", "bom.json").exists()
+
+    def test_first_failure_in_manifest_order(self, manifest: Path) -> None:
+        repo_b_failed = threading.Event()
+
+        def resolve_packages(request: Request) -> RequestOutput:
+            if request.source_dir.path.name == "repo-a":
+                # fail after repo-b
+                assert repo_b_failed.wait(timeout=10)
+                raise PackageRejected("repo-a is broken", solution=None)
+            repo_b_failed.set()
+            raise PackageRejected("repo-b is broken", solution=None)
+
+        with mock_fetch_deps() as mock_resolve_packages:
+            mock_resolve_packages.side_effect = resolve_packages
+            result = runner.invoke(
+                app, ["fetch-deps-batch", str(manifest), "--max-parallel-jobs", "2"]
+            )
+
+        assert result.exit_code == 2
+        assert "Error: PackageRejected: repo-a is broken" in result.output
+
+    @pytest.mark.parametrize(
+        "manifest_content, expect_error",
+        [
+            ("jobs: []", "jobs\n  List should have at least 1 item"),
+            ("jobs: [{source: repo-a, output: out}]", "jobs -> 0 -> packages\n  Field required"),
+            (
+                "jobs: [{source: repo-a, output: out, packages: [{type: pip, path: nope}]}]",
+                "package path does not exist (or is not a directory): nope",
+            ),
+            (
+                "jobs: [{source: repo-a, output: out, packages: [pip]}, "
+                "{source: repo-b, output: out, packages: [{type: npm}]}]",
+                "jobs -> 0 -> packages -> 0",
+            ),
+            (
+                "jobs: [{source: repo-a, output: out, packages: [{type: pip}]}, "
+                "{source: repo-b, output: out, packages: [{type: npm}]}]",
+                "Every job needs its own output directory, used more than once: {cwd}/out",
+            ),
+            ("jobs: [", "is not a valid YAML file"),
+        ],
+    )
+    def test_invalid_manifest(
+        self, manifest_content: str, expect_error: str, tmp_cwd: Path
+    ) -> None:
+        for repo in ("repo-a", "repo-b"):
+            tmp_cwd.joinpath(repo).mkdir()
+        tmp_cwd.joinpath("manifest.yaml").write_text(manifest_content)
+
+        with mock_fetch_deps() as mock_resolve_packages:
+            result = invoke_expecting_invalid_usage(app, ["fetch-deps-batch", "manifest.yaml"])
+
+        assert_pattern_in_output(expect_error.format(cwd=tmp_cwd), result.output)
+        mock_resolve_packages.assert_not_called()
+
+
+class TestToolchainsPrefetch:
+    @mock.patch("cachi2.core.package_managers.gomod.prefetch_toolchains")
+    def test_prefetch(self, mock_prefetch_toolchains: mock.Mock, tmp_cwd: Path) -> None:
+        tmp_cwd.joinpath("go.mod").write_text("module example.org/foo\n\ngo 1.21\n")
+        mock_prefetch_toolchains.return_value = ["/cache/go/go1.20/bin/go", "/usr/local/go/bin/go"]
+
+        result = invoke_expecting_sucess(
+            app, ["toolchains", "prefetch", "go.mod", "1.20", "go1.21.0", "1.22", "1.22rc1"]
+        )
+
+        mock_prefetch_toolchains.assert_called_once_with(
+            [RootedPath(tmp_cwd / "go.mod")], ["go1.20", "go1.21.0", "go1.22.0", "go1.22rc1"]
+        )
+        assert result.stdout == "/cache/go/go1.20/bin/go\n/usr/local/go/bin/go\n"
+
+    @mock.patch("cachi2.core.package_managers.gomod.prefetch_toolchains")
+    def test_invalid_version(self, mock_prefetch_toolchains: mock.Mock, tmp_cwd: Path) -> None:
+        result = invoke_expecting_invalid_usage(app, ["toolchains", "prefetch", "1.21", "latest"])
+
+        assert_pattern_in_output("Not a go.mod file or a Go version: latest", result.output)
+        mock_prefetch_toolchains.assert_not_called()
+
+
+class TestImportTime:
+    @pytest.fixture(scope="class")
+    def import_times(self) -> dict[str, int]:
+        """Import the CLI in a fresh interpreter, return the cumulative import time of each module."""
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import cachi2.interface.cli"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # import time: self [us] | cumulative | imported package
+        import_times = {}
+        for line in proc.stderr.splitlines():
+            if match := re.match(r"import time:\s*\d+ \|\s*(\d+) \| ( *)(\S+)", line):
+                cumulative, _, module = match.groups()
+                import_times[module] = int(cumulative)
+        return import_times
+
+    @pytest.mark.parametrize(
+        "heavy_module",
+        [
+            "aiohttp",
+            "git",
+            "pypi_simple",
+            "requests",
+            "tomlkit",
+            "pyarn",
+            "semver",
+            "cachi2.core.package_managers.general",
+        ],
+    )
+    def test_cli_does_not_import_package_managers(
+        self, heavy_module: str, import_times: dict[str, int]
+    ) -> None:
+        # commands like generate-env or inject-files are called very often, the dependencies of
+        # the package managers must only be imported when fetch-deps actually needs them
+        assert "cachi2.interface.cli" in import_times
+        assert heavy_module not in import_times
@@ -1,6 +1,8 @@
 import errno
 import io
+import json
 import subprocess
+import sys
 from pathlib import Path
 from typing import Optional
 from unittest import mock
@@ -11,9 +13,14 @@ from cachi2.core.errors import Cachi2Error
 from cachi2.core.utils import (
     _fast_copy,
     _FastCopyFailedFallback,
+    _load_json_chunks,
     copy_directory,
+    copy_file,
+    file_lock,
     get_cache_dir,
+    link_file,
     run_cmd,
+    run_cmd_json_stream,
 )
 
 
@@ -90,6 +97,88 @@ def test_run_cmd_executable_not_found(
         run_cmd(["foo"], params={})
 
 
+@pytest.mark.parametrize(
+    "chunks, expect_objects",
+    [
+        ([""], []),
+        (['{"a": 1} [2]  3\n'], [{"a": 1}, [2], 3]),
+        # objects (and numbers) split across chunks
+        (['{"a"', ": 1}", " 1", "2 [", "3]", "  "], [{"a": 1}, 12, [3]]),
+        (["", "\n{}", "", "{}\n"], [{}, {}]),
+    ],
+)
+def test_load_json_chunks(chunks: list[str], expect_objects: list) -> None:
+    assert list(_load_json_chunks(chunks)) == expect_objects
+
+
+def test_load_json_chunks_large_object() -> None:
+    text = json.dumps({"deps": ["x" * 10] * 10000})
+    chunks = [text[i : i + 100] for i in range(0, len(text), 100)]
+
+    with mock.patch.object(
+        json.JSONDecoder, "raw_decode", autospec=True, side_effect=json.JSONDecoder.raw_decode
+    ) as mock_raw_decode:
+        assert list(_load_json_chunks(chunks)) == [json.loads(text)]
+
+    # not decoded again from the start with each of the ~1400 chunks
+    assert mock_raw_decode.call_count < 20
+
+
+def test_load_json_chunks_invalid() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(_load_json_chunks(['{"a": 1}', '{"b": ', "}"]))
+
+
+def _python_cmd(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_run_cmd_json_stream() -> None:
+    # enough output to need many reads from the pipe
+    code = "import json\nfor i in range(10000): print(json.dumps({'i': i, 'deps': ['x'] * 10}))"
+    objects = run_cmd_json_stream(_python_cmd(code), {})
+
+    assert next(objects) == {"i": 0, "deps": ["x"] * 10}
+    assert len(list(objects)) == 9999
+
+
+def test_run_cmd_json_stream_failure(caplog: pytest.LogCaptureFixture) -> None:
+    code = "import sys; print('{\"incomplete\": '); sys.exit('something went wrong')"
+
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        list(run_cmd_json_stream(_python_cmd(code), {}))
+
+    assert exc_info.value.returncode == 1
+    assert exc_info.value.stderr == "something went wrong\n"
+    assert "STDERR:\nsomething went wrong" in caplog.messages
+
+
+def test_run_cmd_json_stream_timeout() -> None:
+    code = "import time; print('{}', flush=True); time.sleep(60)"
+    objects = run_cmd_json_stream(_python_cmd(code), {"timeout": 0.5})
+
+    assert next(objects) == {}
+    with pytest.raises(subprocess.TimeoutExpired):
+        next(objects)
+
+
+def test_run_cmd_json_stream_close() -> None:
+    code = "import time; print('{}', flush=True); time.sleep(60)"
+    objects = run_cmd_json_stream(_python_cmd(code), {})
+
+    assert next(objects) == {}
+    # does not wait for the command to finish
+    objects.close()
+
+
+@mock.patch("shutil.which")
+def test_run_cmd_json_stream_executable_not_found(mock_shutil_which: mock.Mock) -> None:
+    mock_shutil_which.return_value = None
+
+    with pytest.raises(Cachi2Error, match="'foo' executable not found in PATH"):
+        list(run_cmd_json_stream(["foo"], {}))
+
+
 @mock.patch("cachi2.core.utils._get_blocksize")
 def test_fast_copy(mock_blocksize: mock.Mock, tmp_path: Path) -> None:
     mock_blocksize.return_value = 4
@@ -182,6 +271,61 @@ def test_copy_directory(
     mock_shutil_copy2.assert_called_once()
 
 
+def test_copy_file(tmp_path: Path) -> None:
+    origin = tmp_path / "src"
+    origin.write_text("foo")
+
+    destination = copy_file(origin, tmp_path / "dst")
+    assert destination.read_text() == "foo"
+
+
+@mock.patch("os.copy_file_range")
+def test_copy_file_fallback(mock_copy_range: mock.Mock, tmp_path: Path) -> None:
+    mock_copy_range.side_effect = OSError(errno.EXDEV, "cross-device copy")
+    origin = tmp_path / "src"
+    origin.write_text("foo")
+
+    destination = copy_file(origin, tmp_path / "dst")
+    assert destination.read_text() == "foo"
+    mock_copy_range.assert_called_once()
+
+
+def test_link_file(tmp_path: Path) -> None:
+    origin = tmp_path / "src"
+    origin.write_text("foo")
+    existing = tmp_path / "existing"
+    existing.write_text("bar")
+
+    assert link_file(origin, tmp_path / "dst").samefile(origin)
+    assert link_file(origin, existing).samefile(origin)
+    assert link_file(origin, origin).read_text() == "foo"
+
+
+@mock.patch("os.link")
+def test_link_file_fallback(mock_link: mock.Mock, tmp_path: Path) -> None:
+    mock_link.side_effect = OSError(errno.EXDEV, "cross-device link")
+    origin = tmp_path / "src"
+    origin.write_text("foo")
+
+    destination = link_file(origin, tmp_path / "dst")
+    assert destination.read_text() == "foo"
+    assert not destination.samefile(origin)
+
+
+def test_file_lock(tmp_path: Path) -> None:
+    lock_file = tmp_path / "cache" / ".lock"
+
+    with file_lock(lock_file, shared=True) as locked:
+        assert locked
+        with file_lock(lock_file, shared=True, blocking=False) as locked_shared:
+            assert locked_shared
+        with file_lock(lock_file, blocking=False) as locked_exclusive:
+            assert not locked_exclusive
+
+    with file_lock(lock_file, blocking=False) as locked_exclusive:
+        assert locked_exclusive
+
+
 @pytest.mark.parametrize("environ", [{"XDG_CACHE_HOME": "/tmp/xdg_home/"}, {}])
 @mock.patch("pathlib.Path.home")
 @mock.patch("os.environ")
@@ -0,0 +1,166 @@
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pytest
+import typer.testing
+
+import cachi2.core.config as config
+from cachi2.core.models.output import BuildConfig
+from cachi2.interface.cli import app
+from cachi2.interface.worker import Job, JobResult, Worker
+
+runner = typer.testing.CliRunner()
+
+ENV_VARS = [{"name": "GOFLAGS", "value": "-mod=vendor"}]
+
+
+@pytest.fixture
+def output_dir(tmp_path: Path) -> Path:
+    """Create an output directory of a previous fetch-deps command."""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    build_config = BuildConfig(environment_variables=ENV_VARS, project_files=[])
+    output_dir.joinpath(".build-config.json").write_text(build_config.model_dump_json())
+    return output_dir
+
+
+@pytest.fixture
+def worker() -> Worker:
+    return Worker(app)
+
+
+def serve_lines(worker: Worker, jobs: list[Any]) -> list[JobResult]:
+    lines = [job if isinstance(job, str) else json.dumps(job) for job in jobs]
+    return list(worker.process_lines(lines))
+
+
+def test_run_jobs(worker: Worker, output_dir: Path) -> None:
+    results = serve_lines(
+        worker,
+        [
+            {"id": "json", "args": ["generate-env", str(output_dir)]},
+            {"id": "env", "args": ["generate-env", str(output_dir), "--format", "env"]},
+        ],
+    )
+
+    assert results == [
+        JobResult(id="json", exit_code=0, stdout=json.dumps(ENV_VARS) + "\n"),
+        JobResult(id="env", exit_code=0, stdout="export GOFLAGS=-mod=vendor\n"),
+    ]
+
+
+def test_job_cwd(worker: Worker, output_dir: Path) -> None:
+    cwd = Path.cwd()
+    result = worker.run(Job(id="1", args=["generate-env", "."], cwd=output_dir))
+
+    assert result.exit_code == 0
+    assert result.stdout == json.dumps(ENV_VARS) + "\n"
+    assert Path.cwd() == cwd
+
+
+def test_job_config_does_not_leak(worker: Worker, output_dir: Path, tmp_path: Path) -> None:
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("concurrency_limit: 42")
+
+    with mock.patch.object(config, "config", None):
+        result = worker.run(
+            Job(id="1", args=["--config-file", str(config_file), "generate-env", str(output_dir)])
+        )
+        assert result.exit_code == 0
+        assert config.config is None
+
+
+def test_job_errors(worker: Worker, output_dir: Path) -> None:
+    results = serve_lines(
+        worker,
+        [
+            {"id": "usage", "args": ["generate-env", str(output_dir), "--format", "sh"]},
+            {"id": "cachi2-error", "args": ["generate-env", str(output_dir), "-o", "env.yaml"]},
+            "not a job",
+            {"id": "bad-job", "args": "generate-env"},
+            {"id": "serve", "args": ["serve"]},
+            {"id": "ok", "args": ["generate-env", str(output_dir)]},
+        ],
+    )
+
+    assert [(r.id, r.exit_code) for r in results] == [
+        ("usage", 2),
+        ("cachi2-error", 2),
+        (None, 2),
+        ("bad-job", 2),
+        ("serve", 2),
+        ("ok", 0),
+    ]
+    assert "Invalid value for '-f' / '--format'" in results[0].stderr
+    assert "Cannot determine envfile format, unsupported suffix: yaml" in results[1].stderr
+    assert "InvalidInput: 1 validation error for user input" in results[2].stderr
+    assert "args\n  Input should be a valid" in results[3].stderr
+    assert "Unsupported job command: serve" in results[4].stderr
+
+
+def test_unexpected_error_does_not_stop_the_worker(worker: Worker, output_dir: Path) -> None:
+    with mock.patch("cachi2.interface.cli.generate_envfile") as mock_generate_envfile:
+        mock_generate_envfile.side_effect = [RuntimeError("surprise"), "[]"]
+        results = serve_lines(
+            worker,
+            [
+                {"id": "1", "args": ["generate-env", str(output_dir)]},
+                {"id": "2", "args": ["generate-env", str(output_dir)]},
+            ],
+        )
+
+    assert results[0].exit_code == 1
+    assert "RuntimeError: surprise" in results[0].stderr
+    assert results[1] == JobResult(id="2", exit_code=0, stdout="[]\n")
+
+
+def test_job_logs_are_captured(worker: Worker, output_dir: Path, tmp_path: Path) -> None:
+    project_file = {"abspath": str(tmp_path / ".npmrc"), "template": "cache=${output_dir}"}
+    build_config = BuildConfig(environment_variables=[], project_files=[project_file])
+    output_dir.joinpath(".build-config.json").write_text(build_config.model_dump_json())
+
+    result = worker.run(Job(id="1", args=["inject-files", str(output_dir)]))
+    assert result.exit_code == 0
+    assert f"INFO Creating {tmp_path / '.npmrc'}" in result.stderr
+
+    result = worker.run(
+        Job(id="2", args=["--log-level", "WARNING", "inject-files", str(output_dir)])
+    )
+    assert result.exit_code == 0
+    assert result.stderr == ""
+
+
+def test_serve_stdin(output_dir: Path) -> None:
+    jobs = [{"id": str(i), "args": ["generate-env", str(output_dir)]} for i in range(3)]
+    result = runner.invoke(app, ["serve"], input="\n".join(map(json.dumps, jobs)) + "\n")
+
+    assert result.exit_code == 0
+    results = [JobResult.model_validate_json(line) for line in result.stdout.splitlines()]
+    assert [r.id for r in results] == ["0", "1", "2"]
+    assert all(r.stdout == json.dumps(ENV_VARS) + "\n" for r in results)
+
+
+def test_serve_unix_socket(worker: Worker, output_dir: Path, tmp_path: Path) -> None:
+    socket_path = tmp_path / "cachi2.sock"
+    # the worker serves until it is killed, let it die with the test process
+    threading.Thread(target=worker.serve_unix_socket, args=(socket_path,), daemon=True).start()
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+
+    job = {"id": "1", "args": ["generate-env", str(output_dir)]}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(job).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        response = client.makefile().read()
+
+    assert JobResult.model_validate_json(response) == JobResult(
+        id="1", exit_code=0, stdout=json.dumps(ENV_VARS) + "\n"
+    )